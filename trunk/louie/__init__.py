@@ -1,28 +1,68 @@
 __all__ = [
+    'adapter',
+    'affinity',
+    'balance',
+    'batch',
+    'breaker',
+    'bridge',
+    'capture',
+    'columnar',
     'dispatcher',
     'error',
+    'executor',
+    'group',
+    'instrument',
+    'journal',
+    'mailbox',
+    'payload',
+    'pipeline',
     'plugin',
+    'reactive',
     'robustapply',
     'saferef',
     'sender',
+    'shm',
     'signal',
+    'timing',
+    'trace',
+    'trampoline',
     'version',
     
     'connect',
     'disconnect',
     'get_all_receivers',
+    'has_receivers',
+    'prepare',
+    'receiver_count',
     'reset',
     'send',
     'send_exact',
     'send_minimal',
     'send_robust',
 
+    'send_columnar',
+    'vectorized',
+
+    'stats',
+
+    'lazy',
+
+    'stream',
+
+    'cell',
+    'computed',
+
     'install_plugin',
     'remove_plugin',
+    'MailboxDispatchPlugin',
     'Plugin',
+    'ProcessPoolDispatchPlugin',
     'QtWidgetPlugin',
     'TwistedDispatchPlugin',
 
+    'ConnectionGroup',
+    'scope',
+
     'Anonymous',
     'Any',
 
@@ -30,16 +70,33 @@ __all__ = [
     'Signal',
     ]
 
-import louie.dispatcher, louie.error, louie.plugin, louie.robustapply, \
-       louie.saferef, louie.sender, louie.signal, louie.version
+import louie.adapter, louie.affinity, louie.balance, louie.batch, \
+       louie.breaker, louie.bridge, louie.capture, louie.columnar, \
+       louie.dispatcher, louie.error, louie.executor, louie.group, \
+       louie.instrument, louie.journal, louie.mailbox, louie.payload, \
+       louie.pipeline, louie.plugin, louie.reactive, louie.robustapply, \
+       louie.saferef, louie.sender, louie.shm, louie.signal, louie.timing, \
+       louie.trace, louie.trampoline, louie.version
+
+from louie.columnar import send_columnar, vectorized
 
 from louie.dispatcher import \
-     connect, disconnect, get_all_receivers, reset, \
-     send, send_exact, send_minimal, send_robust
+     connect, disconnect, get_all_receivers, has_receivers, prepare, \
+     receiver_count, reset, send, send_exact, send_minimal, send_robust
+
+from louie.group import ConnectionGroup, scope
+
+from louie.instrument import stats
+
+from louie.payload import lazy
+
+from louie.pipeline import stream
 
 from louie.plugin import \
-     install_plugin, remove_plugin, Plugin, \
-     QtWidgetPlugin, TwistedDispatchPlugin
+     install_plugin, remove_plugin, MailboxDispatchPlugin, Plugin, \
+     ProcessPoolDispatchPlugin, QtWidgetPlugin, TwistedDispatchPlugin
+
+from louie.reactive import cell, computed
 
 from louie.sender import Anonymous, Any
 
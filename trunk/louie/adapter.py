@@ -0,0 +1,99 @@
+"""Receiver adapters.
+
+An adapter is connected in place of a receiver to alter how and when
+the receiver is called, e.g. to throttle or delay calls.  Adapters
+compare and hash equal to the reference they hold to their receiver,
+so that ``disconnect`` and reconnecting the receiver work as though it
+had been connected directly.
+
+Since an adapter's ``__call__`` accepts any arguments, ``send`` passes
+it all named arguments, and it filters them for the receiver when it
+calls it using ``robust_apply``.  ``accepted_names`` reports the names
+the receiver accepts, so that lazy arguments it does not accept are
+not computed.
+"""
+
+from louie import payload
+from louie import robustapply
+from louie import saferef
+
+
+class Adapter(object):
+    """Base class for receiver adapters.
+
+    - ``receiver``: The receiver to adapt.
+
+    - ``weak``: Whether to hold a weak reference to the receiver.
+
+    - ``on_delete``: Called with the adapter as argument when a weakly
+      referenced receiver is garbage-collected.
+
+    Subclasses override ``__call__``, and use ``deliver`` to call the
+    receiver.  Those holding timers or pending calls override ``close``,
+    which is called when the adapter is disconnected or its receiver
+    is garbage-collected.
+    """
+
+    # Passes named arguments on; see ``louie.payload``.
+    _louie_forwards = True
+
+    def __init__(self, receiver, weak=True, on_delete=None):
+        self.weak = weak
+        self.on_delete = on_delete
+        if weak:
+            self.reference = saferef.safe_ref(receiver, self._deleted)
+        else:
+            self.reference = receiver
+
+    def _deleted(self, reference):
+        self.close()
+        if self.on_delete is not None:
+            self.on_delete(self)
+
+    def close(self):
+        """Release the resources of the adapter once it is no longer
+        connected."""
+
+    def receiver(self):
+        """Return the receiver, or ``None`` if it has been
+        garbage-collected."""
+        if self.weak:
+            return self.reference()
+        return self.reference
+
+    def accepted_names(self):
+        """Return the set of argument names the receiver accepts, or
+        ``None`` if it takes ``**kw``."""
+        receiver = self.receiver()
+        if receiver is None:
+            return set()
+        return payload.accepted_names([receiver])
+
+    def __call__(self, *arguments, **named):
+        return self.deliver(arguments, named)
+
+    def deliver(self, arguments, named):
+        """Call the receiver with ``arguments`` and the subset of
+        ``named`` it accepts."""
+        receiver = self.receiver()
+        if receiver is None:
+            return None
+        return robustapply.robust_apply(
+            receiver, receiver, *arguments, **named)
+
+    def __nonzero__(self):
+        return self.receiver() is not None
+
+    def __eq__(self, other):
+        if isinstance(other, Adapter):
+            other = other.reference
+        return self.reference == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.reference)
+
+    def __repr__(self):
+        return '<%s for %r>' % (self.__class__.__name__, self.reference)
@@ -0,0 +1,152 @@
+"""Delivery of signals on the threads owning receivers.
+
+A receiver connected with ``thread=current`` is only ever called on the
+thread which connected it, like a Qt queued connection::
+
+    louie.connect(window.show_progress, 'progress', job,
+                  thread=louie.affinity.current)
+
+A send made on the owning thread calls the receiver directly.  A send
+made on any other thread instead posts the call to the inbox of the
+owning thread, and returns ``None`` as the response of the receiver.
+The owning thread carries out posted calls, in order, when it calls
+``drain``, typically from its event loop::
+
+    def on_idle():
+        louie.affinity.drain()
+
+``set_wakeup`` registers a function called, on the sending thread,
+whenever a call is posted to an inbox, so that an event loop may be
+woken up to drain it.  The function must be thread-safe, e.g. posting
+an event to the event loop.
+
+Inboxes are ``collections.deque`` instances, whose ``append`` and
+``popleft`` methods are atomic, so neither senders nor the owning
+thread take a lock to post or drain calls.
+
+``thread`` may also be a ``threading.Thread`` instance which has been
+started, to deliver to that thread instead of the connecting one.
+"""
+
+import thread as _thread
+import threading
+from collections import deque
+
+from louie.adapter import Adapter
+
+
+class current(object):
+    """Value of ``thread`` designating the calling thread."""
+
+
+class Inbox(object):
+    """Calls posted to a thread.
+
+    - ``ident``: Identifier of the owning thread.
+
+    - ``wakeup``: Function called without arguments after each call is
+      posted, or ``None``.
+    """
+
+    def __init__(self, ident):
+        self.ident = ident
+        self.calls = deque()
+        self.wakeup = None
+
+    def __len__(self):
+        return len(self.calls)
+
+    def post(self, adapter, arguments, named):
+        """Post a call to ``adapter`` with ``arguments`` and
+        ``named``."""
+        self.calls.append((adapter, arguments, named))
+        wakeup = self.wakeup
+        if wakeup is not None:
+            wakeup()
+
+    def drain(self, limit=None):
+        """Carry out up to ``limit`` posted calls, or all of them if
+        ``limit`` is ``None``.  Returns the number of calls carried out.
+
+        If a receiver raises an error, it propagates, and the calls
+        posted after the failing one stay in the inbox.
+        """
+        calls = self.calls
+        count = 0
+        while limit is None or count < limit:
+            try:
+                adapter, arguments, named = calls.popleft()
+            except IndexError:
+                break
+            count += 1
+            adapter.deliver(arguments, named)
+        return count
+
+
+class ThreadAffine(Adapter):
+    """Calls the receiver on the thread owning ``inbox``, posting calls
+    made on other threads to it."""
+
+    def __init__(self, receiver, inbox, weak=True, on_delete=None):
+        Adapter.__init__(self, receiver, weak, on_delete)
+        self.inbox = inbox
+
+    def __call__(self, *arguments, **named):
+        if _thread.get_ident() == self.inbox.ident:
+            return self.deliver(arguments, named)
+        self.inbox.post(self, arguments, named)
+        return None
+
+
+# { thread ident : Inbox }
+inboxes = {}
+_lock = threading.Lock()
+
+
+def _ident(thread):
+    if thread is current:
+        return _thread.get_ident()
+    if thread.ident is None:
+        raise ValueError('Thread %r has not been started' % (thread, ))
+    return thread.ident
+
+
+def inbox(thread=current):
+    """Return the ``Inbox`` of ``thread``, creating it if needed."""
+    ident = _ident(thread)
+    result = inboxes.get(ident)
+    if result is None:
+        _lock.acquire()
+        try:
+            result = inboxes.get(ident)
+            if result is None:
+                inboxes[ident] = result = Inbox(ident)
+        finally:
+            _lock.release()
+    return result
+
+
+def drain(limit=None):
+    """Carry out up to ``limit`` calls posted to the calling thread, or
+    all of them if ``limit`` is ``None``.  Returns the number of calls
+    carried out."""
+    result = inboxes.get(_thread.get_ident())
+    if result is None:
+        return 0
+    return result.drain(limit)
+
+
+def set_wakeup(function, thread=current):
+    """Call ``function`` without arguments whenever a call is posted to
+    ``thread``.  ``None`` removes the function."""
+    inbox(thread).wakeup = function
+
+
+def discard(thread=current):
+    """Remove the inbox of ``thread``, e.g. when it exits, discarding
+    the calls posted to it."""
+    _lock.acquire()
+    try:
+        inboxes.pop(_ident(thread), None)
+    finally:
+        _lock.release()
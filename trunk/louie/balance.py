@@ -0,0 +1,274 @@
+"""Competing-consumer receiver groups.
+
+Receivers connected with the same ``group`` name for a signal and
+sender share its sends, each send calling only one of them, like
+workers taking jobs from a queue::
+
+    for worker in workers:
+        louie.connect(worker.render, 'render', group='renderers')
+
+Receivers connected without a group are still called for every send.
+The group's ``strategy`` chooses the member called:
+
+- ``ROUND_ROBIN``: Each member in turn.
+
+- ``LEAST_BUSY``: The member with the fewest calls in progress, for
+  groups called from several threads, e.g. by a
+  ``louie.executor.PartitionedExecutor``.
+
+- ``HASH``: The member owning the value of the named argument ``key``
+  on a consistent hash ring, so that sends with the same value go to
+  the same member while it is connected, and adding or removing a
+  member only moves the values of its neighbours on the ring.
+
+The group is connected as one receiver, so it counts once in
+``receiver_count``, and its response to a send is that of the member
+called.  Members are referenced weakly unless connected with
+``weak=False``, and the group is disconnected along with its last
+member.  Pass ``group`` to ``disconnect`` to remove a member.  A
+``ConnectionGroup`` only records the members connected through it, or
+while it is active, and its ``disconnect_all`` only removes those.
+"""
+
+import bisect
+import threading
+
+try:
+    from hashlib import md5
+except ImportError:
+    from md5 import md5
+
+from louie import dispatcher
+from louie import payload
+from louie import robustapply
+from louie import saferef
+
+
+# Strategies.
+ROUND_ROBIN = 'round_robin'
+LEAST_BUSY = 'least_busy'
+HASH = 'hash'
+
+STRATEGIES = (ROUND_ROBIN, LEAST_BUSY, HASH)
+
+# Points of each member on the hash ring.
+REPLICAS = 64
+
+
+def _point(value):
+    return int(md5(repr(value)).hexdigest()[:8], 16)
+
+
+class ReceiverGroup(object):
+    """Receivers sharing the sends of a signal.
+
+    - ``name``: The name given as ``group`` to ``connect``.
+
+    - ``strategy``: One of ``STRATEGIES``.
+
+    - ``key``: Name of the named argument hashed by ``HASH``.
+
+    - ``on_delete``: Called with the group as argument when its last
+      weakly referenced member is garbage-collected.
+    """
+
+    # Passes named arguments on; see ``louie.payload``.
+    _louie_forwards = True
+
+    def __init__(self, name, strategy=ROUND_ROBIN, key=None, on_delete=None):
+        if strategy not in STRATEGIES:
+            raise ValueError('Unknown group strategy %r' % (strategy, ))
+        if strategy == HASH and key is None:
+            raise ValueError('The HASH strategy needs a key')
+        self.name = name
+        self.strategy = strategy
+        self.key = key
+        self.on_delete = on_delete
+        # References to the members, weak or strong.
+        self.members = []
+        # { id(reference) : calls in progress }
+        self.busy = {}
+        self.next = 0
+        # Sorted points of the hash ring, and the member of each.
+        self.points = None
+        self.owners = None
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.members)
+
+    def __repr__(self):
+        return '<ReceiverGroup %r (%s, %i members)>' % (
+            self.name, self.strategy, len(self.members))
+
+    def _index(self, receiver):
+        for index, reference in enumerate(self.members):
+            if _resolve(reference) == receiver:
+                return index
+        return None
+
+    def add(self, receiver, weak=True):
+        """Add ``receiver`` to the group, unless it is a member.
+        Returns the reference to it held by the group."""
+        if weak:
+            reference = saferef.safe_ref(receiver, self._deleted)
+        else:
+            reference = receiver
+        self.lock.acquire()
+        try:
+            index = self._index(receiver)
+            if index is not None:
+                return self.members[index]
+            self.members.append(reference)
+            self.points = None
+            return reference
+        finally:
+            self.lock.release()
+
+    def discard(self, reference):
+        """Remove the member held by ``reference``, as returned by
+        ``add``.  Returns whether it was a member."""
+        self.lock.acquire()
+        try:
+            for index, member in enumerate(self.members):
+                if member is reference:
+                    self._discard(index)
+                    return True
+            return False
+        finally:
+            self.lock.release()
+
+    def remove(self, receiver):
+        """Remove ``receiver`` from the group.  Returns whether it was a
+        member."""
+        self.lock.acquire()
+        try:
+            index = self._index(receiver)
+            if index is None:
+                return False
+            self._discard(index)
+            return True
+        finally:
+            self.lock.release()
+
+    def _discard(self, index):
+        reference = self.members.pop(index)
+        self.busy.pop(id(reference), None)
+        self.points = None
+
+    def _deleted(self, reference):
+        self.lock.acquire()
+        try:
+            for index, member in enumerate(self.members):
+                if member is reference:
+                    self._discard(index)
+                    break
+            empty = not self.members
+        finally:
+            self.lock.release()
+        if empty and self.on_delete is not None:
+            self.on_delete(self)
+
+    def accepted_names(self):
+        """Return the set of argument names accepted by any member, and
+        ``key``, or ``None`` if a member takes ``**kw``."""
+        self.lock.acquire()
+        try:
+            receivers = [_resolve(reference) for reference in self.members]
+        finally:
+            self.lock.release()
+        names = payload.accepted_names(
+            [receiver for receiver in receivers if receiver is not None])
+        if names is not None and self.key is not None:
+            names.add(self.key)
+        return names
+
+    def __call__(self, *arguments, **named):
+        self.lock.acquire()
+        try:
+            if self.strategy == HASH:
+                reference = self._hashed(named.get(self.key))
+            else:
+                reference = self._rotate()
+            if reference is None:
+                return None
+            receiver = _resolve(reference)
+            if self.strategy != LEAST_BUSY:
+                reference = None
+            else:
+                self.busy[id(reference)] = self.busy.get(id(reference), 0) + 1
+        finally:
+            self.lock.release()
+        try:
+            return robustapply.robust_apply(
+                receiver, receiver, *arguments, **named)
+        finally:
+            if reference is not None:
+                self.lock.acquire()
+                try:
+                    count = self.busy.get(id(reference))
+                    if count is not None:
+                        self.busy[id(reference)] = count - 1
+                finally:
+                    self.lock.release()
+
+    def _rotate(self):
+        """Return the next live member, or the least busy one for
+        ``LEAST_BUSY``.  Called with the lock acquired."""
+        members = self.members
+        count = len(members)
+        chosen = None
+        for offset in xrange(count):
+            index = (self.next + offset) % count
+            reference = members[index]
+            if _resolve(reference) is None:
+                continue
+            if self.strategy == ROUND_ROBIN:
+                self.next = index + 1
+                return reference
+            busy = self.busy.get(id(reference), 0)
+            if chosen is None or busy < chosen[0]:
+                chosen = (busy, index, reference)
+                if not busy:
+                    break
+        if chosen is None:
+            return None
+        self.next = chosen[1] + 1
+        return chosen[2]
+
+    def _hashed(self, value):
+        """Return the live member owning ``value`` on the hash ring.
+        Called with the lock acquired."""
+        if self.points is None:
+            ring = []
+            for reference in self.members:
+                for replica in xrange(REPLICAS):
+                    ring.append((_point((id(reference), replica)),
+                                 reference))
+            ring.sort()
+            self.points = [point for point, reference in ring]
+            self.owners = [reference for point, reference in ring]
+        points = self.points
+        if not points:
+            return None
+        start = bisect.bisect(points, _point(value))
+        for offset in xrange(len(points)):
+            reference = self.owners[(start + offset) % len(points)]
+            if _resolve(reference) is not None:
+                return reference
+        return None
+
+
+def _resolve(reference):
+    if isinstance(reference, dispatcher.WEAKREF_TYPES):
+        return reference()
+    return reference
+
+
+def find(receivers, name):
+    """Return the ``ReceiverGroup`` named ``name`` in ``receivers``, or
+    ``None``."""
+    for receiver in receivers:
+        if isinstance(receiver, ReceiverGroup) and receiver.name == name:
+            return receiver
+    return None
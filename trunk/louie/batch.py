@@ -0,0 +1,131 @@
+"""Micro-batching receivers.
+
+Receivers connected with ``batch_size`` or ``max_delay`` are called
+with a list of events rather than once per send::
+
+    def write(events):
+        cursor.executemany(INSERT, [(e['key'], e['value'])
+                                    for e in events])
+
+    louie.connect(write, 'sample', batch_size=500, max_delay=0.01)
+
+Each event is the dictionary of named arguments of one send, including
+``signal`` and ``sender``.  Buffered events are delivered, in order,
+when ``batch_size`` of them are pending, ``max_delay`` seconds after
+the first of them was buffered, or when ``flush`` is called.  The
+delay is measured on ``louie.timing.default_wheel``, so it only
+elapses while the wheel is advanced.  Disconnecting a batching
+receiver delivers the events buffered for it, so none are lost;
+those buffered for a receiver which has been garbage-collected are
+discarded.
+
+Other receivers of the same signals are called once per send as
+usual.  Positional arguments cannot be batched, and sending them to a
+batching receiver raises ``TypeError``.
+"""
+
+import threading
+
+from louie import dispatcher
+from louie import timing
+from louie.adapter import Adapter
+
+
+class Batch(Adapter):
+    """Buffers calls to the receiver, and calls it with lists of
+    events.
+
+    - ``batch_size``: Number of buffered events causing delivery, or
+      ``None``.
+
+    - ``max_delay``: Seconds after which buffered events are
+      delivered, or ``None``.
+
+    - ``wheel``: The ``TimerWheel`` measuring ``max_delay``, by
+      default ``louie.timing.default_wheel``.
+    """
+
+    def __init__(self, receiver, batch_size=None, max_delay=None, weak=True,
+                 on_delete=None, wheel=None):
+        Adapter.__init__(self, receiver, weak, on_delete)
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        if wheel is None:
+            wheel = timing.default_wheel
+        self.wheel = wheel
+        self.events = []
+        self.timer = None
+        self.lock = threading.Lock()
+
+    def __call__(self, *arguments, **named):
+        if arguments:
+            raise TypeError(
+                'Positional arguments cannot be batched (receiver=%r)'
+                % (self.receiver(), ))
+        self.lock.acquire()
+        try:
+            events = self.events
+            events.append(named)
+            if self.batch_size is not None \
+                   and len(events) >= self.batch_size:
+                events = self._take()
+            else:
+                if self.timer is None and self.max_delay is not None:
+                    self.timer = self.wheel.schedule(
+                        self.max_delay, self.flush)
+                events = None
+        finally:
+            self.lock.release()
+        if events is not None:
+            return self._deliver(events)
+        return None
+
+    def accepted_names(self):
+        """Events hold all named arguments, so return ``None``."""
+        return None
+
+    def _take(self):
+        """Return the buffered events and clear the buffer.  Called
+        with the lock acquired."""
+        events = self.events
+        self.events = []
+        if self.timer is not None:
+            self.wheel.cancel(self.timer)
+            self.timer = None
+        return events
+
+    def _deliver(self, events):
+        receiver = self.receiver()
+        if receiver is None:
+            return None
+        return receiver(events)
+
+    def flush(self):
+        """Deliver the buffered events, if any.  Returns the response
+        of the receiver, or ``None``."""
+        self.lock.acquire()
+        try:
+            events = self._take()
+        finally:
+            self.lock.release()
+        if events:
+            return self._deliver(events)
+        return None
+
+    def close(self):
+        """Deliver the buffered events, if the receiver is alive, and
+        cancel the timer."""
+        self.flush()
+
+
+def flush():
+    """Deliver the events buffered for all connected batching
+    receivers."""
+    batches = {}
+    for signals in dispatcher.connections.values():
+        for receivers in signals.values():
+            for receiver in receivers:
+                if isinstance(receiver, Batch):
+                    batches[id(receiver)] = receiver
+    for batch in batches.values():
+        batch.flush()
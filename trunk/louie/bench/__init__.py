@@ -0,0 +1,116 @@
+"""Benchmarks for Louie's dispatcher hot paths.
+
+Run the suite against the installed Louie::
+
+    python -m louie.bench -o results.json
+
+Compare several Louie trees, e.g. the tagged releases in a Subversion
+checkout, against the first one given::
+
+    python -m louie.bench -o results.json tags/1.0 tags/1.1 trunk
+
+Each tree is benchmarked in a separate Python process.
+"""
+
+import os
+import subprocess
+import sys
+from optparse import OptionParser
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from louie.bench import suite
+from louie.bench.suite import BENCHMARKS, run
+
+
+def run_path(path, names=None, repeat=3, scale=1.0, python=sys.executable):
+    """Run the suite against the Louie tree at ``path`` in a separate
+    process, and return its results."""
+    script = suite.__file__
+    if script.endswith('.pyc') or script.endswith('.pyo'):
+        script = script[:-1]
+    args = [python, script, os.path.abspath(path), str(repeat), str(scale)]
+    args.extend(names or [])
+    process = subprocess.Popen(args, stdout=subprocess.PIPE)
+    output = process.communicate()[0]
+    if process.returncode:
+        raise RuntimeError(
+            'Benchmarks failed for %s (exit status %i)'
+            % (path, process.returncode))
+    result = json.loads(output)
+    result['label'] = path
+    return result
+
+
+def compare(paths, names=None, repeat=3, scale=1.0):
+    """Run the suite against each Louie tree in ``paths``.
+
+    Returns a list of results, in the order of ``paths``.
+    """
+    return [run_path(path, names, repeat, scale) for path in paths]
+
+
+def format_results(results):
+    """Return a table of best times, in microseconds, for a list of
+    results.  Times after the first column also show the ratio to the
+    first column.
+
+    Columns are headed by the ``label`` of each result (the path given
+    to ``run_path``), or else its Louie version.  Benchmarks a result
+    lacks, e.g. because its Louie release does not support them, are
+    shown as ``-``.
+    """
+    names = []
+    for name, setup, number in BENCHMARKS:
+        for result in results:
+            if name in result['results']:
+                names.append(name)
+                break
+    width = max([len(name) for name in names] + [9])
+    lines = []
+    header = ['%-*s' % (width, 'benchmark')]
+    for result in results:
+        label = result.get('label', result['louie'])
+        header.append('%18s' % label[-18:])
+    lines.append(' '.join(header))
+    for name in names:
+        base = results[0]['results'].get(name, {}).get('best')
+        line = ['%-*s' % (width, name)]
+        for n, result in enumerate(results):
+            best = result['results'].get(name, {}).get('best')
+            if best is None:
+                line.append('%18s' % '-')
+            elif n and base:
+                line.append('%10.2f (%4.2fx)' % (best * 1e6, best / base))
+            else:
+                line.append('%18.2f' % (best * 1e6))
+        lines.append(' '.join(line))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = OptionParser(usage='%prog [options] [PATH ...]')
+    parser.add_option('-o', '--output', metavar='FILE',
+                      help='write results to FILE as JSON')
+    parser.add_option('-b', '--benchmark', action='append', dest='names',
+                      metavar='NAME', help='only run benchmark NAME')
+    parser.add_option('-r', '--repeat', type='int', default=3,
+                      help='number of timed runs of each benchmark')
+    parser.add_option('-s', '--scale', type='float', default=1.0,
+                      help='factor applied to the operations per run')
+    options, paths = parser.parse_args(argv)
+    if paths:
+        results = compare(paths, options.names, options.repeat,
+                          options.scale)
+    else:
+        results = [run(options.names, options.repeat, options.scale)]
+    print format_results(results)
+    if options.output:
+        f = open(options.output, 'w')
+        try:
+            json.dump(results, f, indent=2)
+        finally:
+            f.close()
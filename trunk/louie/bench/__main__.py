@@ -0,0 +1,3 @@
+from louie.bench import main
+
+main()
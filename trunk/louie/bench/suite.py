@@ -0,0 +1,291 @@
+"""Benchmark definitions.
+
+This module only imports ``louie`` when the suite is run, and
+benchmarks of API missing from older Louie releases are skipped for
+them, so that it can be run as a script against another Louie tree::
+
+    python suite.py /path/to/louie-1.0
+
+which writes the results to standard output as JSON.
+"""
+
+import gc
+import sys
+from timeit import default_timer as timer
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+
+# List of (name, setup function, number of operations per run).
+BENCHMARKS = []
+
+
+def benchmark(name, number):
+    """Register a setup function as benchmark ``name``.
+
+    The setup function is called with the ``louie`` package and must
+    return a callable performing one operation, or ``None`` if that
+    Louie release lacks the API the benchmark measures.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, setup, number))
+        return setup
+    return register
+
+
+class Receiver(object):
+
+    def __call__(self, signal, sender, value):
+        return value
+
+    def method(self, signal, sender, value):
+        return value
+
+
+def function(signal, sender, value):
+    return value
+
+
+def _function():
+    # Return a distinct function object per receiver.
+    def receiver(signal, sender, value):
+        return value
+    return receiver
+
+
+def _send(louie, count, make=_function):
+    louie.reset()
+    sender = Receiver()
+    receivers = [make() for n in xrange(count)]
+    for receiver in receivers:
+        louie.connect(receiver, 'signal', sender)
+    def op(send=louie.send, sender=sender, receivers=receivers):
+        send('signal', sender, value=1)
+    return op
+
+
+@benchmark('send_0', 100000)
+def send_0(louie):
+    return _send(louie, 0)
+
+
+@benchmark('send_1', 50000)
+def send_1(louie):
+    return _send(louie, 1)
+
+
+@benchmark('send_10', 10000)
+def send_10(louie):
+    return _send(louie, 10)
+
+
+@benchmark('send_1000', 100)
+def send_1000(louie):
+    return _send(louie, 1000)
+
+
+@benchmark('send_10_bound_method', 10000)
+def send_10_bound_method(louie):
+    return _send(louie, 10, lambda: Receiver().method)
+
+
+@benchmark('send_10_callable', 10000)
+def send_10_callable(louie):
+    return _send(louie, 10, Receiver)
+
+
+@benchmark('send_robust_10', 10000)
+def send_robust_10(louie):
+    louie.reset()
+    sender = Receiver()
+    receivers = [_function() for n in xrange(10)]
+    for receiver in receivers:
+        louie.connect(receiver, 'signal', sender)
+    def op(send=louie.send_robust, sender=sender, receivers=receivers):
+        send('signal', sender, value=1)
+    return op
+
+
+@benchmark('send_fan_in_any_all', 10000)
+def send_fan_in_any_all(louie):
+    """Ten receivers on each of (sender, signal), (sender, All),
+    (Any, signal) and (Any, All)."""
+    louie.reset()
+    sender = Receiver()
+    receivers = []
+    for signal, s in [('signal', sender), (louie.All, sender),
+                      ('signal', louie.Any), (louie.All, louie.Any)]:
+        for n in xrange(10):
+            receiver = _function()
+            receivers.append(receiver)
+            louie.connect(receiver, signal, s)
+    def op(send=louie.send, sender=sender, receivers=receivers):
+        send('signal', sender, value=1)
+    return op
+
+
+@benchmark('send_prepared_10', 10000)
+def send_prepared_10(louie):
+    if not hasattr(louie, 'prepare'):
+        return None
+    louie.reset()
+    sender = Receiver()
+    receivers = [_function() for n in xrange(10)]
+    for receiver in receivers:
+        louie.connect(receiver, 'signal', sender)
+    send = louie.prepare('signal', sender)
+    def op(send=send, receivers=receivers):
+        send(value=1)
+    return op
+
+
+@benchmark('send_unsubscribed', 100000)
+def send_unsubscribed(louie):
+    """Send a signal nobody listens to, while receivers are connected
+    to other signals from ``Any`` sender."""
+    louie.reset()
+    sender = Receiver()
+    receivers = [_function() for n in xrange(10)]
+    for n, receiver in enumerate(receivers):
+        louie.connect(receiver, 'signal%i' % n, louie.Any)
+    def op(send=louie.send, sender=sender, receivers=receivers):
+        send('signal', sender, value=1)
+    return op
+
+
+def _robust_apply(louie, receiver, **named):
+    robust_apply = louie.robustapply.robust_apply
+    def op():
+        robust_apply(receiver, receiver, **named)
+    return op
+
+
+def _no_arguments():
+    pass
+
+
+def _some_arguments(a, b, c=None):
+    pass
+
+
+def _any_arguments(**named):
+    pass
+
+
+@benchmark('robust_apply_none', 100000)
+def robust_apply_none(louie):
+    return _robust_apply(louie, _no_arguments)
+
+
+@benchmark('robust_apply_exact', 100000)
+def robust_apply_exact(louie):
+    return _robust_apply(louie, _some_arguments, a=1, b=2, c=3)
+
+
+@benchmark('robust_apply_filtered', 100000)
+def robust_apply_filtered(louie):
+    return _robust_apply(louie, _some_arguments,
+                         a=1, b=2, d=4, e=5, f=6, g=7, h=8)
+
+
+@benchmark('robust_apply_kwargs', 100000)
+def robust_apply_kwargs(louie):
+    return _robust_apply(louie, _any_arguments,
+                         a=1, b=2, d=4, e=5, f=6, g=7, h=8)
+
+
+@benchmark('connect_disconnect_churn', 100)
+def connect_disconnect_churn(louie):
+    """Connect and then disconnect 100 receivers."""
+    louie.reset()
+    sender = Receiver()
+    receivers = [_function() for n in xrange(100)]
+    def op(connect=louie.connect, disconnect=louie.disconnect):
+        for receiver in receivers:
+            connect(receiver, 'signal', sender)
+        for receiver in receivers:
+            disconnect(receiver, 'signal', sender)
+    return op
+
+
+@benchmark('weakref_death_cleanup', 20)
+def weakref_death_cleanup(louie):
+    """Connect bound methods of 1000 instances, then delete them all."""
+    louie.reset()
+    sender = Receiver()
+    def op(connect=louie.connect):
+        instances = [Receiver() for n in xrange(1000)]
+        for instance in instances:
+            connect(instance.method, 'signal', sender)
+        del instances[:]
+    return op
+
+
+def run(names=None, repeat=3, scale=1.0):
+    """Run the benchmarks against the ``louie`` package on ``sys.path``.
+
+    - ``names``: Names of the benchmarks to run, or ``None`` for all.
+
+    - ``repeat``: Number of timed runs of each benchmark.
+
+    - ``scale``: Factor applied to the number of operations per run.
+
+    Returns a dictionary suitable for serializing as JSON.  For each
+    benchmark, ``best`` and ``mean`` are the best and mean time of one
+    operation across runs, in seconds.  Benchmarks unsupported by the
+    Louie release are left out.
+    """
+    import louie
+    results = {}
+    for name, setup, number in BENCHMARKS:
+        if names is not None and name not in names:
+            continue
+        number = max(1, int(number * scale))
+        op = setup(louie)
+        if op is None:
+            continue
+        times = []
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for r in xrange(repeat):
+                start = timer()
+                for n in xrange(number):
+                    op()
+                times.append((timer() - start) / number)
+        finally:
+            if enabled:
+                gc.enable()
+        results[name] = {
+            'best': min(times),
+            'mean': sum(times) / len(times),
+            'number': number,
+            'repeat': repeat,
+            }
+    louie.reset()
+    return {
+        'louie': louie.version.VERSION,
+        'path': louie.__path__[0],
+        'python': sys.version.split()[0],
+        'results': results,
+        }
+
+
+def main(argv):
+    """Run the suite against the Louie tree in ``argv[1]``, writing JSON
+    results to standard output.
+
+    Further arguments are ``repeat``, ``scale`` and benchmark names.
+    """
+    sys.path.insert(0, argv[1])
+    repeat = int(argv[2])
+    scale = float(argv[3])
+    names = argv[4:] or None
+    json.dump(run(names, repeat, scale), sys.stdout)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,158 @@
+"""Circuit breakers for failing receivers.
+
+While enabled, ``send_robust`` stops calling a receiver once it has
+raised an exception ``threshold`` times in a row::
+
+    louie.breaker.enable(threshold=5, cooldown=30.0)
+
+The receiver's circuit is then *open*: for ``cooldown`` seconds, the
+receiver is skipped, and the response recorded for it is a
+``CircuitOpenError`` instance created when the circuit opened, rather
+than a new exception.  After the cool-down, the circuit is *half
+open*: the next send calls the receiver as a probe.  If the probe
+succeeds, the circuit is closed again; if it fails, the circuit opens
+for another cool-down.
+
+The ``CircuitTripped`` signal is sent when a circuit opens, with the
+receiver as ``target``, the number of consecutive ``failures`` and the
+last ``error`` as named arguments, and ``CircuitReset`` is sent with
+the receiver as ``target`` when it closes again.  The sender of both
+is the ``CircuitBreaker``.  Both are sent with ``send_robust``, so
+errors raised by their receivers neither escape from the send which
+tripped or reset the circuit nor stop it from calling its remaining
+receivers.
+
+The breaker is installed as ``dispatcher.circuit_breaker``, so it costs
+nothing while disabled.  Only ``send_robust`` uses it; errors raised by
+receivers called by the other send functions propagate to the sender.
+
+Receivers are identified as by ``louie.instrument``, so a new receiver
+created at the address of one that has been garbage-collected shares
+its circuit.
+"""
+
+import time
+
+from louie import dispatcher
+from louie import error
+from louie.instrument import _key, _label
+from louie.signal import Signal
+
+
+DEFAULT_THRESHOLD = 5
+DEFAULT_COOLDOWN = 30.0
+
+# Circuit states.
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitTripped(Signal):
+    """Sent when the circuit of a receiver opens."""
+
+
+class CircuitReset(Signal):
+    """Sent when the circuit of a receiver closes again."""
+
+
+class CircuitOpenError(error.LouieError):
+    """Response of a receiver skipped by ``send_robust`` because its
+    circuit is open."""
+
+
+class Circuit(object):
+    """Failure state of one receiver."""
+
+    __slots__ = ('state', 'failures', 'opened', 'error')
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = None
+        self.error = None
+
+
+class CircuitBreaker(object):
+    """Tracks consecutive failures of receivers called by
+    ``send_robust``.
+
+    - ``threshold``: Number of consecutive failures opening a circuit.
+
+    - ``cooldown``: Seconds an open circuit skips its receiver.
+
+    - ``clock``: Function returning the current time, in seconds.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, cooldown=DEFAULT_COOLDOWN,
+                 clock=time.time):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        # { receiverkey : Circuit }, only for receivers which have
+        # failed since their last success.
+        self.circuits = {}
+
+    def check(self, receiver):
+        """Return ``None`` if ``receiver`` may be called, or the
+        ``CircuitOpenError`` to respond with instead."""
+        circuit = self.circuits.get(_key(receiver))
+        if circuit is None or circuit.state == CLOSED:
+            return None
+        if (circuit.state == OPEN
+            and self.clock() - circuit.opened >= self.cooldown):
+            # Let one call through as a probe.
+            circuit.state = HALF_OPEN
+            return None
+        return circuit.error
+
+    def failed(self, receiver, err):
+        """Record that ``receiver`` raised ``err``."""
+        key = _key(receiver)
+        circuit = self.circuits.get(key)
+        if circuit is None:
+            self.circuits[key] = circuit = Circuit()
+        circuit.failures += 1
+        if (circuit.state == HALF_OPEN
+            or (circuit.state == CLOSED
+                and circuit.failures >= self.threshold)):
+            circuit.state = OPEN
+            circuit.opened = self.clock()
+            circuit.error = CircuitOpenError(
+                'Circuit open for %s after %i failures'
+                % (_label(receiver), circuit.failures))
+            dispatcher.send_robust(CircuitTripped, self, target=receiver,
+                                   failures=circuit.failures, error=err)
+
+    def succeeded(self, receiver):
+        """Record that ``receiver`` returned normally."""
+        if not self.circuits:
+            return
+        circuit = self.circuits.pop(_key(receiver), None)
+        if circuit is not None and circuit.state != CLOSED:
+            dispatcher.send_robust(CircuitReset, self, target=receiver)
+
+    def state(self, receiver):
+        """Return the state of the circuit of ``receiver``: ``CLOSED``,
+        ``OPEN`` or ``HALF_OPEN``."""
+        circuit = self.circuits.get(_key(receiver))
+        if circuit is None:
+            return CLOSED
+        return circuit.state
+
+
+def enable(threshold=DEFAULT_THRESHOLD, cooldown=DEFAULT_COOLDOWN,
+           clock=time.time):
+    """Install and return a new ``CircuitBreaker``."""
+    breaker = CircuitBreaker(threshold, cooldown, clock)
+    dispatcher.circuit_breaker = breaker
+    return breaker
+
+
+def disable():
+    """Remove the installed ``CircuitBreaker``, closing all circuits."""
+    dispatcher.circuit_breaker = None
+
+
+def is_enabled():
+    return dispatcher.circuit_breaker is not None
@@ -0,0 +1,232 @@
+"""Cross-process signal bridging.
+
+Each process has its own routing tables, so a signal sent in one
+process never reaches receivers in another.  A ``Bridge`` forwards
+signals to a peer process over a ``multiprocessing`` pipe connection
+or a (Unix domain) socket, where a ``Bridge`` on the other end sends
+them again locally::
+
+    parent_end, child_end = multiprocessing.Pipe()
+    bridge = louie.bridge.Bridge(parent_end)
+    ...
+    bridge.poll()
+
+Only signals for which the peer has receivers are forwarded: each
+bridge tells its peer which signals local receivers are connected to,
+and connects a forwarding receiver for the signals its peer asks for.
+Forwarded sends are batched, and written when ``flush`` or ``poll`` is
+called, or when ``batch_size`` sends are pending.
+
+Signals received from the peer are sent with the bridge itself as the
+sender, so receivers may connect to a particular bridge, or to ``Any``
+sender.  Sends from a bridge are not forwarded back through it, but
+are forwarded through other bridges, so a process with several bridges
+acts as a hub.  Sends made with ``send_minimal`` do not tell the
+forwarding receiver their signal, so they are not forwarded.
+
+Positional arguments, named arguments and signals must be picklable.
+"""
+
+import select
+import socket
+import struct
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from louie import dispatcher
+from louie import error
+
+
+DEFAULT_BATCH_SIZE = 256
+
+_LENGTH = struct.Struct('!I')
+
+
+class SocketChannel(object):
+    """Message framing over a stream socket, with the subset of the
+    ``multiprocessing`` connection interface used by ``Bridge``."""
+
+    def __init__(self, sock):
+        self.socket = sock
+        self.buffer = ''
+
+    def fileno(self):
+        return self.socket.fileno()
+
+    def send_bytes(self, data):
+        self.socket.sendall(_LENGTH.pack(len(data)) + data)
+
+    def _fill(self, size):
+        while len(self.buffer) < size:
+            data = self.socket.recv(max(65536, size - len(self.buffer)))
+            if not data:
+                raise EOFError
+            self.buffer += data
+
+    def recv_bytes(self):
+        self._fill(_LENGTH.size)
+        length, = _LENGTH.unpack(self.buffer[:_LENGTH.size])
+        self._fill(_LENGTH.size + length)
+        data = self.buffer[_LENGTH.size:_LENGTH.size + length]
+        self.buffer = self.buffer[_LENGTH.size + length:]
+        return data
+
+    def poll(self, timeout=0.0):
+        if self.buffer:
+            return True
+        return bool(select.select([self.socket], [], [], timeout)[0])
+
+    def close(self):
+        self.socket.close()
+
+
+class Bridge(object):
+    """Forwards signals to and from a peer process.
+
+    - ``channel``: A ``multiprocessing`` connection, or a connected
+      stream socket.
+
+    - ``batch_size``: Number of pending forwarded sends which causes
+      an automatic ``flush``.
+    """
+
+    def __init__(self, channel, batch_size=DEFAULT_BATCH_SIZE):
+        if not hasattr(channel, 'send_bytes'):
+            channel = SocketChannel(channel)
+        self.channel = channel
+        self.batch_size = batch_size
+        # Messages waiting for the next flush.
+        self.pending = []
+        # Signals local receivers are connected to, as last told to the
+        # peer.
+        self.local_signals = set()
+        # Signals the peer's receivers are connected to.
+        self.remote_signals = set()
+        # Result of ``subscriptions``, and the generation of the
+        # connections it was computed for.
+        self.signals = None
+        self.generation = None
+
+    def fileno(self):
+        return self.channel.fileno()
+
+    def _forward(self, *arguments, **named):
+        """Receiver connected for signals the peer subscribes to."""
+        signal = named.pop('signal', None)
+        sender = named.pop('sender', None)
+        if signal is None or sender is None:
+            # Sent with ``send_minimal``.
+            return
+        if sender is self:
+            # Received from the peer; don't echo it back.
+            return
+        self.pending.append(('send', signal, arguments, named))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def subscriptions(self):
+        """Return the set of signals local receivers are connected to,
+        other than this bridge's forwarding receiver."""
+        current = dispatcher.generation
+        if self.generation == current:
+            return self.signals
+        signals = set()
+        for senderkey, table in dispatcher.connections.items():
+            for signal, receivers in table.items():
+                if signal in signals:
+                    continue
+                for receiver in dispatcher.live_receivers(receivers):
+                    if getattr(receiver, 'im_self', None) is not self:
+                        signals.add(signal)
+                        break
+        self.signals = signals
+        self.generation = current
+        return signals
+
+    def _update_subscriptions(self):
+        current = self.subscriptions()
+        for signal in current - self.local_signals:
+            self.pending.append(('subscribe', signal))
+        for signal in self.local_signals - current:
+            self.pending.append(('unsubscribe', signal))
+        self.local_signals = current
+
+    def flush(self):
+        """Write pending messages to the peer, as one batch."""
+        if self.pending:
+            batch, self.pending = self.pending, []
+            self.channel.send_bytes(pickle.dumps(batch, 2))
+
+    def poll(self, timeout=0.0):
+        """Tell the peer about changed subscriptions, flush forwarded
+        sends, then send signals received from the peer.
+
+        Waits up to ``timeout`` seconds for the first batch from the
+        peer.  Returns the number of signals sent.
+
+        Raises ``EOFError`` if the peer has closed the connection.
+        """
+        self._update_subscriptions()
+        self.flush()
+        count = 0
+        while self.channel.poll(timeout):
+            timeout = 0.0
+            batch = pickle.loads(self.channel.recv_bytes())
+            for message in batch:
+                kind = message[0]
+                if kind == 'send':
+                    kind, signal, arguments, named = message
+                    dispatcher.send(signal, self, *arguments, **named)
+                    count += 1
+                elif kind == 'subscribe':
+                    self.remote_signals.add(message[1])
+                    dispatcher.connect(self._forward, message[1])
+                elif kind == 'unsubscribe':
+                    self.remote_signals.discard(message[1])
+                    try:
+                        dispatcher.disconnect(self._forward, message[1])
+                    except error.DispatcherKeyError:
+                        pass
+        return count
+
+    def close(self):
+        """Flush, disconnect the forwarding receiver and close the
+        channel."""
+        try:
+            self.flush()
+        finally:
+            for signal in self.remote_signals:
+                try:
+                    dispatcher.disconnect(self._forward, signal)
+                except error.DispatcherKeyError:
+                    pass
+            self.remote_signals = set()
+            self.channel.close()
+
+
+def unix_listener(path, backlog=5):
+    """Return a socket listening on the Unix domain socket ``path``.
+
+    Use ``accept`` to create a ``Bridge`` for each peer connecting.
+    """
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(backlog)
+    return listener
+
+
+def accept(listener, batch_size=DEFAULT_BATCH_SIZE):
+    """Accept a connection on ``listener`` and return a ``Bridge``."""
+    sock, address = listener.accept()
+    return Bridge(sock, batch_size)
+
+
+def unix_bridge(path, batch_size=DEFAULT_BATCH_SIZE):
+    """Connect to the Unix domain socket ``path`` and return a
+    ``Bridge``."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(path)
+    return Bridge(sock, batch_size)
@@ -0,0 +1,293 @@
+"""Capture and replay of signal traffic.
+
+A ``Recorder`` captures the shape of the traffic going through Louie:
+for each send, the signal, the type of the sender, the set of keyword
+argument names, the number of receivers called, and timings.  Values
+of arguments are not recorded.  Install one with ``install_recorder``
+and call ``close`` when done::
+
+    recorder = louie.capture.Recorder('traffic.lcap')
+    louie.capture.install_recorder(recorder)
+    ...
+    louie.capture.remove_recorder(recorder)
+    recorder.close()
+
+``replay`` rebuilds a synthetic topology from a capture, with the
+recorded number of receivers accepting the recorded keyword arguments,
+then sends the recorded sequence as fast as possible.  It can also be
+run as a script::
+
+    python -m louie.capture traffic.lcap
+
+Signals and sender types are replayed using their string
+representations, except that ``Any`` and ``Anonymous`` senders are
+replayed as themselves.
+
+An error raised while recording a send, e.g. by the file, is printed
+and counted in the ``errors`` attribute of the recorder, and does not
+propagate to the sender.
+"""
+
+import keyword
+import re
+import struct
+import sys
+import time
+import traceback
+from timeit import default_timer as timer
+
+from louie import dispatcher
+from louie.sender import Any, Anonymous
+
+
+_MAGIC = 'LCAP'
+_VERSION = 2
+_HEADER = struct.Struct('<4sI')
+# Tag, index and length of an interned string.
+_STRING = struct.Struct('<cII')
+# Tag, signal index, sender type index, key set index, receivers,
+# offset from the start of the capture, duration.
+_EVENT = struct.Struct('<cIIIIdd')
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def install_recorder(recorder):
+    """Start capturing sends with ``recorder``."""
+    dispatcher.send_hooks.append(recorder)
+
+
+def remove_recorder(recorder):
+    """Stop capturing sends with ``recorder``."""
+    dispatcher.send_hooks.remove(recorder)
+
+
+class Recorder(object):
+    """Send hook writing a compact capture of each send to a file.
+
+    - ``file``: File name or writable binary file-like object.
+
+    - ``buffer_size``: Number of events buffered before writing.
+    """
+
+    def __init__(self, file, buffer_size=1024):
+        if isinstance(file, basestring):
+            file = open(file, 'wb')
+        self.file = file
+        self.buffer_size = buffer_size
+        self.buffer = [_HEADER.pack(_MAGIC, _VERSION)]
+        self.strings = {}
+        self.origin = None
+        self.events = 0
+        self.errors = 0
+
+    def __call__(self, signal, sender, arguments, named, responses, start,
+                 error):
+        try:
+            self._record(signal, sender, named, responses, start)
+        except Exception:
+            traceback.print_exc()
+            self.errors += 1
+
+    def _record(self, signal, sender, named, responses, start):
+        duration = time.time() - start
+        if self.origin is None:
+            self.origin = start
+        keys = named.keys()
+        keys.sort()
+        self.buffer.append(_EVENT.pack(
+            'E',
+            self._intern(str(signal)),
+            self._intern(_sender_type(sender)),
+            self._intern(','.join(keys)),
+            len(responses),
+            start - self.origin,
+            duration,
+            ))
+        self.events += 1
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def _intern(self, string):
+        index = self.strings.get(string)
+        if index is None:
+            index = self.strings[string] = len(self.strings)
+            self.buffer.append(_STRING.pack('S', index, len(string)))
+            self.buffer.append(string)
+        return index
+
+    def flush(self):
+        """Write buffered events to the file."""
+        self.file.write(''.join(self.buffer))
+        self.buffer = []
+        self.file.flush()
+
+    def close(self):
+        """Flush and close the file."""
+        self.flush()
+        self.file.close()
+
+
+class Event(object):
+    """A captured send."""
+
+    __slots__ = ('signal', 'sender_type', 'keys', 'receivers', 'offset',
+                 'duration')
+
+    def __init__(self, signal, sender_type, keys, receivers, offset,
+                 duration):
+        self.signal = signal
+        self.sender_type = sender_type
+        self.keys = keys
+        self.receivers = receivers
+        self.offset = offset
+        self.duration = duration
+
+
+def load(file):
+    """Return the list of ``Event`` objects captured in ``file``, which
+    may be a file name or a readable binary file-like object."""
+    if isinstance(file, basestring):
+        f = open(file, 'rb')
+        try:
+            data = f.read()
+        finally:
+            f.close()
+    else:
+        data = file.read()
+    magic, version = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError('Not a Louie capture file')
+    offset = _HEADER.size
+    strings = {}
+    events = []
+    while offset < len(data):
+        tag = data[offset]
+        if tag == 'S':
+            tag, index, length = _STRING.unpack_from(data, offset)
+            offset += _STRING.size
+            strings[index] = data[offset:offset + length]
+            offset += length
+        elif tag == 'E':
+            (tag, signal, sender_type, keys, receivers, start,
+             duration) = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            keys = strings[keys]
+            if keys:
+                keys = tuple(keys.split(','))
+            else:
+                keys = ()
+            events.append(Event(strings[signal], strings[sender_type], keys,
+                                receivers, start, duration))
+        else:
+            raise ValueError('Corrupt Louie capture file at %i' % offset)
+    return events
+
+
+def replay(events, send=None):
+    """Rebuild a synthetic topology for ``events`` and send them.
+
+    ``events`` is a list of ``Event`` objects, as returned by ``load``,
+    or a file to load them from.  ``send`` defaults to ``louie.send``.
+
+    Connections are made with strong references and removed
+    afterwards.  Returns a dictionary with the number of ``events``,
+    the total ``elapsed`` time, the ``throughput`` in events per second
+    and the ``recorded`` total duration of the captured sends.
+    """
+    if not isinstance(events, list):
+        events = load(events)
+    if send is None:
+        send = dispatcher.send
+    # Build the topology.
+    senders = {}
+    routes = {}
+    for event in events:
+        if event.sender_type not in senders:
+            senders[event.sender_type] = _make_sender(event.sender_type)
+        key = (event.signal, event.sender_type)
+        route = routes.get(key)
+        if route is None:
+            routes[key] = route = [0, {}]
+        route[0] = max(route[0], event.receivers)
+        for name in event.keys:
+            route[1][name] = True
+    connected = []
+    for (signal, sender_type), (count, names) in routes.iteritems():
+        sender = senders[sender_type]
+        for n in xrange(count):
+            receiver = _make_receiver(names.keys())
+            dispatcher.connect(receiver, signal, sender, weak=False)
+            connected.append((receiver, signal, sender))
+    # Prepare the sequence of calls so that replay only measures sends.
+    calls = []
+    for event in events:
+        calls.append((event.signal, senders[event.sender_type],
+                      dict.fromkeys(event.keys)))
+    try:
+        start = timer()
+        for signal, sender, named in calls:
+            send(signal, sender, **named)
+        elapsed = timer() - start
+    finally:
+        for receiver, signal, sender in connected:
+            dispatcher.disconnect(receiver, signal, sender, weak=False)
+    recorded = 0.0
+    for event in events:
+        recorded += event.duration
+    throughput = 0.0
+    if elapsed:
+        throughput = len(events) / elapsed
+    return {
+        'events': len(events),
+        'elapsed': elapsed,
+        'throughput': throughput,
+        'recorded': recorded,
+        }
+
+
+def _sender_type(sender):
+    if sender is Anonymous or sender is Any:
+        return sender.__name__
+    return sender.__class__.__name__
+
+
+def _make_sender(sender_type):
+    if sender_type == 'Anonymous':
+        return Anonymous
+    if sender_type == 'Any':
+        return Any
+    return type(sender_type, (object, ), {})()
+
+
+def _make_receiver(names):
+    """Return a new function accepting ``signal``, ``sender`` and the
+    keyword arguments in ``names``."""
+    parameters = ['signal=None', 'sender=None']
+    for name in names:
+        if not _IDENTIFIER.match(name) or keyword.iskeyword(name):
+            parameters = ['**named']
+            break
+        if name not in ('signal', 'sender'):
+            parameters.append('%s=None' % name)
+    namespace = {}
+    exec 'def receiver(%s):\n    pass\n' % ', '.join(parameters) in namespace
+    return namespace['receiver']
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if len(argv) != 1:
+        print >> sys.stderr, 'usage: python -m louie.capture FILE'
+        return 2
+    result = replay(argv[0])
+    print 'events:     %i' % result['events']
+    print 'elapsed:    %.6f s' % result['elapsed']
+    print 'throughput: %.0f events/s' % result['throughput']
+    print 'recorded:   %.6f s' % result['recorded']
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Columnar bulk sends.
+
+``send_columnar`` sends one signal for a batch of rows given as
+columns, e.g. NumPy arrays, with receivers looked up once for the
+whole batch::
+
+    @louie.vectorized
+    def store(timestamp, reading):
+        table.append(timestamp, reading)        # Whole arrays.
+
+    def check(reading):
+        if reading > LIMIT:                     # One value.
+            alarm()
+
+    louie.connect(store, 'readings', sensor)
+    louie.connect(check, 'readings', sensor)
+    louie.send_columnar('readings', sensor,
+                        timestamp=timestamps, reading=readings)
+
+Receivers marked with ``vectorized`` are called once, with the columns
+they accept.  Other receivers are called once per row, with the values
+of that row in the columns they accept, as though ``send`` had been
+called for each row.  Columns may be any sequences of equal length;
+NumPy arrays are converted to lists once for row-wise receivers, so
+these get Python scalars.
+
+Plugins wrap each receiver once per batch, and send hooks are notified
+once per batch, with the columns as named arguments.  Instrumentation
+only records calls to vectorized receivers.  Bulk sends made by
+receivers are queued by ``louie.trampoline`` like other sends.
+"""
+
+from louie import dispatcher
+from louie import robustapply
+from louie.sender import Anonymous
+
+
+def vectorized(receiver):
+    """Mark ``receiver`` as accepting whole columns in
+    ``send_columnar``.  Returns ``receiver``."""
+    receiver.louie_vectorized = True
+    return receiver
+
+
+def is_vectorized(receiver):
+    return getattr(receiver, 'louie_vectorized', False)
+
+
+def send_columnar(signal, sender=Anonymous, **columns):
+    """Send ``signal`` from ``sender`` once for each row of
+    ``columns``, a mapping of names to sequences of equal length.
+
+    Returns a list of tuple pairs ``[(receiver, response), ...]``,
+    where the response of a row-wise receiver is the list of its
+    responses to each row.
+    """
+    length = None
+    for name, column in columns.iteritems():
+        if length is None:
+            length = len(column)
+        elif len(column) != length:
+            raise ValueError(
+                'Column %r has length %i, expected %i'
+                % (name, len(column), length))
+    return dispatcher._send(send_columnar, dispatcher.get_all_receivers,
+                            _deliver, signal, sender, (), columns)
+
+
+def _deliver(receivers, apply, signal, sender, arguments, columns,
+             responses):
+    """Call vectorized ``receivers`` once, and others once per row."""
+    length = 0
+    for column in columns.itervalues():
+        length = len(column)
+        break
+    # Columns as lists, converted when first needed by a row-wise
+    # receiver.
+    rows = {}
+    for receiver in receivers:
+        original = receiver
+        for plugin in dispatcher.plugins:
+            receiver = plugin.wrap_receiver(receiver)
+        if is_vectorized(original):
+            response = apply(receiver, original, signal=signal,
+                             sender=sender, **columns)
+        else:
+            response = _apply_rows(receiver, original, signal, sender,
+                                   columns, rows, length)
+        responses.append((receiver, response))
+
+
+def _apply_rows(receiver, original, signal, sender, columns, rows, length):
+    """Call ``receiver`` for each row, with the columns ``original``
+    accepts, and return the list of responses."""
+    function, code, start = robustapply.function(original)
+    if code.co_flags & 8:
+        names = columns.keys()
+        fixed = {'signal': signal, 'sender': sender}
+    else:
+        names = []
+        fixed = {}
+        for name in code.co_varnames[start:code.co_argcount]:
+            if name == 'signal':
+                fixed['signal'] = signal
+            elif name == 'sender':
+                fixed['sender'] = sender
+            elif name in columns:
+                names.append(name)
+    values = []
+    for name in names:
+        column = rows.get(name)
+        if column is None:
+            column = columns[name]
+            if hasattr(column, 'tolist'):
+                column = column.tolist()
+            rows[name] = column
+        values.append(column)
+    result = []
+    append = result.append
+    if not names:
+        for index in xrange(length):
+            append(receiver(**fixed))
+        return result
+    for row in zip(*values):
+        named = dict(zip(names, row))
+        named.update(fixed)
+        append(receiver(**named))
+    return result
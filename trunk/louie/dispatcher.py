@@ -22,9 +22,43 @@ Internal attributes:
   deletion::
 
     { receiverkey (id) : [senderkey (id)...] }
+
+- ``scopes``: Thread-local storage of the active ``ConnectionGroup``
+  instances of each thread, each of which records the connections
+  made by that thread while it is active; see ``_scopes``.
+
+- ``all_routes``: Number of senderkeys in ``connections`` with
+  receivers for ``All`` signals.  Together with checking whether the
+  senderkey of ``Any`` is in ``connections``, this tells whether
+  sends may reach receivers other than those connected to their exact
+  sender and signal.
+
+- ``empty_routes``: Negative cache of sends known to have no
+  receivers::
+
+    { (senderkey (id), signal) : True }
+
+  Cleared by ``connect``, and when it reaches ``EMPTY_ROUTES_SIZE``
+  entries.
+
+- ``accepted_routes``: Cache of the argument names accepted by the
+  receivers of sends with ``louie.payload.Lazy`` arguments::
+
+    { (senderkey (id), signal, lookup function) : (generation, names) }
+
+  Entries of a previous ``generation`` are stale.  Cleared when it
+  reaches ``EMPTY_ROUTES_SIZE`` entries.
+
+- ``generation``: Incremented whenever connections are made or
+  removed, so that sends can tell whether a connection was made while
+  they looked up receivers, and ``PreparedSend`` handles whether their
+  receivers may have changed.
 """
 
 import os
+import sys
+import threading
+import time
 import weakref
 
 try:
@@ -33,8 +67,10 @@ except NameError:
     from sets import Set as set, ImmutableSet as frozenset
 
 from louie import error
+from louie import payload
 from louie import robustapply
 from louie import saferef
+from louie.adapter import Adapter
 from louie.sender import Any, Anonymous
 from louie.signal import All
 
@@ -60,25 +96,72 @@ if __debug__:
 
 WEAKREF_TYPES = (weakref.ReferenceType, saferef.BoundMethodWeakref)
 
+EMPTY_ROUTES_SIZE = 4096
+
 
 connections = {}
 senders = {}
 senders_back = {}
 plugins = []
+scopes = threading.local()
+all_routes = 0
+empty_routes = {}
+accepted_routes = {}
+generation = 0
+
+# Callable taking a signal and returning the function used to apply
+# each receiver for that signal, in place of ``robust_apply``.  Set by
+# ``louie.instrument`` while instrumentation is enabled.
+apply_hook = None
+
+# Callables notified after each send, e.g. ``louie.trace.Tracer``
+# instances, as ``hook(signal, sender, arguments, named, responses,
+# start, error)``, where ``start`` is the ``time.time()`` at which the
+# send began, and ``error`` is the error raised by the send, after
+# ``responses`` of the receivers called before it, or ``None``.  Hooks
+# must not modify their arguments, nor raise errors.
+send_hooks = []
+
+# ``louie.breaker.CircuitBreaker`` consulted by ``send_robust`` before
+# calling each receiver, if any.  Set by ``louie.breaker.enable``.
+circuit_breaker = None
+
+# ``louie.trampoline.Trampoline`` queuing sends made by receivers, if
+# any.  Set by ``louie.trampoline.enable``.
+trampoline = None
 
 def reset():
     """Reset the state of Louie.
 
-    Useful during unit testing.  Should be avoided otherwise.
+    Useful during unit testing.  Should be avoided otherwise.  Adapters
+    are closed, as though their receivers had been disconnected.
     """
-    global connections, senders, senders_back, plugins
+    global connections, senders, senders_back, plugins, scopes, all_routes, \
+           empty_routes, accepted_routes, generation, apply_hook, send_hooks, \
+           circuit_breaker, trampoline
+    previous = connections
     connections = {}
     senders = {}
     senders_back = {}
     plugins = []
+    scopes = threading.local()
+    all_routes = 0
+    empty_routes = {}
+    accepted_routes = {}
+    generation += 1
+    apply_hook = None
+    send_hooks = []
+    circuit_breaker = None
+    trampoline = None
+    for signals in previous.values():
+        for receivers in signals.values():
+            for receiver in receivers:
+                _close(receiver)
 
 
-def connect(receiver, signal=All, sender=Any, weak=True):
+def connect(receiver, signal=All, sender=Any, weak=True, throttle=None,
+            debounce=None, batch_size=None, max_delay=None, thread=None,
+            group=None, strategy=None, key=None):
     """Connect ``receiver`` to ``sender`` for ``signal``.
 
     - ``receiver``: A callable Python object which is to receive
@@ -125,13 +208,90 @@ def connect(receiver, signal=All, sender=Any, weak=True):
       the receiver objects.  If this parameter is ``False``, then strong
       references will be used.
 
+    - ``throttle``: If given, the receiver is called at most once per
+      ``throttle`` seconds; sends in between are not delivered to it.
+
+    - ``debounce``: If given, the receiver is called ``debounce``
+      seconds after the last of a burst of sends, with the arguments
+      of that send, when ``louie.timing.default_wheel`` is advanced.
+      Disconnecting the receiver cancels the pending call.
+
+    - ``batch_size``, ``max_delay``: If either is given, the receiver
+      is called with lists of events, each the named arguments of one
+      send, when ``batch_size`` are pending or ``max_delay`` seconds
+      after the first; see ``louie.batch``.
+
+    - ``thread``: If given, ``louie.affinity.current`` or a started
+      ``threading.Thread``, the receiver is only called on that thread;
+      sends from other threads post the call until the thread calls
+      ``louie.affinity.drain``.
+
+    - ``group``: If given, the name of a group of receivers of
+      ``signal`` from ``sender`` among which each send calls only one,
+      chosen by ``strategy``, ``louie.balance.ROUND_ROBIN`` by default;
+      ``key`` names the argument hashed by ``louie.balance.HASH``.  See
+      ``louie.balance``.
+
+    Only one of ``throttle``, ``debounce``, batching, ``thread`` and
+    ``group`` may be used.
+
     Returns ``None``, may raise ``DispatcherTypeError``.
     """
     if signal is None:
         raise error.DispatcherTypeError(
             'Signal cannot be None (receiver=%r sender=%r)'
             % (receiver, sender))
-    if weak:
+    batched = batch_size is not None or max_delay is not None
+    if (throttle is not None) + (debounce is not None) + batched \
+           + (thread is not None) + (group is not None) > 1:
+        raise error.DispatcherTypeError(
+            'Only one of throttle, debounce, batching, thread and group '
+            'may be used (receiver=%r)' % (receiver, ))
+    if group is None and (strategy is not None or key is not None):
+        raise error.DispatcherTypeError(
+            'Strategy and key are only used with group (receiver=%r)'
+            % (receiver, ))
+    # Reference to the receiver in the group it joins, if any, and
+    # whether that group was already connected.
+    member = None
+    joined = False
+    if throttle is not None:
+        from louie import timing
+        receiver = timing.Throttle(
+            receiver, throttle, weak, on_delete=_remove_receiver)
+    elif debounce is not None:
+        from louie import timing
+        receiver = timing.Debounce(
+            receiver, debounce, weak, on_delete=_remove_receiver)
+    elif batched:
+        from louie import batch
+        receiver = batch.Batch(
+            receiver, batch_size, max_delay, weak, on_delete=_remove_receiver)
+    elif thread is not None:
+        from louie import affinity
+        receiver = affinity.ThreadAffine(
+            receiver, affinity.inbox(thread), weak,
+            on_delete=_remove_receiver)
+    elif group is not None:
+        from louie import balance
+        existing = balance.find(
+            connections.get(id(sender), {}).get(signal, ()), group)
+        if existing is None:
+            if strategy is None:
+                strategy = balance.ROUND_ROBIN
+            existing = balance.ReceiverGroup(
+                group, strategy, key, on_delete=_remove_receiver)
+        elif (strategy is not None and strategy != existing.strategy) \
+                 or (key is not None and key != existing.key):
+            raise error.DispatcherTypeError(
+                'Group %r is connected with strategy %r and key %r '
+                '(receiver=%r)'
+                % (group, existing.strategy, existing.key, receiver))
+        else:
+            joined = True
+        member = existing.add(receiver, weak)
+        receiver = existing
+    elif weak:
         receiver = saferef.safe_ref(receiver, on_delete=_remove_receiver)
     senderkey = id(sender)
     if connections.has_key(senderkey):
@@ -155,9 +315,13 @@ def connect(receiver, signal=All, sender=Any, weak=True):
     # this receiver in the set, including back-references
     if signals.has_key(signal):
         receivers = signals[signal]
-        _remove_old_back_refs(senderkey, signal, receiver, receivers)
+        if not joined:
+            _remove_old_back_refs(senderkey, signal, receiver, receivers)
     else:
         receivers = signals[signal] = []
+        if signal is All:
+            global all_routes
+            all_routes += 1
     try:
         current = senders_back.get(receiver_id)
         if current is None:
@@ -166,14 +330,30 @@ def connect(receiver, signal=All, sender=Any, weak=True):
             current.append(senderkey)
     except:
         pass
-    receivers.append(receiver)
+    if not joined:
+        receivers.append(receiver)
+    # Record the connection in active connection groups, with the
+    # member of a receiver group so that only it is disconnected.
+    active = getattr(scopes, 'groups', None)
+    if active:
+        if member is None:
+            record = (senderkey, signal, receiver)
+        else:
+            record = (senderkey, signal, receiver, member)
+        for scope in active:
+            scope.records.append(record)
+    # Sends which had no receivers may now have some.
+    global generation
+    generation += 1
+    if empty_routes:
+        empty_routes.clear()
     # Update stats.
     if __debug__:
         global connects
         connects += 1
 
 
-def disconnect(receiver, signal=All, sender=Any, weak=True):
+def disconnect(receiver, signal=All, sender=Any, weak=True, group=None):
     """Disconnect ``receiver`` from ``sender`` for ``signal``.
 
     - ``receiver``: The registered receiver to disconnect.
@@ -184,6 +364,10 @@ def disconnect(receiver, signal=All, sender=Any, weak=True):
     
     - ``weak``: The weakref state to disconnect.
 
+    - ``group``: The name of the receiver group to remove ``receiver``
+      from, if it was connected with one.  The group is disconnected
+      with its last member.
+
     ``disconnect`` reverses the process of ``connect``, the semantics for
     the individual elements are logically equivalent to a tuple of
     ``(receiver, signal, sender, weak)`` used as a key to be deleted
@@ -202,7 +386,7 @@ def disconnect(receiver, signal=All, sender=Any, weak=True):
         raise error.DispatcherTypeError(
             'Signal cannot be None (receiver=%r sender=%r)'
             % (receiver, sender))
-    if weak:
+    if weak and group is None:
         receiver = saferef.safe_ref(receiver)
     senderkey = id(sender)
     try:
@@ -213,14 +397,24 @@ def disconnect(receiver, signal=All, sender=Any, weak=True):
             'No receivers found for signal %r from sender %r' 
             % (signal, sender)
             )
-    try:
-        # also removes from receivers
-        _remove_old_back_refs(senderkey, signal, receiver, receivers)
-    except ValueError:
-        raise error.DispatcherKeyError(
-            'No connection to receiver %s for signal %s from sender %s'
-            % (receiver, signal, sender)
-            )
+    if group is not None:
+        from louie import balance
+        members = balance.find(receivers, group)
+        if members is None or not members.remove(receiver):
+            raise error.DispatcherKeyError(
+                'No connection to receiver %s in group %r for signal %s '
+                'from sender %s' % (receiver, group, signal, sender))
+        if not members:
+            _remove_old_back_refs(senderkey, signal, members, receivers)
+    else:
+        try:
+            # also removes from receivers
+            _remove_old_back_refs(senderkey, signal, receiver, receivers)
+        except ValueError:
+            raise error.DispatcherKeyError(
+                'No connection to receiver %s for signal %s from sender %s'
+                % (receiver, signal, sender)
+                )
     _cleanup_connections(senderkey, signal)
     # Update stats.
     if __debug__:
@@ -228,6 +422,80 @@ def disconnect(receiver, signal=All, sender=Any, weak=True):
         disconnects += 1
 
 
+def _scopes():
+    """Return the list of active ``ConnectionGroup`` instances of the
+    calling thread."""
+    groups = getattr(scopes, 'groups', None)
+    if groups is None:
+        scopes.groups = groups = []
+    return groups
+
+
+def _disconnect_all(records):
+    """Remove many connections at once.
+
+    ``records`` is a sequence of ``(senderkey, signal, receiver)``
+    tuples, where ``receiver`` is the object ``connect`` stored in the
+    routing tables (i.e. the weak reference, if one was used), or of
+    ``(senderkey, signal, group, member)`` tuples, where ``member`` is
+    the reference to a receiver in the ``louie.balance.ReceiverGroup``
+    ``group``, which is only disconnected with its last member.
+    Receivers are matched by identity, and records for connections
+    that no longer exist are ignored.
+
+    Each affected ``(senderkey, signal)`` receiver list is rebuilt
+    once, rather than once per connection as with ``disconnect``.
+
+    Returns the number of connections removed.
+    """
+    routes = {}
+    count = 0
+    for record in records:
+        if len(record) == 4:
+            senderkey, signal, receiver, member = record
+            if not receiver.discard(member):
+                continue
+            if receiver:
+                # Other members remain connected.
+                count += 1
+                continue
+        else:
+            senderkey, signal, receiver = record
+        routes.setdefault((senderkey, signal), {})[id(receiver)] = receiver
+    removed = {}
+    for (senderkey, signal), doomed in routes.iteritems():
+        try:
+            receivers = connections[senderkey][signal]
+        except KeyError:
+            continue
+        kept = []
+        for receiver in receivers:
+            if doomed.get(id(receiver)) is receiver:
+                removed.setdefault(senderkey, []).append(receiver)
+                _close(receiver)
+            else:
+                kept.append(receiver)
+        count += len(receivers) - len(kept)
+        receivers[:] = kept
+    # Kill back references of receivers no longer connected to a
+    # sender for any signal.
+    for senderkey, gone in removed.iteritems():
+        remaining = {}
+        for receivers in connections[senderkey].itervalues():
+            for receiver in receivers:
+                remaining[id(receiver)] = True
+        for receiver in gone:
+            if id(receiver) not in remaining:
+                _kill_back_ref(receiver, senderkey)
+    for senderkey, signal in routes:
+        _cleanup_connections(senderkey, signal)
+    # Update stats.
+    if __debug__:
+        global disconnects
+        disconnects += count
+    return count
+
+
 def get_receivers(sender=Any, signal=All):
     """Get list of receivers from global tables.
 
@@ -248,6 +516,60 @@ def get_receivers(sender=Any, signal=All):
         return []
 
 
+def receiver_count(signal=All, sender=Anonymous):
+    """Return the number of connections through which ``send`` would
+    call receivers for ``signal`` from ``sender``.
+
+    Connections to ``signal`` or ``All`` signals, from ``sender`` or
+    ``Any`` sender, are counted, in constant time.  A receiver
+    connected through more than one of these, e.g. both to ``sender``
+    and to ``Any``, is counted once for each.  Plugins are not
+    consulted, so receivers they would skip are counted.
+    """
+    count = 0
+    signals = connections.get(id(sender))
+    if signals is not None:
+        receivers = signals.get(signal)
+        if receivers:
+            count += len(receivers)
+        if all_routes and signal is not All:
+            receivers = signals.get(All)
+            if receivers:
+                count += len(receivers)
+    if sender is not Any:
+        signals = connections.get(id(Any))
+        if signals is not None:
+            receivers = signals.get(signal)
+            if receivers:
+                count += len(receivers)
+            if signal is not All:
+                receivers = signals.get(All)
+                if receivers:
+                    count += len(receivers)
+    return count
+
+
+def has_receivers(signal=All, sender=Anonymous):
+    """Return whether ``send`` would call any receivers for ``signal``
+    from ``sender``, in constant time.
+
+    Publishers may use this to skip building arguments which nobody
+    would receive.  Plugins are not consulted.
+    """
+    signals = connections.get(id(sender))
+    if signals is not None:
+        if signals.has_key(signal):
+            return True
+        if all_routes and signals.has_key(All):
+            return True
+    if sender is not Any:
+        signals = connections.get(id(Any))
+        if signals is not None:
+            if signals.has_key(signal) or signals.has_key(All):
+                return True
+    return False
+
+
 def live_receivers(receivers):
     """Filter sequence of receivers to get resolved, live receivers.
 
@@ -324,23 +646,106 @@ def send(signal=All, sender=Anonymous, *arguments, **named):
 
     - ``named``: Named arguments which will be filtered according to the
       parameters of the receivers to only provide those acceptable to
-      the receiver.
+      the receiver.  Values wrapped with ``louie.lazy`` are only
+      computed if a receiver accepts them.
 
     Return a list of tuple pairs ``[(receiver, response), ...]``
 
     If any receiver raises an error, the error propagates back through
     send, terminating the dispatch loop, so it is quite possible to
     not have all receivers called if a raises an error.
+
+    While ``louie.trampoline`` is enabled, sends made by receivers are
+    queued until the outermost send returns, and return an empty list.
+    """
+    global sends
+    responses = _send(send, get_all_receivers, _deliver, signal, sender,
+                      arguments, named)
+    # Update stats.
+    if __debug__:
+        sends += 1
+    return responses
+
+
+def _send(function, lookup, deliver, signal, sender, arguments, named):
+    """Carry out a send made with the send ``function``.
+
+    ``deliver(receivers, apply, signal, sender, arguments, named,
+    responses)`` calls the live receivers found by ``lookup(sender,
+    signal)`` using ``apply``, and appends their responses.  The send
+    functions only differ in these.
     """
+    if trampoline is not None:
+        responses = trampoline.intercept(function, signal, sender,
+                                         arguments, named)
+        if responses is not None:
+            return responses
+    if (id(sender), signal) in empty_routes:
+        # Known to have no receivers.
+        if send_hooks:
+            start = time.time()
+            if named and payload.has_lazy(named):
+                named = payload.resolve(named, ())
+            for hook in send_hooks:
+                hook(signal, sender, arguments, named, [], start, None)
+        return []
     # Call each receiver with whatever arguments it can accept.
     # Return a list of tuple pairs [(receiver, response), ... ].
+    start = None
+    if send_hooks:
+        start = time.time()
+    apply = robustapply.robust_apply
+    if apply_hook is not None:
+        apply = apply_hook(signal)
     responses = []
-    for receiver in live_receivers(get_all_receivers(sender, signal)):
+    try:
+        receivers = live_receivers(lookup(sender, signal))
+        if named and payload.has_lazy(named):
+            receivers = list(receivers)
+            accepted = _accepted_names(signal, sender, receivers, lookup)
+            if function is send_robust:
+                try:
+                    named = payload.resolve(named, accepted)
+                except Exception, err:
+                    # Not calling any receiver.
+                    for receiver in receivers:
+                        responses.append((receiver, err))
+                    receivers = ()
+                    named = payload.resolve(named, ())
+            else:
+                named = payload.resolve(named, accepted)
+        deliver(receivers, apply, signal, sender, arguments, named,
+                responses)
+    except:
+        if start is None:
+            raise
+        _send_failed(signal, sender, arguments, named, responses, start)
+    if not responses:
+        _remember_empty(signal, sender)
+    if start is not None:
+        for hook in send_hooks:
+            hook(signal, sender, arguments, named, responses, start, None)
+    return responses
+
+
+def _send_failed(signal, sender, arguments, named, responses, start):
+    """Notify send hooks of the error being handled, then raise it
+    again."""
+    info = sys.exc_info()
+    for hook in send_hooks:
+        hook(signal, sender, arguments, named, responses, start, info[1])
+    raise info[0], info[1], info[2]
+
+
+def _deliver(receivers, apply, signal, sender, arguments, named, responses):
+    """Call ``receivers`` with ``signal`` and ``sender`` arguments, for
+    ``send`` and ``send_exact``."""
+    for receiver in receivers:
         # Wrap receiver using installed plugins.
         original = receiver
         for plugin in plugins:
             receiver = plugin.wrap_receiver(receiver)
-        response = robustapply.robust_apply(
+        response = apply(
             receiver, original,
             signal=signal,
             sender=sender,
@@ -348,35 +753,35 @@ def send(signal=All, sender=Anonymous, *arguments, **named):
             **named
             )
         responses.append((receiver, response))
+
+
+def send_minimal(signal=All, sender=Anonymous, *arguments, **named):
+    """Like ``send``, but does not attach ``signal`` and ``sender``
+    arguments to the call to the receiver."""
+    global sends
+    responses = _send(send_minimal, get_all_receivers, _deliver_minimal,
+                      signal, sender, arguments, named)
     # Update stats.
     if __debug__:
-        global sends
         sends += 1
     return responses
 
 
-def send_minimal(signal=All, sender=Anonymous, *arguments, **named):
-    """Like ``send``, but does not attach ``signal`` and ``sender``
-    arguments to the call to the receiver."""
-    # Call each receiver with whatever arguments it can accept.
-    # Return a list of tuple pairs [(receiver, response), ... ].
-    responses = []
-    for receiver in live_receivers(get_all_receivers(sender, signal)):
+def _deliver_minimal(receivers, apply, signal, sender, arguments, named,
+                     responses):
+    """Call ``receivers`` without ``signal`` and ``sender`` arguments,
+    for ``send_minimal``."""
+    for receiver in receivers:
         # Wrap receiver using installed plugins.
         original = receiver
         for plugin in plugins:
             receiver = plugin.wrap_receiver(receiver)
-        response = robustapply.robust_apply(
+        response = apply(
             receiver, original,
             *arguments,
             **named
             )
         responses.append((receiver, response))
-    # Update stats.
-    if __debug__:
-        global sends
-        sends += 1
-    return responses
 
 
 def send_exact(signal=All, sender=Anonymous, *arguments, **named):
@@ -386,22 +791,9 @@ def send_exact(signal=All, sender=Anonymous, *arguments, **named):
     handlers, sending only to those receivers explicitly registered
     for a particular signal on a particular sender.
     """
-    responses = []
-    for receiver in live_receivers(get_receivers(sender, signal)):
-        # Wrap receiver using installed plugins.
-        original = receiver
-        for plugin in plugins:
-            receiver = plugin.wrap_receiver(receiver)
-        response = robustapply.robust_apply(
-            receiver, original,
-            signal=signal,
-            sender=sender,
-            *arguments,
-            **named
-            )
-        responses.append((receiver, response))
-    return responses
-    
+    return _send(send_exact, get_receivers, _deliver, signal, sender,
+                 arguments, named)
+
 
 def send_robust(signal=All, sender=Anonymous, *arguments, **named):
     """Send ``signal`` from ``sender`` to all connected receivers catching
@@ -435,16 +827,35 @@ def send_robust(signal=All, sender=Anonymous, *arguments, **named):
     If any receiver raises an error (specifically, any subclass of
     ``Exception``), the error instance is returned as the result for
     that receiver.
+
+    If a ``louie.breaker`` circuit breaker is enabled, receivers which
+    have failed repeatedly are skipped, with a ``CircuitOpenError``
+    instance as their result.
+
+    If computing a ``louie.lazy`` argument raises an error, no receiver
+    is called, and the error instance is returned as the result for
+    each of them.
     """
-    # Call each receiver with whatever arguments it can accept.
-    # Return a list of tuple pairs [(receiver, response), ... ].
-    responses = []
-    for receiver in live_receivers(get_all_receivers(sender, signal)):
+    return _send(send_robust, get_all_receivers, _deliver_robust, signal,
+                 sender, arguments, named)
+
+
+def _deliver_robust(receivers, apply, signal, sender, arguments, named,
+                    responses):
+    """Call ``receivers``, catching their errors and consulting the
+    circuit breaker, for ``send_robust``."""
+    breaker = circuit_breaker
+    for receiver in receivers:
         original = receiver
+        if breaker is not None:
+            err = breaker.check(original)
+            if err is not None:
+                responses.append((receiver, err))
+                continue
         for plugin in plugins:
             receiver = plugin.wrap_receiver(receiver)
         try:
-            response = robustapply.robust_apply(
+            response = apply(
                 receiver, original,
                 signal=signal,
                 sender=sender,
@@ -453,9 +864,154 @@ def send_robust(signal=All, sender=Anonymous, *arguments, **named):
                 )
         except Exception, err:
             responses.append((receiver, err))
+            if breaker is not None:
+                breaker.failed(original, err)
         else:
             responses.append((receiver, response))
-    return responses
+            if breaker is not None:
+                breaker.succeeded(original)
+
+
+def prepare(signal=All, sender=Anonymous):
+    """Return a ``PreparedSend`` handle sending ``signal`` from
+    ``sender``."""
+    return PreparedSend(signal, sender)
+
+
+class PreparedSend(object):
+    """Callable sending one signal from one sender, for senders which
+    send it many times.
+
+    Calling the handle with named arguments is equivalent to calling
+    ``send(signal, sender, **named)``, and returns the same responses.
+    The receivers and the names of the arguments each one accepts are
+    looked up on the first call, and again only after connections have
+    been made or removed, so each call skips the routing tables and
+    signature inspection of ``send``.
+
+    While plugins, send hooks, instrumentation or a circuit breaker
+    are installed, calls fall back to ``send``.
+
+    The handle holds a strong reference to ``sender``.
+    """
+
+    def __init__(self, signal, sender):
+        self.signal = signal
+        self.sender = sender
+        self.generation = None
+        # Names accepted by any receiver, or None if any takes **kw.
+        self.accepted = None
+        # [(weak reference or None, receiver or None, names or None,
+        #   named arguments passed to every call, whether the receiver
+        #   is an adapter or group which may die)]
+        self.plan = None
+
+    def _resolve(self):
+        current = generation
+        signal = self.signal
+        sender = self.sender
+        plan = []
+        live = []
+        for receiver in get_all_receivers(sender, signal):
+            reference = None
+            if isinstance(receiver, WEAKREF_TYPES):
+                reference = receiver
+                receiver = reference()
+                if receiver is None:
+                    continue
+            live.append(receiver)
+            function, code, start = robustapply.function(receiver)
+            base = {}
+            if code.co_flags & 8:
+                names = None
+                base['signal'] = signal
+                base['sender'] = sender
+            else:
+                names = []
+                for name in code.co_varnames[start:code.co_argcount]:
+                    if name == 'signal':
+                        base['signal'] = signal
+                    elif name == 'sender':
+                        base['sender'] = sender
+                    else:
+                        names.append(name)
+            forwards = getattr(receiver, '_louie_forwards', False)
+            if reference is not None:
+                receiver = None
+            plan.append((reference, receiver, names, base, forwards))
+        self.plan = plan
+        self.accepted = payload.accepted_names(live)
+        self.generation = current
+        return plan
+
+    def __call__(self, **named):
+        if plugins or send_hooks or apply_hook is not None \
+               or circuit_breaker is not None or trampoline is not None:
+            return send(self.signal, self.sender, **named)
+        plan = self.plan
+        if self.generation != generation:
+            plan = self._resolve()
+        if named and payload.has_lazy(named):
+            named = payload.resolve(named, self.accepted)
+        responses = []
+        for reference, receiver, names, base, forwards in plan:
+            if reference is not None:
+                receiver = reference()
+                if receiver is None:
+                    continue
+            elif forwards and not receiver:
+                # Its receiver or members were garbage-collected.
+                continue
+            if names is None:
+                arguments = named.copy()
+                arguments.update(base)
+            else:
+                arguments = base.copy()
+                for name in names:
+                    if name in named:
+                        arguments[name] = named[name]
+            responses.append((receiver, receiver(**arguments)))
+        # Update stats.
+        if __debug__:
+            global sends
+            sends += 1
+        return responses
+
+
+def _remember_empty(signal, sender):
+    """Add ``(sender, signal)`` to ``empty_routes`` if no receivers are
+    connected for it."""
+    current = generation
+    if has_receivers(signal, sender):
+        return
+    if len(empty_routes) >= EMPTY_ROUTES_SIZE:
+        empty_routes.clear()
+    empty_routes[(id(sender), signal)] = True
+    if generation != current:
+        # A connection was made meanwhile, by another thread.
+        empty_routes.clear()
+
+
+def _accepted_names(signal, sender, receivers, lookup):
+    """Return ``payload.accepted_names(receivers)`` for the receivers of
+    ``signal`` from ``sender`` found by ``lookup``, cached until
+    connections change."""
+    key = (id(sender), signal, lookup)
+    current = generation
+    cached = accepted_routes.get(key)
+    if cached is not None and cached[0] == current:
+        return cached[1]
+    names = payload.accepted_names(receivers)
+    if len(accepted_routes) >= EMPTY_ROUTES_SIZE:
+        accepted_routes.clear()
+    accepted_routes[key] = (current, names)
+    return names
+
+
+def _close(receiver):
+    """Close ``receiver`` if it is an adapter, once disconnected."""
+    if isinstance(receiver, Adapter):
+        receiver.close()
 
 
 def _remove_receiver(receiver):
@@ -490,6 +1046,9 @@ def _remove_receiver(receiver):
 def _cleanup_connections(senderkey, signal):
     """Delete empty signals for ``senderkey``. Delete ``senderkey`` if
     empty."""
+    # Called whenever receivers have been removed.
+    global generation
+    generation += 1
     try:
         receivers = connections[senderkey][signal]
     except:
@@ -503,6 +1062,9 @@ def _cleanup_connections(senderkey, signal):
                 pass
             else:
                 del signals[signal]
+                if signal is All:
+                    global all_routes
+                    all_routes -= 1
                 if not signals:
                     # No more signal connections. Therefore, remove the sender.
                     _remove_sender(senderkey)
@@ -510,11 +1072,20 @@ def _cleanup_connections(senderkey, signal):
 
 def _remove_sender(senderkey):
     """Remove ``senderkey`` from connections."""
+    global generation
+    generation += 1
     _remove_back_refs(senderkey)
     try:
-        del connections[senderkey]
+        signals = connections.pop(senderkey)
     except KeyError:
         pass
+    else:
+        if signals.has_key(All):
+            global all_routes
+            all_routes -= 1
+        for receivers in signals.itervalues():
+            for receiver in receivers:
+                _close(receiver)
     # Senderkey will only be in senders dictionary if sender 
     # could be weakly referenced.
     try:
@@ -552,6 +1123,7 @@ def _remove_old_back_refs(senderkey, signal, receiver, receivers):
     else:
         old_receiver = receivers[index]
         del receivers[index]
+        _close(old_receiver)
         found = 0
         signals = connections.get(signal)
         if signals is not None:
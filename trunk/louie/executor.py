@@ -0,0 +1,211 @@
+"""Parallel dispatch preserving the order of each sender's signals.
+
+A ``PartitionedExecutor`` carries out sends on a pool of worker
+threads.  Sends from the same sender are carried out one at a time,
+in the order they were made, while sends from different senders may be
+carried out in parallel::
+
+    executor = louie.executor.PartitionedExecutor(workers=4)
+    executor.send('order_updated', order, status='paid')
+    ...
+    executor.close()
+
+Each send is assigned to one of ``partitions`` queues by hashing its
+key, ``id(sender)`` by default or the result of the ``key`` function
+called with the sender.  Each partition belongs to a worker, and is
+only ever processed by one worker at a time.  A worker with no pending
+partitions of its own steals a whole partition waiting for another
+busy worker, so that uneven loads are spread across the pool without
+reordering the sends of a partition.
+
+An error raised by a receiver is printed, counted in ``errors``, and
+does not stop the worker.  Use ``send=louie.send_robust`` to collect
+errors as responses instead, which are otherwise discarded.
+"""
+
+import threading
+import traceback
+from collections import deque
+
+from louie import dispatcher
+from louie.sender import Anonymous
+from louie.signal import All
+
+
+DEFAULT_WORKERS = 4
+
+# Partitions per worker, by default.
+PARTITION_FACTOR = 8
+
+
+class Partition(object):
+    """Pending sends with the same key hash.
+
+    - ``scheduled``: Whether the partition is in a ready queue or being
+      processed by a worker.
+    """
+
+    __slots__ = ('index', 'home', 'sends', 'scheduled')
+
+    def __init__(self, index, home):
+        self.index = index
+        self.home = home
+        self.sends = deque()
+        self.scheduled = False
+
+
+class PartitionedExecutor(object):
+    """Carries out sends on ``workers`` threads, preserving the order
+    of sends with the same key.
+
+    - ``partitions``: Number of partitions, by default
+      ``PARTITION_FACTOR`` per worker.
+
+    - ``key``: Function returning the key of a sender, or ``None`` to
+      use ``id(sender)``.
+
+    - ``send``: Function carrying out each send, ``louie.send`` by
+      default.
+
+    Metrics are kept in the ``submitted``, ``delivered``, ``stolen``
+    and ``errors`` attributes.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, partitions=None, key=None,
+                 send=None):
+        if workers < 1:
+            raise ValueError('Number of workers must be positive')
+        if partitions is None:
+            partitions = workers * PARTITION_FACTOR
+        if partitions < workers:
+            raise ValueError('Need at least one partition per worker')
+        if send is None:
+            send = dispatcher.send
+        self.key = key
+        self.function = send
+        self.partitions = [Partition(index, index % workers)
+                           for index in xrange(partitions)]
+        # Ready partitions of each worker.
+        self.ready = [deque() for index in xrange(workers)]
+        self.condition = threading.Condition()
+        self.pending = 0
+        self.closed = False
+        self.submitted = 0
+        self.delivered = 0
+        self.stolen = 0
+        self.errors = 0
+        self.threads = []
+        for index in xrange(workers):
+            thread = threading.Thread(target=self._run, args=(index, ))
+            thread.setDaemon(True)
+            thread.start()
+            self.threads.append(thread)
+
+    def partition(self, sender):
+        """Return the ``Partition`` of sends from ``sender``."""
+        if self.key is None:
+            value = id(sender)
+        else:
+            value = hash(self.key(sender))
+        # Mix the bits, since ids of objects are aligned.
+        value ^= (value >> 4) ^ (value >> 12)
+        return self.partitions[value % len(self.partitions)]
+
+    def send(self, signal=All, sender=Anonymous, *arguments, **named):
+        """Queue a send of ``signal`` from ``sender``, to be carried out
+        after the sends queued before it with the same key."""
+        partition = self.partition(sender)
+        condition = self.condition
+        condition.acquire()
+        try:
+            if self.closed:
+                raise RuntimeError('Executor is closed')
+            partition.sends.append((signal, sender, arguments, named))
+            self.submitted += 1
+            self.pending += 1
+            if not partition.scheduled:
+                partition.scheduled = True
+                self.ready[partition.home].append(partition)
+                condition.notifyAll()
+        finally:
+            condition.release()
+
+    def _take(self, index):
+        """Return a ready partition for worker ``index``, stealing one
+        from the worker with the most if it has none, or ``None``.
+        Called with the lock acquired."""
+        ready = self.ready[index]
+        if ready:
+            return ready.popleft()
+        victim = None
+        for other in self.ready:
+            if other and (victim is None or len(other) > len(victim)):
+                victim = other
+        if victim is None:
+            return None
+        self.stolen += 1
+        return victim.pop()
+
+    def _run(self, index):
+        condition = self.condition
+        function = self.function
+        while True:
+            condition.acquire()
+            try:
+                partition = self._take(index)
+                while partition is None:
+                    if self.closed and not self.pending:
+                        return
+                    condition.wait()
+                    partition = self._take(index)
+                sends = partition.sends
+                partition.sends = deque()
+            finally:
+                condition.release()
+            delivered = errors = 0
+            for signal, sender, arguments, named in sends:
+                try:
+                    function(signal, sender, *arguments, **named)
+                except Exception:
+                    traceback.print_exc()
+                    errors += 1
+                delivered += 1
+            condition.acquire()
+            try:
+                self.delivered += delivered
+                self.errors += errors
+                self.pending -= delivered
+                if partition.sends:
+                    # More sends arrived meanwhile; let other
+                    # partitions go first.
+                    self.ready[index].append(partition)
+                else:
+                    partition.scheduled = False
+                condition.notifyAll()
+            finally:
+                condition.release()
+
+    def join(self):
+        """Wait until all queued sends have been carried out."""
+        condition = self.condition
+        condition.acquire()
+        try:
+            while self.pending:
+                condition.wait()
+        finally:
+            condition.release()
+
+    def close(self):
+        """Carry out the queued sends, then stop the worker threads."""
+        condition = self.condition
+        condition.acquire()
+        try:
+            self.closed = True
+            condition.notifyAll()
+        finally:
+            condition.release()
+        current = threading.currentThread()
+        for thread in self.threads:
+            if thread is not current:
+                thread.join()
+        self.threads = []
@@ -0,0 +1,86 @@
+"""Connection groups.
+
+A ``ConnectionGroup`` records connections so that they can later be
+removed together, e.g. when tearing down a user interface panel or a
+request context::
+
+    group = louie.scope()
+    group.activate()
+    try:
+        louie.connect(panel.on_change, 'changed', model)
+        louie.connect(panel.on_close, 'closed', model)
+    finally:
+        group.deactivate()
+    ...
+    group.disconnect_all()
+
+Groups may also be used as context managers on Python versions that
+support the ``with`` statement.
+"""
+
+from louie import dispatcher
+from louie.sender import Any
+from louie.signal import All
+
+
+class ConnectionGroup(object):
+    """Records connections made through it, or while it is active.
+
+    - ``records``: List of ``(senderkey, signal, receiver)`` tuples,
+      one per recorded connection.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def __len__(self):
+        return len(self.records)
+
+    def __enter__(self):
+        self.activate()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.deactivate()
+        return False
+
+    def activate(self):
+        """Record all connections made until ``deactivate`` is called.
+
+        Groups may be nested; a connection is recorded by every active
+        group.  Only connections made by the calling thread are
+        recorded, so that groups activated by threads handling
+        different requests do not record each other's connections.
+        """
+        dispatcher._scopes().append(self)
+
+    def deactivate(self):
+        """Stop recording connections made by the calling thread."""
+        scopes = dispatcher._scopes()
+        for index in xrange(len(scopes) - 1, -1, -1):
+            if scopes[index] is self:
+                del scopes[index]
+                break
+
+    def connect(self, receiver, signal=All, sender=Any, weak=True,
+                **options):
+        """Like ``louie.connect``, recording the connection in this
+        group.  ``options`` are passed to ``louie.connect``."""
+        self.activate()
+        try:
+            dispatcher.connect(receiver, signal, sender, weak, **options)
+        finally:
+            self.deactivate()
+
+    def disconnect_all(self):
+        """Disconnect all recorded connections that still exist.
+
+        Returns the number of connections removed.
+        """
+        records, self.records = self.records, []
+        return dispatcher._disconnect_all(records)
+
+
+def scope():
+    """Return a new ``ConnectionGroup``."""
+    return ConnectionGroup()
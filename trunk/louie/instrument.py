@@ -0,0 +1,193 @@
+"""Per-receiver instrumentation.
+
+While enabled, Louie records the following for each ``(signal,
+receiver)`` pair called by ``send``, ``send_exact``, ``send_minimal``
+and ``send_robust``:
+
+- ``calls``: Number of calls.
+
+- ``errors``: Number of calls which raised an exception.
+
+- ``total``: Cumulative wall time, in seconds.
+
+- ``max``: Longest wall time of a single call, in seconds.
+
+- ``histogram``: Fixed-size array of call counts by wall time.  Bucket
+  0 counts calls shorter than one microsecond, bucket ``i`` counts
+  calls of at least ``2 ** (i - 1)`` and less than ``2 ** i``
+  microseconds, and the last bucket also counts all longer calls.
+
+Instrumentation is installed as ``dispatcher.apply_hook``, so it costs
+nothing while disabled.  Call ``louie.reset`` or ``disable`` to turn
+it off.
+
+Receivers are identified by their identity (or that of their instance
+and function, for bound methods), so a new receiver created at the
+address of one that has been garbage-collected shares its records.
+"""
+
+import array
+import math
+from timeit import default_timer as timer
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from louie import dispatcher
+from louie import robustapply
+
+
+HISTOGRAM_SIZE = 32
+
+
+# { signal : { receiverkey : ReceiverStats } }
+_records = {}
+
+# { signal : apply function }
+_appliers = {}
+
+
+class ReceiverStats(object):
+    """Statistics for one ``(signal, receiver)`` pair."""
+
+    __slots__ = ('signal', 'receiver', 'calls', 'errors', 'total', 'max',
+                 'histogram')
+
+    def __init__(self, signal, receiver):
+        self.signal = signal
+        self.receiver = _label(receiver)
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = array.array('l', [0] * HISTOGRAM_SIZE)
+
+    def add(self, elapsed, failed):
+        """Record a call which took ``elapsed`` seconds."""
+        self.calls += 1
+        if failed:
+            self.errors += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        bucket = math.frexp(elapsed * 1e6)[1]
+        if bucket < 0:
+            bucket = 0
+        elif bucket >= HISTOGRAM_SIZE:
+            bucket = HISTOGRAM_SIZE - 1
+        self.histogram[bucket] += 1
+
+    def as_dict(self):
+        return {
+            'signal': str(self.signal),
+            'receiver': self.receiver,
+            'calls': self.calls,
+            'errors': self.errors,
+            'total': self.total,
+            'max': self.max,
+            'histogram': self.histogram.tolist(),
+            }
+
+
+def enable():
+    """Start recording receiver statistics."""
+    dispatcher.apply_hook = _applier
+
+
+def disable():
+    """Stop recording receiver statistics.  Recorded statistics are
+    kept."""
+    if dispatcher.apply_hook is _applier:
+        dispatcher.apply_hook = None
+
+
+def is_enabled():
+    return dispatcher.apply_hook is _applier
+
+
+def clear():
+    """Discard all recorded statistics."""
+    _records.clear()
+    _appliers.clear()
+
+
+def stats():
+    """Return a list of dictionaries, one per ``(signal, receiver)``
+    pair, ordered by descending cumulative wall time.
+
+    See the module documentation for the keys of each dictionary;
+    ``signal`` and ``receiver`` are string representations.
+    """
+    result = []
+    for table in _records.values():
+        for record in table.values():
+            result.append(record.as_dict())
+    result.sort(lambda a, b: cmp(b['total'], a['total']))
+    return result
+
+
+def dump(file):
+    """Write ``stats()`` to ``file`` as JSON.
+
+    ``file`` may be a file name or a writable file-like object.
+    """
+    if isinstance(file, basestring):
+        f = open(file, 'w')
+        try:
+            json.dump(stats(), f)
+        finally:
+            f.close()
+    else:
+        json.dump(stats(), file)
+
+
+def _applier(signal):
+    """Return the apply function recording statistics for
+    ``signal``."""
+    try:
+        return _appliers[signal]
+    except KeyError:
+        pass
+    table = _records.setdefault(signal, {})
+    robust_apply = robustapply.robust_apply
+    def apply(receiver, original, *arguments, **named):
+        key = _key(original)
+        record = table.get(key)
+        if record is None:
+            table[key] = record = ReceiverStats(signal, original)
+        start = timer()
+        try:
+            response = robust_apply(receiver, original, *arguments, **named)
+        except:
+            record.add(timer() - start, True)
+            raise
+        record.add(timer() - start, False)
+        return response
+    _appliers[signal] = apply
+    return apply
+
+
+def _key(receiver):
+    """Return a key identifying ``receiver``.
+
+    Bound methods are created anew each time a weak reference to one is
+    resolved, so they are identified by their instance and function.
+    """
+    im_self = getattr(receiver, 'im_self', None)
+    if im_self is not None:
+        return (id(im_self), id(receiver.im_func))
+    return id(receiver)
+
+
+def _label(receiver):
+    """Return a readable name for ``receiver``."""
+    im_self = getattr(receiver, 'im_self', None)
+    if im_self is not None:
+        return '%s.%s' % (im_self.__class__.__name__,
+                          receiver.im_func.__name__)
+    name = getattr(receiver, '__name__', None)
+    if name is not None:
+        return '%s.%s' % (getattr(receiver, '__module__', '?'), name)
+    return repr(receiver)
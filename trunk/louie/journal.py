@@ -0,0 +1,371 @@
+"""Durable append-only event journal.
+
+A ``Journal`` is a send hook that persists every send as a record of
+``(timestamp, signal, sender name, named arguments)`` in a directory
+of memory-mapped segment files::
+
+    journal = louie.journal.Journal('/var/lib/app/events')
+    louie.journal.install_journal(journal)
+    ...
+    louie.journal.remove_journal(journal)
+    journal.close()
+
+Records are numbered from zero across segments.  Sends only serialize
+the record and queue it; a background thread writes queued records to
+the current segment and flushes it to disk every ``commit_interval``
+seconds (group commit).  Call ``commit`` to flush synchronously.
+
+``read`` and ``replay`` read a journal directory back, starting from a
+record number or time, using a sparse index of record positions to
+avoid scanning earlier records.
+
+Segment files are named after the number of their first record, with
+a ``.seg`` extension.  Each record is framed as::
+
+    length (uint32), crc32 (uint32), number (uint64), timestamp (double)
+
+followed by ``length`` bytes of pickled ``(signal, sender name,
+named)``.  A zero length marks the end of an unfinished segment.
+Signals and argument values which cannot be pickled are stored as
+their ``repr``.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import deque
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from louie import dispatcher
+from louie.sender import Any, Anonymous
+
+
+DEFAULT_SEGMENT_SIZE = 16 * 1024 * 1024
+DEFAULT_INDEX_INTERVAL = 256
+DEFAULT_COMMIT_INTERVAL = 0.05
+
+INDEX_NAME = 'index'
+
+_FRAME = struct.Struct('<IIQd')
+# Record number, latest timestamp of earlier records, segment (first
+# record number), position.
+_INDEX = struct.Struct('<QdQQ')
+
+
+def install_journal(journal):
+    """Start journaling sends with ``journal``."""
+    dispatcher.send_hooks.append(journal)
+
+
+def remove_journal(journal):
+    """Stop journaling sends with ``journal``."""
+    dispatcher.send_hooks.remove(journal)
+
+
+def sender_name(sender):
+    """Default function naming senders in journal records."""
+    if sender is Anonymous or sender is Any:
+        return sender.__name__
+    name = getattr(sender, 'name', None)
+    if isinstance(name, basestring):
+        return name
+    return '%s:%x' % (sender.__class__.__name__, id(sender))
+
+
+class Journal(object):
+    """Send hook persisting sends to segment files in ``directory``.
+
+    - ``segment_size``: Size of each segment file; a new segment is
+      started when a record does not fit in the current one.
+
+    - ``index_interval``: Number of records between sparse index
+      entries.
+
+    - ``commit_interval``: Seconds between group commits by the
+      background thread.  If ``None``, no thread is started, and
+      records are only written by ``commit``.
+
+    - ``name``: Function returning the name recorded for a sender.
+    """
+
+    def __init__(self, directory, segment_size=DEFAULT_SEGMENT_SIZE,
+                 index_interval=DEFAULT_INDEX_INTERVAL,
+                 commit_interval=DEFAULT_COMMIT_INTERVAL, name=sender_name):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.segment_size = segment_size
+        self.index_interval = index_interval
+        self.name = name
+        self.queue = deque()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.segment = None
+        self.map = None
+        self.position = 0
+        self.number, self.latest = _next_record(directory)
+        self.index = open(os.path.join(directory, INDEX_NAME), 'ab')
+        self.wakeup = threading.Event()
+        self.thread = None
+        if commit_interval is not None:
+            self.thread = threading.Thread(
+                target=self._run, args=(commit_interval, ))
+            self.thread.setDaemon(True)
+            self.thread.start()
+
+    def __call__(self, signal, sender, arguments, named, responses, start,
+                 error):
+        self.queue.append((start, _dumps(signal, self.name(sender), named)))
+
+    def _run(self, interval):
+        while not self.closed:
+            self.wakeup.wait(interval)
+            self.commit()
+
+    def commit(self):
+        """Write all queued records and flush them to disk."""
+        self.lock.acquire()
+        try:
+            queue = self.queue
+            written = False
+            while queue:
+                timestamp, payload = queue.popleft()
+                self._write(timestamp, payload)
+                written = True
+            if written:
+                self.map.flush()
+                self.index.flush()
+                os.fsync(self.index.fileno())
+        finally:
+            self.lock.release()
+
+    def _write(self, timestamp, payload):
+        size = _FRAME.size + len(payload)
+        number = self.number
+        if self.map is None or self.position + size > len(self.map):
+            self._rotate(size)
+        elif number % self.index_interval == 0:
+            self._index()
+        self.map[self.position:self.position + size] = _FRAME.pack(
+            len(payload), zlib.crc32(payload) & 0xffffffffL, number,
+            timestamp) + payload
+        self.position += size
+        self.number = number + 1
+        if timestamp > self.latest:
+            self.latest = timestamp
+
+    def _index(self):
+        """Add an index entry for the next record."""
+        self.index.write(_INDEX.pack(
+            self.number, self.latest, self.segment, self.position))
+
+    def _rotate(self, size):
+        """Finish the current segment and start a new one able to hold
+        a record of ``size`` bytes."""
+        self._finish()
+        self.segment = self.number
+        path = _segment_path(self.directory, self.segment)
+        f = open(path, 'w+b')
+        try:
+            length = max(self.segment_size, size + _FRAME.size)
+            f.truncate(length)
+            self.map = mmap.mmap(f.fileno(), length)
+        finally:
+            f.close()
+        self.position = 0
+        # Always index the first record of a segment.
+        self._index()
+
+    def _finish(self):
+        """Unmap the current segment, truncating it to its records."""
+        if self.map is None:
+            return
+        self.map.flush()
+        self.map.close()
+        self.map = None
+        f = open(_segment_path(self.directory, self.segment), 'r+b')
+        try:
+            f.truncate(self.position)
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            f.close()
+
+    def close(self):
+        """Write queued records, stop the background thread and close
+        all files."""
+        if self.closed:
+            return
+        self.closed = True
+        if self.thread is not None:
+            self.wakeup.set()
+            self.thread.join()
+        self.commit()
+        self.lock.acquire()
+        try:
+            self._finish()
+            self.index.close()
+        finally:
+            self.lock.release()
+
+
+class Record(object):
+    """A journaled send."""
+
+    __slots__ = ('number', 'timestamp', 'signal', 'sender', 'named')
+
+    def __init__(self, number, timestamp, signal, sender, named):
+        self.number = number
+        self.timestamp = timestamp
+        self.signal = signal
+        self.sender = sender
+        self.named = named
+
+
+def read(directory, start=0, stop=None, since=None, until=None):
+    """Generate the ``Record`` objects journaled in ``directory``.
+
+    - ``start``, ``stop``: Range of record numbers, ``stop`` excluded.
+
+    - ``since``, ``until``: Range of timestamps, ``until`` excluded.
+    """
+    segments = _segments(directory)
+    if not segments:
+        return
+    # Find the last indexed position before which no record is wanted.
+    # Records are in order of number, but timestamps are those at which
+    # sends began, so nested sends may be out of order.  Index entries
+    # therefore hold the latest timestamp of all earlier records.
+    segment, position = segments[0], 0
+    for number, latest, seg, pos in _read_index(directory):
+        if number > start or (since is not None and latest >= since):
+            break
+        segment, position = seg, pos
+    for seg in segments:
+        if seg < segment:
+            continue
+        if seg > segment:
+            position = 0
+        f = open(_segment_path(directory, seg), 'rb')
+        try:
+            data = f.read()
+        finally:
+            f.close()
+        while position + _FRAME.size <= len(data):
+            length, crc, number, timestamp = _FRAME.unpack_from(
+                data, position)
+            if not length:
+                break
+            begin = position + _FRAME.size
+            payload = data[begin:begin + length]
+            if (len(payload) != length
+                or zlib.crc32(payload) & 0xffffffffL != crc):
+                # Torn write at the end of an unfinished segment.
+                break
+            position = begin + length
+            if stop is not None and number >= stop:
+                return
+            if number < start:
+                continue
+            if since is not None and timestamp < since:
+                continue
+            if until is not None and timestamp >= until:
+                continue
+            signal, sender, named = pickle.loads(payload)
+            yield Record(number, timestamp, signal, sender, named)
+
+
+def replay(directory, start=0, stop=None, since=None, until=None,
+           senders=None, send=None):
+    """Send the records journaled in ``directory`` again.
+
+    See ``read`` for the range arguments.  ``senders`` is a mapping of
+    sender names to senders; senders not found in it, other than
+    ``Any`` and ``Anonymous``, are replaced by ``Anonymous``.  ``send``
+    defaults to ``louie.send``.
+
+    Returns the number of records sent.
+    """
+    if send is None:
+        send = dispatcher.send
+    if senders is None:
+        senders = {}
+    known = {'Any': Any, 'Anonymous': Anonymous}
+    count = 0
+    for record in read(directory, start, stop, since, until):
+        sender = senders.get(record.sender)
+        if sender is None:
+            sender = known.get(record.sender, Anonymous)
+        send(record.signal, sender, **record.named)
+        count += 1
+    return count
+
+
+def _dumps(signal, name, named):
+    try:
+        return pickle.dumps((signal, name, named), 2)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        pass
+    safe = {}
+    for key, value in named.iteritems():
+        try:
+            pickle.dumps(value, 2)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            value = repr(value)
+        safe[key] = value
+    try:
+        return pickle.dumps((signal, name, safe), 2)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return pickle.dumps((repr(signal), name, safe), 2)
+
+
+def _segment_path(directory, segment):
+    return os.path.join(directory, '%020i.seg' % segment)
+
+
+def _segments(directory):
+    """Return the sorted first record numbers of segments in
+    ``directory``."""
+    result = []
+    for name in os.listdir(directory):
+        if name.endswith('.seg'):
+            result.append(int(name[:-4]))
+    result.sort()
+    return result
+
+
+def _read_index(directory):
+    path = os.path.join(directory, INDEX_NAME)
+    if not os.path.exists(path):
+        return []
+    f = open(path, 'rb')
+    try:
+        data = f.read()
+    finally:
+        f.close()
+    entries = []
+    for position in xrange(0, len(data) - _INDEX.size + 1, _INDEX.size):
+        entries.append(_INDEX.unpack_from(data, position))
+    return entries
+
+
+def _next_record(directory):
+    """Return the number of the next record to journal in
+    ``directory``, and the latest timestamp of the records in it."""
+    segments = _segments(directory)
+    if not segments:
+        return 0, 0.0
+    number = segments[-1]
+    latest = 0.0
+    for number, latest, segment, position in _read_index(directory):
+        pass
+    for record in read(directory, start=number):
+        number = record.number + 1
+        latest = max(latest, record.timestamp)
+    return number, latest
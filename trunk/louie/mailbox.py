@@ -0,0 +1,343 @@
+"""Bounded mailboxes for asynchronously called receivers.
+
+A ``Mailbox`` holds the pending calls to one receiver, up to
+``capacity`` of them, and delivers them in order from a worker thread,
+or when ``process`` is called.  When a call is put into a full
+mailbox, its ``policy`` decides what happens:
+
+- ``BLOCK``: Wait until the worker makes room, for up to ``timeout``
+  seconds, then raise ``MailboxFull``.
+
+- ``DROP_OLDEST``: Drop the oldest pending call of the lowest
+  priority lane to make room, or the call being put if its lane has a
+  lower priority still.
+
+- ``DROP_NEWEST``: Drop the call being put.
+
+- ``COALESCE``: Replace the most recent pending call having the same
+  key as the call being put, where the key function defaults to
+  treating all calls as equal, so that only the latest arguments are
+  delivered.  If no pending call has the same key, drop the oldest.
+
+``put`` returns ``QUEUED``, ``DROPPED`` or ``COALESCED``, which
+``MailboxDispatchPlugin`` returns as the receiver's response, so that
+senders can observe backpressure in the responses of ``send``.
+
+A mailbox may have several priority *lanes*, numbered from ``0``, the
+highest priority.  Pending calls of a lane are only delivered once
+higher priority lanes are empty, so that critical calls do not wait
+behind bulk ones.  A call may also be given a time to live: if it is
+still pending that many seconds after it was put, it is dropped rather
+than delivered, counted as ``expired``, and, if the mailbox has
+``dead_letter`` set, the ``CallExpired`` signal is sent with the
+mailbox as sender, and the ``arguments``, ``named`` and ``lane`` of
+the call as named arguments.  Errors raised by its receivers are
+printed, like those of the receiver of the mailbox.  Under overload,
+stale and low priority calls are thus shed first.
+"""
+
+import threading
+import time
+import traceback
+from collections import deque
+
+from louie import dispatcher
+from louie import error
+from louie.signal import Signal
+
+
+DEFAULT_CAPACITY = 1024
+
+# Overflow policies.
+BLOCK = 'block'
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+COALESCE = 'coalesce'
+
+POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, COALESCE)
+
+# Results of ``put``.
+QUEUED = 'queued'
+DROPPED = 'dropped'
+COALESCED = 'coalesced'
+
+
+class MailboxFull(error.LouieError):
+    """Error raised when a call could not be put into a mailbox with
+    the ``BLOCK`` policy before its timeout."""
+
+
+class CallExpired(Signal):
+    """Sent from a mailbox with ``dead_letter`` set when a pending
+    call expires."""
+
+
+class Mailbox(object):
+    """Bounded queue of pending calls to ``receiver``.
+
+    - ``receiver``: Callable called with the arguments of each call.
+
+    - ``capacity``: Maximum number of pending calls.
+
+    - ``policy``: Overflow policy, one of ``POLICIES``.
+
+    - ``timeout``: Seconds ``BLOCK`` waits for room, or ``None`` to
+      wait indefinitely.
+
+    - ``key``: Function of ``(arguments, named)`` returning the key by
+      which ``COALESCE`` matches pending calls.
+
+    - ``lanes``: Number of priority lanes.
+
+    - ``lane``: Function of ``(arguments, named)`` returning the lane
+      of a call, by default ``0``.
+
+    - ``ttl``: Seconds after which pending calls expire, by default
+      never.
+
+    - ``dead_letter``: Whether to send ``CallExpired`` for expired
+      calls.
+
+    - ``clock``: Function returning the current time, in seconds.
+
+    Metrics are kept in the ``queued``, ``delivered``, ``dropped``,
+    ``coalesced``, ``expired`` and ``high_water`` attributes, and
+    returned by ``stats`` along with the current depth.
+    """
+
+    def __init__(self, receiver, capacity=DEFAULT_CAPACITY, policy=BLOCK,
+                 timeout=None, key=None, lanes=1, lane=None, ttl=None,
+                 dead_letter=False, clock=time.time):
+        if policy not in POLICIES:
+            raise ValueError('Unknown mailbox policy %r' % (policy, ))
+        if capacity < 1:
+            raise ValueError('Mailbox capacity must be positive')
+        if lanes < 1:
+            raise ValueError('Mailbox needs at least one lane')
+        self.receiver = receiver
+        self.capacity = capacity
+        self.policy = policy
+        self.timeout = timeout
+        self.key = key
+        self.lane = lane
+        self.ttl = ttl
+        self.dead_letter = dead_letter
+        self.clock = clock
+        # Pending calls of each lane, as (arguments, named, deadline).
+        self.lanes = [deque() for index in xrange(lanes)]
+        self.depth = 0
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = None
+        self.queued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.high_water = 0
+
+    def __len__(self):
+        return self.depth
+
+    def put(self, arguments, named, lane=None, ttl=None):
+        """Put a call to the receiver into the mailbox.
+
+        ``lane`` and ``ttl`` override those given by the mailbox for
+        this call.
+        """
+        if lane is None:
+            if self.lane is None:
+                lane = 0
+            else:
+                lane = self.lane(arguments, named)
+        if not 0 <= lane < len(self.lanes):
+            raise ValueError('Unknown mailbox lane %r' % (lane, ))
+        if ttl is None:
+            ttl = self.ttl
+        deadline = None
+        if ttl is not None:
+            deadline = self.clock() + ttl
+        condition = self.condition
+        condition.acquire()
+        try:
+            if self.depth >= self.capacity:
+                policy = self.policy
+                if policy == BLOCK:
+                    self._wait_for_room()
+                elif policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return DROPPED
+                elif (policy == COALESCE
+                      and self._coalesce(arguments, named, lane, deadline)):
+                    self.coalesced += 1
+                    return COALESCED
+                elif not self._drop_oldest(lane):
+                    self.dropped += 1
+                    return DROPPED
+            self.lanes[lane].append((arguments, named, deadline))
+            self.depth += 1
+            self.queued += 1
+            if self.depth > self.high_water:
+                self.high_water = self.depth
+            condition.notifyAll()
+            return QUEUED
+        finally:
+            condition.release()
+
+    def _drop_oldest(self, lane):
+        """Drop the oldest call of the lowest priority lane, unless it
+        has a higher priority than ``lane``.  Returns whether a call was
+        dropped."""
+        for index in xrange(len(self.lanes) - 1, lane - 1, -1):
+            calls = self.lanes[index]
+            if calls:
+                calls.popleft()
+                self.depth -= 1
+                self.dropped += 1
+                return True
+        return False
+
+    def _wait_for_room(self):
+        """Wait until the mailbox is not full.  Called with the
+        condition acquired."""
+        timeout = self.timeout
+        if timeout is None:
+            while self.depth >= self.capacity:
+                self.condition.wait()
+            return
+        # Condition.wait doesn't say whether it timed out.
+        deadline = time.time() + timeout
+        while self.depth >= self.capacity:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self.dropped += 1
+                raise MailboxFull(
+                    'Mailbox for %r full (%i pending calls)'
+                    % (self.receiver, self.depth))
+            self.condition.wait(remaining)
+
+    def _coalesce(self, arguments, named, lane, deadline):
+        """Replace the most recent pending call of ``lane`` with the
+        same key."""
+        calls = self.lanes[lane]
+        if not calls:
+            return False
+        key = self.key
+        if key is None:
+            calls[-1] = (arguments, named, deadline)
+            return True
+        wanted = key(arguments, named)
+        for index in xrange(len(calls) - 1, -1, -1):
+            call = calls[index]
+            if key(call[0], call[1]) == wanted:
+                calls[index] = (arguments, named, deadline)
+                return True
+        return False
+
+    def get(self, timeout=None):
+        """Remove and return the oldest pending call of the highest
+        priority lane as ``(arguments, named)``, waiting up to
+        ``timeout`` seconds for one.  Returns ``None`` if there is
+        none."""
+        expired = []
+        condition = self.condition
+        condition.acquire()
+        try:
+            if not self.depth and not self.closed and timeout != 0:
+                condition.wait(timeout)
+            call = self._next(expired)
+            if call is not None or expired:
+                condition.notifyAll()
+        finally:
+            condition.release()
+        if expired and self.dead_letter:
+            for arguments, named, lane in expired:
+                try:
+                    dispatcher.send(CallExpired, self, arguments=arguments,
+                                    named=named, lane=lane)
+                except Exception:
+                    traceback.print_exc()
+        return call
+
+    def _next(self, expired):
+        """Remove and return the next call which has not expired,
+        appending the expired ones to ``expired`` as ``(arguments,
+        named, lane)``.  Called with the condition acquired."""
+        if not self.depth:
+            return None
+        now = None
+        for lane, calls in enumerate(self.lanes):
+            while calls:
+                arguments, named, deadline = calls.popleft()
+                self.depth -= 1
+                if deadline is not None:
+                    if now is None:
+                        now = self.clock()
+                    if deadline <= now:
+                        self.expired += 1
+                        expired.append((arguments, named, lane))
+                        continue
+                return arguments, named
+        return None
+
+    def process(self, limit=None):
+        """Deliver up to ``limit`` pending calls in the calling thread.
+        Returns the number of calls delivered."""
+        count = 0
+        while limit is None or count < limit:
+            call = self.get(0)
+            if call is None:
+                break
+            self._deliver(call)
+            count += 1
+        return count
+
+    def _deliver(self, call):
+        arguments, named = call
+        try:
+            self.receiver(*arguments, **named)
+        except Exception:
+            traceback.print_exc()
+        self.delivered += 1
+
+    def start(self):
+        """Start a worker thread delivering calls as they are put."""
+        self.thread = threading.Thread(target=self._run)
+        self.thread.setDaemon(True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            call = self.get()
+            if call is None:
+                if self.closed:
+                    break
+                continue
+            self._deliver(call)
+
+    def close(self):
+        """Stop the worker thread once pending calls are delivered."""
+        self.condition.acquire()
+        try:
+            self.closed = True
+            self.condition.notifyAll()
+        finally:
+            self.condition.release()
+        if self.thread is not None:
+            if self.thread is not threading.currentThread():
+                self.thread.join()
+            self.thread = None
+
+    def stats(self):
+        """Return the metrics of the mailbox as a dictionary."""
+        return {
+            'depth': self.depth,
+            'lanes': [len(calls) for calls in self.lanes],
+            'capacity': self.capacity,
+            'high_water': self.high_water,
+            'queued': self.queued,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'expired': self.expired,
+            }
@@ -0,0 +1,85 @@
+"""Lazily computed named arguments.
+
+A named argument whose value is expensive to compute, and which few
+receivers use, may be sent as ``lazy(function)``::
+
+    louie.send('changed', document, diff=louie.lazy(document.diff))
+
+``function`` is called without arguments at most once per send, and
+only if at least one receiver accepts the argument by name or takes
+``**kw``, which then receive its result.  Otherwise it is not called,
+and the argument is dropped like any other argument no receiver
+accepts.
+
+Adapters and receiver groups, which pass named arguments on to other
+receivers, are marked with a true ``_louie_forwards`` attribute, and
+report the names those accept from an ``accepted_names`` method, so
+that a lazy argument none of them accepts is not computed.
+The names accepted by the receivers of each signal and sender are
+cached until connections change.
+
+Send hooks are given the named arguments with ``Lazy`` values
+computed, or removed if no receiver accepted them.
+"""
+
+from louie import robustapply
+
+
+class Lazy(object):
+    """Named argument value computed only if a receiver accepts it."""
+
+    __slots__ = ('function', )
+
+    def __init__(self, function):
+        self.function = function
+
+    def __repr__(self):
+        return '<Lazy %r>' % (self.function, )
+
+
+def lazy(function):
+    """Return a named argument value computed by calling ``function``
+    if a receiver accepts it."""
+    return Lazy(function)
+
+
+def has_lazy(named):
+    """Return whether any value in ``named`` is ``Lazy``."""
+    for value in named.itervalues():
+        if isinstance(value, Lazy):
+            return True
+    return False
+
+
+def accepted_names(receivers):
+    """Return the set of argument names accepted by any of
+    ``receivers``, or ``None`` if one of them takes ``**kw``."""
+    names = set()
+    for receiver in receivers:
+        if getattr(receiver, '_louie_forwards', False):
+            accepted = receiver.accepted_names()
+            if accepted is None:
+                return None
+            names.update(accepted)
+            continue
+        function, code, start = robustapply.function(receiver)
+        if code.co_flags & 8:
+            return None
+        names.update(code.co_varnames[start:code.co_argcount])
+    return names
+
+
+def resolve(named, accepted):
+    """Return a copy of ``named`` with the ``Lazy`` values of names in
+    ``accepted`` computed, or all of them if ``accepted`` is ``None``.
+
+    Other ``Lazy`` values are removed.
+    """
+    result = {}
+    for name, value in named.iteritems():
+        if isinstance(value, Lazy):
+            if accepted is not None and name not in accepted:
+                continue
+            value = value.function()
+        result[name] = value
+    return result
@@ -0,0 +1,225 @@
+"""Operator pipelines deriving signals from other signals.
+
+``stream`` starts a pipeline of operators applied to each send of a
+signal, and ``to`` ends it by sending another signal with the
+results::
+
+    louie.stream('reading', sensor) \\
+         .filter(lambda value: value['celsius'] is not None) \\
+         .map(lambda value: value['celsius'] * 9 / 5.0 + 32) \\
+         .buffer(10) \\
+         .to('fahrenheit_batch')
+
+The value entering a pipeline is the dictionary of named arguments of
+a send, without ``signal`` and ``sender``.  Operators are:
+
+- ``filter(predicate)``: Pass on values for which ``predicate(value)``
+  is true.
+
+- ``map(function)``: Pass on ``function(value)``.
+
+- ``buffer(size)``: Pass on lists of ``size`` consecutive values.
+
+- ``window(duration)``: Pass on lists of the values received within
+  ``duration`` seconds of the first, measured on
+  ``louie.timing.default_wheel``.
+
+``to(signal, sender)`` sends ``signal`` for each value reaching the
+end of the pipeline: a dictionary value is sent as named arguments,
+and any other value as the named argument ``value``.
+
+The pipeline is connected as a single receiver, in which consecutive
+``filter`` and ``map`` operators are fused into one loop, so values
+are not sent again between operators.  The resulting signal is sent
+with ``louie.send``, so ordinary receivers may be connected to it,
+and pipelines may be chained through it.
+
+Streams are immutable, so a partial pipeline may be extended in
+several ways.  ``to`` returns a ``Pipeline``, which stays connected
+until its ``close`` method is called.
+"""
+
+import threading
+
+from louie import dispatcher
+from louie import timing
+from louie.sender import Any, Anonymous
+from louie.signal import All
+
+
+# Operator kinds.
+FILTER = 'filter'
+MAP = 'map'
+BUFFER = 'buffer'
+WINDOW = 'window'
+
+
+class Stream(object):
+    """A chain of operators applied to sends of ``signal`` from
+    ``sender``.  Use ``stream`` rather than instantiating directly."""
+
+    def __init__(self, signal, sender, operators):
+        self.signal = signal
+        self.sender = sender
+        self.operators = operators
+
+    def _extend(self, kind, argument):
+        return self.__class__(self.signal, self.sender,
+                              self.operators + ((kind, argument), ))
+
+    def filter(self, predicate):
+        return self._extend(FILTER, predicate)
+
+    def map(self, function):
+        return self._extend(MAP, function)
+
+    def buffer(self, size):
+        if size < 1:
+            raise ValueError('Buffer size must be positive')
+        return self._extend(BUFFER, size)
+
+    def window(self, duration):
+        return self._extend(WINDOW, duration)
+
+    def to(self, signal, sender=Anonymous):
+        """Connect the pipeline, sending ``signal`` from ``sender`` with
+        its results.  Returns a ``Pipeline``."""
+        return Pipeline(self, _Send(signal, sender))
+
+
+def stream(signal=All, sender=Any):
+    """Return a ``Stream`` of the sends of ``signal`` from
+    ``sender``."""
+    return Stream(signal, sender, ())
+
+
+class Pipeline(object):
+    """A connected ``Stream``."""
+
+    def __init__(self, stream, sink):
+        self.stream = stream
+        # Build stages from the end of the pipeline; each stage is a
+        # callable passing values to the next.
+        self.stages = []
+        downstream = sink
+        operations = []
+        for kind, argument in reversed(stream.operators):
+            if kind in (FILTER, MAP):
+                operations.insert(0, (kind, argument))
+                continue
+            if operations:
+                downstream = _fuse(operations, downstream)
+                operations = []
+            if kind == BUFFER:
+                stage = _Buffer(argument, downstream)
+            else:
+                stage = _Window(argument, downstream)
+            self.stages.append(stage)
+            downstream = stage
+        if operations:
+            downstream = _fuse(operations, downstream)
+        self.push = downstream
+        dispatcher.connect(self.receive, stream.signal, stream.sender,
+                           weak=False)
+
+    def receive(self, signal=None, sender=None, **named):
+        self.push(named)
+
+    def close(self):
+        """Disconnect the pipeline and discard values held by
+        ``buffer`` and ``window`` operators."""
+        dispatcher.disconnect(self.receive, self.stream.signal,
+                              self.stream.sender, weak=False)
+        for stage in self.stages:
+            stage.clear()
+
+
+def _fuse(operations, downstream):
+    """Return a function applying consecutive ``filter`` and ``map``
+    ``operations`` to a value, then passing it to ``downstream``."""
+    def push(value):
+        for kind, function in operations:
+            if kind == MAP:
+                value = function(value)
+            elif not function(value):
+                return
+        downstream(value)
+    return push
+
+
+class _Send(object):
+
+    def __init__(self, signal, sender):
+        self.signal = signal
+        self.sender = sender
+
+    def __call__(self, value):
+        if isinstance(value, dict):
+            dispatcher.send(self.signal, self.sender, **value)
+        else:
+            dispatcher.send(self.signal, self.sender, value=value)
+
+
+class _Buffer(object):
+
+    def __init__(self, size, downstream):
+        self.size = size
+        self.downstream = downstream
+        self.values = []
+        self.lock = threading.Lock()
+
+    def __call__(self, value):
+        self.lock.acquire()
+        try:
+            values = self.values
+            values.append(value)
+            if len(values) < self.size:
+                return
+            self.values = []
+        finally:
+            self.lock.release()
+        self.downstream(values)
+
+    def clear(self):
+        self.values = []
+
+
+class _Window(object):
+
+    def __init__(self, duration, downstream):
+        self.duration = duration
+        self.downstream = downstream
+        self.values = []
+        self.timer = None
+        self.wheel = timing.default_wheel
+        self.lock = threading.Lock()
+
+    def __call__(self, value):
+        self.lock.acquire()
+        try:
+            self.values.append(value)
+            if self.timer is None:
+                self.timer = self.wheel.schedule(self.duration, self.flush)
+        finally:
+            self.lock.release()
+
+    def flush(self):
+        self.lock.acquire()
+        try:
+            values = self.values
+            self.values = []
+            self.timer = None
+        finally:
+            self.lock.release()
+        if values:
+            self.downstream(values)
+
+    def clear(self):
+        self.lock.acquire()
+        try:
+            if self.timer is not None:
+                self.wheel.cancel(self.timer)
+                self.timer = None
+            self.values = []
+        finally:
+            self.lock.release()
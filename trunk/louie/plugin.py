@@ -1,7 +1,10 @@
 """Common plugins for Louie."""
 
+import threading
+
 from louie import dispatcher
 from louie import error
+from louie import saferef
 
 
 def install_plugin(plugin):
@@ -106,3 +109,196 @@ class TwistedDispatchPlugin(Plugin):
             return d
         return wrapper
 
+
+class ProcessPoolDispatchPlugin(Plugin):
+    """Plugin for Louie that calls receivers in a pool of worker
+    processes, so that CPU-bound receivers can use several cores.
+
+    When the wrapped receiver is called, the call is submitted to a
+    ``multiprocessing.Pool``, and a ``multiprocessing.pool.AsyncResult``
+    is returned as the receiver's response.
+
+    Named arguments are filtered by ``robust_apply`` according to the
+    receiver's signature before the call is submitted, so only the
+    arguments the receiver accepts are pickled.  Receivers must be
+    functions which can be pickled by reference, i.e. defined at the
+    top level of a module, or bound methods of picklable instances.
+
+    - ``processes``: Number of worker processes, by default the number
+      of CPUs.
+
+    - ``predicate``: Callable returning ``True`` for receivers to be
+      called in the pool.  By default, all receivers are.
+    """
+
+    def __init__(self, processes=None, predicate=None):
+        import multiprocessing
+        self._multiprocessing = multiprocessing
+        self.processes = processes
+        self.predicate = predicate
+        self.pool = None
+
+    def wrap_receiver(self, receiver):
+        if self.predicate is not None and not self.predicate(receiver):
+            return receiver
+        pool = self.pool
+        if pool is None:
+            pool = self.pool = self._multiprocessing.Pool(self.processes)
+        im_self = getattr(receiver, 'im_self', None)
+        if im_self is not None:
+            # Bound methods can't be pickled; send the instance and
+            # method name instead.
+            name = receiver.im_func.__name__
+            def wrapper(*args, **kw):
+                return pool.apply_async(
+                    _call_method, (im_self, name, args, kw))
+        else:
+            def wrapper(*args, **kw):
+                return pool.apply_async(receiver, args, kw)
+        return wrapper
+
+    def close(self):
+        """Wait for submitted calls to finish, then stop the worker
+        processes."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+class MailboxDispatchPlugin(Plugin):
+    """Plugin for Louie that calls each receiver from its own bounded
+    ``louie.mailbox.Mailbox``.
+
+    When the wrapped receiver is called, the call is put into the
+    receiver's mailbox, and the result of ``Mailbox.put`` is returned
+    as the receiver's response: ``mailbox.QUEUED``, ``mailbox.DROPPED``
+    or ``mailbox.COALESCED``.  With the ``BLOCK`` policy, ``send``
+    waits for room in full mailboxes, and raises ``MailboxFull`` if
+    ``timeout`` expires first.
+
+    - ``capacity``, ``policy``, ``timeout``, ``key``, ``lanes``,
+      ``lane``, ``ttl``, ``dead_letter``: Passed to each ``Mailbox``.
+      Since the named arguments ``lane`` is given are those the
+      receiver accepts, receivers of several signals needing different
+      lanes should accept ``signal``.
+
+    - ``threaded``: Whether each mailbox has a worker thread calling
+      its receiver.  If ``False``, call ``process`` to deliver pending
+      calls.
+
+    - ``predicate``: Callable returning ``True`` for receivers to be
+      given mailboxes.  By default, all receivers are.
+    """
+
+    def __init__(self, capacity=None, policy=None, timeout=None, key=None,
+                 threaded=True, predicate=None, lanes=1, lane=None, ttl=None,
+                 dead_letter=False):
+        from louie import mailbox
+        self._mailbox = mailbox
+        if capacity is None:
+            capacity = mailbox.DEFAULT_CAPACITY
+        if policy is None:
+            policy = mailbox.BLOCK
+        self.capacity = capacity
+        self.policy = policy
+        self.timeout = timeout
+        self.key = key
+        self.lanes = lanes
+        self.lane = lane
+        self.ttl = ttl
+        self.dead_letter = dead_letter
+        self.threaded = threaded
+        self.predicate = predicate
+        # { receiver reference : Mailbox }
+        self.mailboxes = {}
+        self.lock = threading.Lock()
+
+    def mailbox(self, receiver):
+        """Return the mailbox of ``receiver``, creating it if needed."""
+        try:
+            reference = saferef.safe_ref(receiver)
+        except TypeError:
+            reference = receiver
+        mailbox = self.mailboxes.get(reference)
+        if mailbox is None:
+            self.lock.acquire()
+            try:
+                mailbox = self.mailboxes.get(reference)
+                if mailbox is None:
+                    if reference is not receiver:
+                        reference = saferef.safe_ref(receiver, self._deleted)
+                    mailbox = self._mailbox.Mailbox(
+                        _Deliver(reference), self.capacity, self.policy,
+                        self.timeout, self.key, self.lanes, self.lane,
+                        self.ttl, self.dead_letter)
+                    self.mailboxes[reference] = mailbox
+                    if self.threaded:
+                        mailbox.start()
+            finally:
+                self.lock.release()
+        return mailbox
+
+    def _deleted(self, reference):
+        mailbox = self.mailboxes.pop(reference, None)
+        if mailbox is not None:
+            mailbox.close()
+
+    def wrap_receiver(self, receiver):
+        if self.predicate is not None and not self.predicate(receiver):
+            return receiver
+        put = self.mailbox(receiver).put
+        def wrapper(*args, **kw):
+            return put(args, kw)
+        return wrapper
+
+    def process(self, limit=None):
+        """Deliver up to ``limit`` pending calls from each mailbox in the
+        calling thread.  Returns the number of calls delivered."""
+        count = 0
+        for mailbox in self.mailboxes.values():
+            count += mailbox.process(limit)
+        return count
+
+    def stats(self):
+        """Return a list of the metrics of each mailbox, as dictionaries
+        also holding the ``receiver``."""
+        result = []
+        for mailbox in self.mailboxes.values():
+            receiver = mailbox.receiver.reference
+            if isinstance(receiver, dispatcher.WEAKREF_TYPES):
+                receiver = receiver()
+            stats = mailbox.stats()
+            stats['receiver'] = receiver
+            result.append(stats)
+        return result
+
+    def close(self):
+        """Deliver pending calls, then stop the worker threads."""
+        self.lock.acquire()
+        try:
+            mailboxes = self.mailboxes
+            self.mailboxes = {}
+        finally:
+            self.lock.release()
+        for mailbox in mailboxes.values():
+            mailbox.close()
+
+
+class _Deliver(object):
+    """Calls the receiver held by ``reference``, if it is still alive."""
+
+    def __init__(self, reference):
+        self.reference = reference
+
+    def __call__(self, *args, **kw):
+        receiver = self.reference
+        if isinstance(receiver, dispatcher.WEAKREF_TYPES):
+            receiver = receiver()
+            if receiver is None:
+                return None
+        return receiver(*args, **kw)
+
+
+def _call_method(instance, name, args, kw):
+    return getattr(instance, name)(*args, **kw)
@@ -0,0 +1,250 @@
+"""Computed values derived from signals.
+
+A ``cell`` holds the latest value of a named argument of a signal, and
+a ``computed`` value is a function of cells and other computed
+values::
+
+    price = louie.cell('price_changed', item)
+    quantity = louie.cell('quantity_changed', item)
+    total = louie.computed(lambda p, q: p * q, price, quantity)
+    taxed = louie.computed(lambda t: t * 1.2, total)
+    report = louie.computed(lambda t, x: (t, x), total, taxed)
+
+    louie.send('price_changed', item, value=10)
+    print report.value
+
+Sending a signal changes its cells, then recomputes the computed
+values depending on them, each at most once, in topological order:
+every function sees the new values of all its inputs, so in the
+example above ``report`` is recomputed once, never with a new
+``total`` and a stale ``taxed``.  A value that compares equal to the
+previous one does not cause its dependents to be recomputed, so the
+work done is proportional to what actually changed.
+
+Once all values are recomputed, the ``Changed`` signal is sent from
+each cell and computed value which changed, with its new ``value``
+as named argument, so receivers only observe consistent states.
+
+Several changes may be grouped into one transaction, recomputing each
+value at most once for all of them::
+
+    louie.reactive.begin()
+    try:
+        louie.send('price_changed', item, value=12)
+        louie.send('quantity_changed', item, value=3)
+    finally:
+        louie.reactive.commit()
+
+Graphs may also be used as context managers on Python versions that
+support the ``with`` statement.
+
+Cells are connected to their signal by weak reference, and computed
+values only weakly reference the values depending on them, so
+unreferenced parts of a graph are garbage-collected.
+"""
+
+import heapq
+import threading
+import weakref
+
+from louie import dispatcher
+from louie.sender import Any
+from louie.signal import Signal
+
+
+class Changed(Signal):
+    """Sent from a cell or computed value when its value changes."""
+
+
+class Graph(object):
+    """Propagates changes between cells and computed values.
+
+    - ``recomputations``: Number of computed values recomputed.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.serial = 0
+        # Heap of (rank, serial, node) for dirty computed values.
+        self.dirty = []
+        # Nodes whose value changed in the current transaction.
+        self.changed = []
+        self.recomputations = 0
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.commit()
+        return False
+
+    def begin(self):
+        """Begin a transaction, which may be nested."""
+        self.lock.acquire()
+        self.depth += 1
+
+    def commit(self):
+        """End a transaction.  Ending the outermost one recomputes the
+        values depending on changed cells, then sends ``Changed``."""
+        changed = None
+        try:
+            self.depth -= 1
+            if self.depth == 0:
+                changed = self._propagate()
+        finally:
+            self.lock.release()
+        if changed:
+            for node in changed:
+                dispatcher.send(Changed, node, value=node.value)
+
+    def _next_serial(self):
+        self.serial += 1
+        return self.serial
+
+    def _changed(self, node):
+        """Record that the value of ``node`` changed, and mark the
+        values depending on it dirty.  Called in a transaction."""
+        if not node.notify:
+            node.notify = True
+            self.changed.append(node)
+        for dependent in node.dependents.values():
+            if not dependent.dirty:
+                dependent.dirty = True
+                heapq.heappush(self.dirty,
+                               (dependent.rank, dependent.serial, dependent))
+
+    def _propagate(self):
+        """Recompute dirty values in topological order, and return the
+        nodes whose value changed."""
+        dirty = self.dirty
+        try:
+            while dirty:
+                node = heapq.heappop(dirty)[2]
+                node.dirty = False
+                self.recomputations += 1
+                if node.recompute():
+                    self._changed(node)
+        except:
+            for rank, serial, node in dirty:
+                node.dirty = False
+            del dirty[:]
+            self._reset_changed()
+            raise
+        return self._reset_changed()
+
+    def _reset_changed(self):
+        changed = self.changed
+        self.changed = []
+        for node in changed:
+            node.notify = False
+        return changed
+
+
+class Node(object):
+    """A value in a ``Graph``."""
+
+    rank = 0
+
+    def __init__(self, graph, value):
+        self.graph = graph
+        self.value = value
+        self.serial = graph._next_serial()
+        # { serial : Node } of the values depending on this one.
+        self.dependents = weakref.WeakValueDictionary()
+        self.dirty = False
+        self.notify = False
+
+
+class Cell(Node):
+    """Latest value of the named argument ``name`` of ``signal`` sent
+    by ``sender``.  Use ``cell`` rather than instantiating directly."""
+
+    def __init__(self, graph, signal, sender, name, initial):
+        Node.__init__(self, graph, initial)
+        self.signal = signal
+        self.sender = sender
+        self.name = name
+        if signal is not None:
+            dispatcher.connect(self.receive, signal, sender)
+
+    def receive(self, signal=None, sender=None, **named):
+        if self.name in named:
+            self.set(named[self.name])
+
+    def set(self, value):
+        """Change the value of the cell."""
+        graph = self.graph
+        graph.begin()
+        try:
+            if value != self.value:
+                self.value = value
+                graph._changed(self)
+        finally:
+            graph.commit()
+
+
+class Computed(Node):
+    """Value of ``function`` called with the values of ``inputs``.  Use
+    ``computed`` rather than instantiating directly."""
+
+    def __init__(self, graph, function, inputs):
+        self.function = function
+        self.inputs = inputs
+        graph.begin()
+        try:
+            Node.__init__(self, graph, self._compute())
+            rank = 0
+            for node in inputs:
+                node.dependents[self.serial] = self
+                rank = max(rank, node.rank)
+            self.rank = rank + 1
+        finally:
+            graph.commit()
+
+    def _compute(self):
+        return self.function(*[node.value for node in self.inputs])
+
+    def recompute(self):
+        """Recompute the value, and return whether it changed."""
+        value = self._compute()
+        if value == self.value:
+            return False
+        self.value = value
+        return True
+
+
+default_graph = Graph()
+
+
+def cell(signal=None, sender=Any, name='value', initial=None, graph=None):
+    """Return a ``Cell`` holding the latest value of the named
+    argument ``name`` of ``signal`` sent by ``sender``, or only changed
+    by its ``set`` method if ``signal`` is ``None``."""
+    if graph is None:
+        graph = default_graph
+    return Cell(graph, signal, sender, name, initial)
+
+
+def computed(function, *inputs):
+    """Return a ``Computed`` value of ``function`` called with the
+    values of ``inputs``, which are cells or computed values of the
+    same graph."""
+    if not inputs:
+        raise ValueError('Computed values need at least one input')
+    graph = inputs[0].graph
+    for node in inputs:
+        if node.graph is not graph:
+            raise ValueError('Inputs belong to different graphs')
+    return Computed(graph, function, inputs)
+
+
+def begin():
+    """Begin a transaction of the default graph."""
+    default_graph.begin()
+
+
+def commit():
+    """End a transaction of the default graph."""
+    default_graph.commit()
@@ -0,0 +1,284 @@
+"""Shared-memory ring buffer transport.
+
+For high rates of small signals between processes on one host, a
+``Publisher`` writes signals into a ring buffer of fixed-size slots in
+shared memory, and any number of ``Subscriber`` objects, usually in
+other processes, read them and send them again locally::
+
+    # Producer process.
+    ring = louie.shm.Ring.create('/dev/shm/telemetry')
+    publisher = louie.shm.Publisher(ring)
+    publisher.forward('sample')         # Or publisher.publish(...)
+
+    # Consumer processes.
+    ring = louie.shm.Ring.open('/dev/shm/telemetry')
+    subscriber = louie.shm.Subscriber(ring)
+    ...
+    subscriber.drain()
+
+The ring is a memory-mapped file, or anonymous shared memory if no path
+is given, in which case subscribers must be created in processes forked
+after the ring.  There must be only one publisher per ring.
+
+The publisher never waits for subscribers: a subscriber which falls
+more than a ring's length behind skips the overwritten signals, and
+counts them in its ``dropped`` attribute.
+
+Signals and named arguments are encoded with ``marshal`` where
+possible, and with ``pickle`` otherwise.  Signals which are neither
+strings nor numbers, such as ``Signal`` subclasses, may be listed in
+the ``signals`` table given to both publisher and subscribers, so that
+they are encoded by index.  Encoded signals too large for a slot are
+written to a separate file next to the ring.
+"""
+
+import marshal
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from louie import dispatcher
+from louie.sender import Any
+
+
+DEFAULT_SLOTS = 4096
+DEFAULT_SLOT_SIZE = 256
+
+# Magic, version, slots, slot size, next sequence number.
+_HEADER = struct.Struct('<4sIIIQ')
+_HEADER_SIZE = 64
+_WRITE = struct.Struct('<Q')
+_WRITE_OFFSET = 16
+# Sequence number + 1 (0 while being written), length, flags.
+_SLOT = struct.Struct('<QIH2x')
+
+_MAGIC = 'LSHM'
+_VERSION = 1
+
+# Slot flags.
+PICKLED = 1
+LARGE = 2
+
+
+class Ring(object):
+    """Ring buffer of fixed-size slots in shared memory.
+
+    Use ``create`` and ``open`` rather than instantiating directly.
+    """
+
+    def __init__(self, map, path, large_path):
+        self.map = map
+        self.path = path
+        # Prefix of files holding payloads too large for a slot.
+        self.large_path = large_path
+        magic, version, self.slots, self.slot_size, next = \
+               _HEADER.unpack_from(map)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError('Not a Louie shared-memory ring')
+        self.capacity = self.slot_size - _SLOT.size
+
+    def create(cls, path=None, slots=DEFAULT_SLOTS,
+               slot_size=DEFAULT_SLOT_SIZE):
+        """Create a new ring at ``path``, or in anonymous shared memory
+        if ``path`` is ``None``."""
+        size = _HEADER_SIZE + slots * slot_size
+        if path is None:
+            map = mmap.mmap(-1, size)
+            large_path = os.path.join(tempfile.mkdtemp(), 'large')
+        else:
+            f = open(path, 'w+b')
+            try:
+                f.truncate(size)
+                map = mmap.mmap(f.fileno(), size)
+            finally:
+                f.close()
+            large_path = path + '.large'
+        _HEADER.pack_into(map, 0, _MAGIC, _VERSION, slots, slot_size, 0)
+        return cls(map, path, large_path)
+    create = classmethod(create)
+
+    def open(cls, path):
+        """Open the existing ring at ``path``."""
+        f = open(path, 'r+b')
+        try:
+            map = mmap.mmap(f.fileno(), 0)
+        finally:
+            f.close()
+        return cls(map, path, path + '.large')
+    open = classmethod(open)
+
+    def next(self):
+        """Return the sequence number of the next signal to be
+        written."""
+        return _WRITE.unpack_from(self.map, _WRITE_OFFSET)[0]
+
+    def offset(self, sequence):
+        return _HEADER_SIZE + (sequence % self.slots) * self.slot_size
+
+    def close(self):
+        self.map.close()
+
+
+class Publisher(object):
+    """Writes signals into a ``Ring``.
+
+    - ``signals``: Sequence of signals to encode by index.
+    """
+
+    def __init__(self, ring, signals=()):
+        self.ring = ring
+        self.codes = {}
+        for index, signal in enumerate(signals):
+            self.codes[signal] = index
+        self.sequence = ring.next()
+        self.forwarded = []
+        # Sequence numbers of signals with large payload files.
+        self.large = {}
+
+    def publish(self, signal, **named):
+        """Write ``signal`` and ``named`` into the next slot."""
+        ring = self.ring
+        map = ring.map
+        sequence = self.sequence
+        code = self.codes.get(signal)
+        if code is None:
+            message = (False, signal, named)
+        else:
+            message = (True, code, named)
+        flags = 0
+        try:
+            payload = marshal.dumps(message)
+        except ValueError:
+            payload = pickle.dumps(message, 2)
+            flags = PICKLED
+        # Remove the large payload file of the signal being
+        # overwritten.
+        old = sequence - ring.slots
+        if old in self.large:
+            del self.large[old]
+            try:
+                os.remove('%s.%i' % (ring.large_path, old))
+            except OSError:
+                pass
+        if len(payload) > ring.capacity:
+            name = '%s.%i' % (ring.large_path, sequence)
+            directory = os.path.dirname(name)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            f = open(name, 'wb')
+            try:
+                f.write(payload)
+            finally:
+                f.close()
+            self.large[sequence] = True
+            payload = ''
+            flags |= LARGE
+        offset = ring.offset(sequence)
+        # Mark the slot as being written, write it, then publish it.
+        _SLOT.pack_into(map, offset, 0, len(payload), flags)
+        start = offset + _SLOT.size
+        map[start:start + len(payload)] = payload
+        _SLOT.pack_into(map, offset, sequence + 1, len(payload), flags)
+        self.sequence = sequence + 1
+        _WRITE.pack_into(map, _WRITE_OFFSET, sequence + 1)
+
+    def _forward(self, signal=None, sender=None, **named):
+        self.publish(signal, **named)
+
+    def forward(self, signal, sender=Any):
+        """Publish each send of ``signal`` from ``sender``."""
+        dispatcher.connect(self._forward, signal, sender)
+        self.forwarded.append((signal, sender))
+
+    def close(self):
+        """Stop forwarding signals and remove large payload files."""
+        for signal, sender in self.forwarded:
+            dispatcher.disconnect(self._forward, signal, sender)
+        self.forwarded = []
+        for sequence in self.large:
+            try:
+                os.remove('%s.%i' % (self.ring.large_path, sequence))
+            except OSError:
+                pass
+        self.large = {}
+        if self.ring.path is None:
+            shutil.rmtree(os.path.dirname(self.ring.large_path), True)
+
+
+class Subscriber(object):
+    """Reads signals from a ``Ring`` and sends them locally, with the
+    subscriber as the sender.
+
+    - ``signals``: Sequence of signals encoded by index, as given to
+      the ``Publisher``.
+
+    - ``start``: Sequence number of the first signal to read; by
+      default, the next one written.
+    """
+
+    def __init__(self, ring, signals=(), start=None):
+        self.ring = ring
+        self.signals = list(signals)
+        if start is None:
+            start = ring.next()
+        self.sequence = start
+        self.dropped = 0
+
+    def drain(self, limit=None):
+        """Send the signals written since the last call, up to
+        ``limit`` of them.  Returns the number of signals sent."""
+        ring = self.ring
+        map = ring.map
+        slots = ring.slots
+        count = 0
+        while limit is None or count < limit:
+            sequence = self.sequence
+            written = ring.next()
+            if sequence >= written:
+                break
+            if written - sequence > slots:
+                self._skip(written - slots)
+                continue
+            offset = ring.offset(sequence)
+            tag, length, flags = _SLOT.unpack_from(map, offset)
+            if tag != sequence + 1:
+                # Overwritten, or being overwritten.
+                self._skip(max(sequence + 1, ring.next() - slots + 1))
+                continue
+            start = offset + _SLOT.size
+            payload = map[start:start + length]
+            if _SLOT.unpack_from(map, offset)[0] != tag:
+                # Overwritten while reading.
+                self._skip(max(sequence + 1, ring.next() - slots + 1))
+                continue
+            if flags & LARGE:
+                try:
+                    f = open('%s.%i' % (ring.large_path, sequence), 'rb')
+                except IOError:
+                    self._skip(sequence + 1)
+                    continue
+                try:
+                    payload = f.read()
+                finally:
+                    f.close()
+            if flags & PICKLED:
+                indexed, signal, named = pickle.loads(payload)
+            else:
+                indexed, signal, named = marshal.loads(payload)
+            if indexed:
+                signal = self.signals[signal]
+            self.sequence = sequence + 1
+            dispatcher.send(signal, self, **named)
+            count += 1
+        return count
+
+    def _skip(self, sequence):
+        self.dropped += sequence - self.sequence
+        self.sequence = sequence
@@ -0,0 +1,92 @@
+import threading
+import unittest
+
+import louie
+from louie import affinity
+from louie import error
+
+
+class Receiver(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, value):
+        self.calls.append((value, threading.currentThread()))
+
+
+class TestAffinity(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+        affinity.discard()
+
+    def tearDown(self):
+        affinity.discard()
+
+    def _send_from_thread(self, *arguments, **named):
+        responses = []
+        def run():
+            responses.extend(louie.send(*arguments, **named))
+        worker = threading.Thread(target=run)
+        worker.start()
+        worker.join()
+        return responses
+
+    def test_Posted(self):
+        receiver = Receiver()
+        louie.connect(receiver, 'progress', thread=affinity.current)
+        wakeups = []
+        def wakeup():
+            wakeups.append(threading.currentThread())
+        affinity.set_wakeup(wakeup)
+        responses = self._send_from_thread('progress', value=1)
+        self._send_from_thread('progress', value=2)
+        assert len(responses) == 1 and responses[0][1] is None
+        assert receiver.calls == []
+        assert len(wakeups) == 2
+        assert threading.currentThread() not in wakeups
+        assert len(affinity.inbox()) == 2
+        assert affinity.drain(limit=1) == 1
+        assert affinity.drain() == 1
+        assert affinity.drain() == 0
+        main = threading.currentThread()
+        assert receiver.calls == [(1, main), (2, main)]
+
+    def test_Direct(self):
+        receiver = Receiver()
+        louie.connect(receiver, 'progress', thread=affinity.current)
+        louie.send('progress', value=3)
+        assert receiver.calls == [(3, threading.currentThread())]
+        assert len(affinity.inbox()) == 0
+        louie.disconnect(receiver, 'progress')
+        assert not louie.has_receivers('progress')
+
+    def test_OtherThread(self):
+        receiver = Receiver()
+        ready = threading.Event()
+        stop = threading.Event()
+        drained = []
+        def run():
+            louie.connect(receiver, 'progress', thread=affinity.current)
+            ready.set()
+            stop.wait()
+            drained.append(affinity.drain())
+            affinity.discard()
+        owner = threading.Thread(target=run)
+        owner.start()
+        ready.wait()
+        louie.send('progress', value=4)
+        assert receiver.calls == []
+        stop.set()
+        owner.join()
+        assert drained == [1]
+        assert receiver.calls == [(4, owner)]
+
+    def test_Exclusive(self):
+        receiver = Receiver()
+        self.assertRaises(error.DispatcherTypeError, louie.connect,
+                          receiver, 'progress', thread=affinity.current,
+                          throttle=1.0)
+        self.assertRaises(ValueError, louie.connect, receiver, 'progress',
+                          thread=threading.Thread())
@@ -0,0 +1,148 @@
+import gc
+import threading
+import unittest
+
+import louie
+from louie import balance
+from louie import error
+
+
+class Worker(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.jobs = []
+
+    def __call__(self, job):
+        self.jobs.append(job)
+        return self.name
+
+
+class TestBalance(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+        self.workers = [Worker(index) for index in xrange(3)]
+
+    def _connect(self, **kw):
+        for worker in self.workers:
+            louie.connect(worker, 'job', group='workers', **kw)
+
+    def test_RoundRobin(self):
+        self._connect()
+        observer = Worker('observer')
+        louie.connect(observer, 'job')
+        assert louie.receiver_count('job') == 2
+        for job in xrange(6):
+            responses = [response for receiver, response
+                         in louie.send('job', job=job)]
+            responses.sort()
+            assert responses[0] == job % 3
+        assert [worker.jobs for worker in self.workers] == [
+            [0, 3], [1, 4], [2, 5]]
+        assert observer.jobs == range(6)
+
+    def test_Hash(self):
+        self._connect(strategy=balance.HASH, key='customer')
+        owners = {}
+        for job in xrange(60):
+            customer = job % 10
+            owner = louie.send('job', job=job, customer=customer)[0][1]
+            assert owners.setdefault(customer, owner) == owner
+        assert len(set(owners.values())) > 1
+        # Removing a member only moves the customers it owned.
+        removed = self.workers[0]
+        louie.disconnect(removed, 'job', group='workers')
+        for customer, owner in owners.items():
+            moved = louie.send('job', job=0, customer=customer)[0][1]
+            if owner != removed.name:
+                assert moved == owner
+
+    def test_LeastBusy(self):
+        release = threading.Event()
+        started = threading.Event()
+        class Slow(Worker):
+            def __call__(self, job):
+                Worker.__call__(self, job)
+                started.set()
+                release.wait(5)
+        slow = Slow('slow')
+        fast = Worker('fast')
+        louie.connect(slow, 'job', group='workers',
+                      strategy=balance.LEAST_BUSY)
+        louie.connect(fast, 'job', group='workers')
+        worker = threading.Thread(target=louie.send, args=('job', ),
+                                  kwargs={'job': 0})
+        worker.start()
+        started.wait(5)
+        # While the slow member is busy, the other gets all jobs.
+        for job in xrange(1, 4):
+            louie.send('job', job=job)
+        release.set()
+        worker.join()
+        assert slow.jobs == [0]
+        assert fast.jobs == [1, 2, 3]
+
+    def test_Disconnect(self):
+        self._connect()
+        first, second, third = self.workers
+        louie.disconnect(first, 'job', group='workers')
+        self.assertRaises(error.DispatcherKeyError, louie.disconnect,
+                          first, 'job', group='workers')
+        louie.send('job', job=1)
+        louie.send('job', job=2)
+        assert first.jobs == []
+        del self.workers, first, second
+        gc.collect()
+        assert louie.has_receivers('job')
+        louie.send('job', job=3)
+        assert third.jobs[-1] == 3
+        del third
+        gc.collect()
+        # The group goes with its last member.
+        assert not louie.has_receivers('job')
+        assert louie.dispatcher.connections == {}
+
+    def test_Options(self):
+        self._connect()
+        self.assertRaises(error.DispatcherTypeError, louie.connect,
+                          Worker('x'), 'job', group='workers',
+                          strategy=balance.HASH, key='customer')
+        self.assertRaises(ValueError, louie.connect, Worker('x'), 'other',
+                          group='workers', strategy=balance.HASH)
+        self.assertRaises(error.DispatcherTypeError, louie.connect,
+                          Worker('x'), 'job', group='workers', throttle=1.0)
+        self.assertRaises(error.DispatcherTypeError, louie.connect,
+                          Worker('x'), 'job', strategy=balance.HASH)
+        self.assertRaises(error.DispatcherTypeError, louie.connect,
+                          Worker('x'), 'job', key='customer')
+
+    def test_Scope(self):
+        first, second, third = self.workers
+        louie.connect(first, 'job', group='workers')
+        scope = louie.scope()
+        scope.connect(second, 'job', group='workers')
+        scope.connect(third, 'job', group='workers')
+        assert scope.disconnect_all() == 2
+        # The member connected outside the scope remains.
+        assert louie.has_receivers('job')
+        louie.send('job', job=1)
+        assert first.jobs == [1]
+        scope.connect(second, 'job', group='workers')
+        louie.disconnect(first, 'job', group='workers')
+        # The last member takes the group with it.
+        assert scope.disconnect_all() == 1
+        assert not louie.has_receivers('job')
+
+    def test_Order(self):
+        before = Worker('before')
+        after = Worker('after')
+        louie.connect(before, 'job')
+        louie.connect(self.workers[0], 'job', group='workers')
+        louie.connect(after, 'job')
+        order = [receiver for receiver
+                 in louie.get_all_receivers(signal='job')]
+        # Members joining do not move the group.
+        louie.connect(self.workers[1], 'job', group='workers')
+        assert [receiver for receiver
+                in louie.get_all_receivers(signal='job')] == order
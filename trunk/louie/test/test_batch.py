@@ -0,0 +1,112 @@
+import gc
+import unittest
+
+import louie
+from louie import batch
+from louie import dispatcher
+from louie import timing
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Writer(object):
+
+    def __init__(self):
+        self.batches = []
+
+    def write(self, events):
+        self.batches.append([event['value'] for event in events])
+        return len(events)
+
+
+def single(value):
+    return value
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+        self.clock = Clock()
+        self.wheel = timing.default_wheel = timing.TimerWheel(
+            clock=self.clock)
+
+    def tearDown(self):
+        timing.default_wheel = timing.TimerWheel()
+
+    def test_Size(self):
+        writer = Writer()
+        louie.connect(writer.write, 'sample', batch_size=3)
+        louie.connect(single, 'sample')
+        responses = []
+        for value in range(7):
+            responses.append(louie.send('sample', value=value))
+        assert writer.batches == [[0, 1, 2], [3, 4, 5]]
+        # Other receivers are called once per send.
+        assert [r[1][1] for r in responses] == range(7)
+        assert [r[0][1] for r in responses] == [
+            None, None, 3, None, None, 3, None]
+        batch.flush()
+        assert writer.batches == [[0, 1, 2], [3, 4, 5], [6]]
+        batch.flush()
+        assert len(writer.batches) == 3
+
+    def test_Delay(self):
+        writer = Writer()
+        louie.connect(writer.write, 'sample', batch_size=100, max_delay=0.05)
+        louie.send('sample', value=1)
+        self.clock.now += 0.03
+        louie.send('sample', value=2)
+        self.wheel.advance()
+        assert writer.batches == []
+        self.clock.now += 0.03
+        self.wheel.advance()
+        assert writer.batches == [[1, 2]]
+        assert len(self.wheel) == 0
+
+    def test_Event(self):
+        events = []
+        def receive(batch):
+            events.extend(batch)
+        louie.connect(receive, 'sample', weak=False, batch_size=1)
+        louie.send('sample', louie.Anonymous, value=1)
+        assert events == [{'signal': 'sample', 'sender': louie.Anonymous,
+                           'value': 1}]
+        self.assertRaises(TypeError, louie.send, 'sample', None, 1)
+
+    def test_Disconnect(self):
+        writer = Writer()
+        louie.connect(writer.write, 'sample', batch_size=10)
+        louie.disconnect(writer.write, 'sample')
+        assert not dispatcher.connections
+        self.assertRaises(louie.error.DispatcherTypeError, louie.connect,
+                          writer.write, 'sample', throttle=1.0, batch_size=1)
+
+    def test_DisconnectFlush(self):
+        writer = Writer()
+        louie.connect(writer.write, 'sample', batch_size=10, max_delay=1.0)
+        for value in range(3):
+            louie.send('sample', value=value)
+        louie.disconnect(writer.write, 'sample')
+        # Buffered events are delivered on disconnect, and the timer is
+        # cancelled.
+        assert writer.batches == [[0, 1, 2]]
+        assert len(self.wheel) == 0
+        batch.flush()
+        assert writer.batches == [[0, 1, 2]]
+
+    def test_GarbageCollected(self):
+        writer = Writer()
+        louie.connect(writer.write, 'sample', max_delay=1.0)
+        louie.send('sample', value=1)
+        del writer
+        gc.collect()
+        assert len(self.wheel) == 0
+        assert not dispatcher.connections
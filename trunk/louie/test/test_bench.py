@@ -0,0 +1,43 @@
+import os
+import unittest
+
+import louie
+from louie import bench
+from louie import dispatcher
+
+
+class TestBench(unittest.TestCase):
+
+    def test_Run(self):
+        names = ['send_10', 'robust_apply_filtered', 'weakref_death_cleanup']
+        result = bench.run(names, repeat=2, scale=0.001)
+        assert sorted(result['results']) == sorted(names)
+        for name in names:
+            timing = result['results'][name]
+            assert timing['repeat'] == 2
+            assert timing['number'] >= 1
+            assert 0 < timing['best'] <= timing['mean']
+        assert len(dispatcher.connections) == 0
+        table = bench.format_results([result, result])
+        assert '(1.00x)' in table
+
+    def test_All(self):
+        result = bench.run(repeat=1, scale=0.0001)
+        assert len(result['results']) == len(bench.BENCHMARKS)
+
+    def test_Compare(self):
+        # Compare against a release lacking newer API, e.g. ``prepare``.
+        tag = os.path.join(os.path.dirname(louie.__file__), os.pardir,
+                           os.pardir, 'tags', '1.1')
+        if not os.path.isdir(os.path.join(tag, 'louie')):
+            return
+        names = ['send_10', 'send_prepared_10']
+        results = bench.compare([tag, os.path.dirname(louie.__path__[0])],
+                                names, repeat=1, scale=0.001)
+        assert sorted(results[0]['results']) == ['send_10']
+        assert sorted(results[1]['results']) == sorted(names)
+        table = bench.format_results(results)
+        line = [line for line in table.splitlines()
+                if line.startswith('send_prepared_10')][0]
+        assert line.split()[1] == '-'
+        assert 'x)' not in line
@@ -0,0 +1,122 @@
+import unittest
+
+import louie
+from louie import breaker
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Flaky(object):
+
+    def __init__(self):
+        self.calls = 0
+        self.failing = True
+
+    def receive(self):
+        self.calls += 1
+        if self.failing:
+            raise ValueError(self.calls)
+        return self.calls
+
+
+class TestBreaker(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+        self.clock = Clock()
+        self.breaker = breaker.enable(threshold=3, cooldown=10.0,
+                                      clock=self.clock)
+        self.events = []
+        louie.connect(self._tripped, breaker.CircuitTripped)
+        louie.connect(self._reset, breaker.CircuitReset)
+
+    def _tripped(self, target, failures, error):
+        self.events.append(('tripped', failures, error.args[0]))
+
+    def _reset(self, target):
+        self.events.append(('reset', ))
+
+    def test_Trip(self):
+        flaky = Flaky()
+        louie.connect(flaky.receive, 'sig')
+        for i in range(3):
+            [(receiver, response)] = louie.send_robust('sig')
+            assert isinstance(response, ValueError)
+        assert self.events == [('tripped', 3, 3)]
+        assert self.breaker.state(flaky.receive) == breaker.OPEN
+        [(receiver, open_error)] = louie.send_robust('sig')
+        assert isinstance(open_error, breaker.CircuitOpenError)
+        [(receiver, response)] = louie.send_robust('sig')
+        assert response is open_error
+        assert flaky.calls == 3
+
+    def test_HalfOpen(self):
+        flaky = Flaky()
+        louie.connect(flaky.receive, 'sig')
+        for i in range(3):
+            louie.send_robust('sig')
+        self.clock.now += 10.0
+        # The probe fails; the circuit opens again at once.
+        [(receiver, response)] = louie.send_robust('sig')
+        assert isinstance(response, ValueError)
+        assert flaky.calls == 4
+        assert self.events[-1] == ('tripped', 4, 4)
+        [(receiver, response)] = louie.send_robust('sig')
+        assert isinstance(response, breaker.CircuitOpenError)
+        # The next probe succeeds and closes the circuit.
+        self.clock.now += 10.0
+        flaky.failing = False
+        [(receiver, response)] = louie.send_robust('sig')
+        assert response == 5
+        assert self.events[-1] == ('reset', )
+        assert self.breaker.state(flaky.receive) == breaker.CLOSED
+        assert self.breaker.circuits == {}
+
+    def test_Consecutive(self):
+        flaky = Flaky()
+        louie.connect(flaky.receive, 'sig')
+        for i in range(5):
+            flaky.failing = True
+            louie.send_robust('sig')
+            louie.send_robust('sig')
+            flaky.failing = False
+            louie.send_robust('sig')
+        assert self.events == []
+        assert flaky.calls == 15
+
+    def test_Disable(self):
+        flaky = Flaky()
+        louie.connect(flaky.receive, 'sig')
+        breaker.disable()
+        assert not breaker.is_enabled()
+        for i in range(5):
+            louie.send_robust('sig')
+        assert flaky.calls == 5
+
+    def test_ListenerError(self):
+        def fail():
+            raise RuntimeError
+        louie.connect(fail, breaker.CircuitTripped)
+        louie.connect(fail, breaker.CircuitReset)
+        flaky = Flaky()
+        louie.connect(flaky.receive, 'sig')
+        other = Flaky()
+        other.failing = False
+        louie.connect(other.receive, 'sig')
+        for i in range(3):
+            responses = louie.send_robust('sig')
+            assert len(responses) == 2
+        assert self.breaker.state(flaky.receive) == breaker.OPEN
+        assert other.calls == 3
+        self.clock.now += 10.0
+        flaky.failing = False
+        louie.send_robust('sig')
+        assert self.breaker.state(flaky.receive) == breaker.CLOSED
+        assert other.calls == 4
@@ -0,0 +1,114 @@
+import multiprocessing
+import os
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+
+import louie
+from louie import bridge
+
+
+def _child(channel):
+    """Answer each 'ping' with a 'pong' until 'stop'."""
+    louie.reset()
+    b = bridge.Bridge(channel)
+    state = {'running': True}
+    def on_ping(value):
+        louie.send('pong', value=value + 1)
+    def on_stop():
+        state['running'] = False
+    louie.connect(on_ping, 'ping')
+    louie.connect(on_stop, 'stop')
+    deadline = time.time() + 10
+    try:
+        while state['running'] and time.time() < deadline:
+            b.poll(0.01)
+    except EOFError:
+        pass
+    b.close()
+
+
+class TestBridge(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+
+    def _wait(self, b, condition):
+        deadline = time.time() + 10
+        while not condition():
+            assert time.time() < deadline, 'timed out'
+            b.poll(0.01)
+
+    def _exchange(self, b, child):
+        pongs = []
+        def on_pong(value, sender):
+            pongs.append((value, sender))
+        louie.connect(on_pong, 'pong')
+        self._wait(b, lambda: 'ping' in b.remote_signals)
+        # The child does not listen to 'other', so it is not forwarded.
+        assert 'other' not in b.remote_signals
+        louie.send('other', value=0)
+        assert b.pending == []
+        louie.send('ping', value=1)
+        louie.send('ping', value=10)
+        self._wait(b, lambda: len(pongs) == 2)
+        assert pongs == [(2, b), (11, b)]
+        louie.send('stop')
+        b.close()
+        child.join(10)
+        assert child.exitcode == 0
+
+    def test_Pipe(self):
+        parent_end, child_end = multiprocessing.Pipe()
+        child = multiprocessing.Process(target=_child, args=(child_end, ))
+        child.start()
+        self._exchange(bridge.Bridge(parent_end), child)
+
+    def test_UnixSocket(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'louie.sock')
+            listener = bridge.unix_listener(path)
+            child = multiprocessing.Process(
+                target=lambda: _child(bridge.unix_bridge(path).channel))
+            child.start()
+            b = bridge.accept(listener)
+            listener.close()
+            self._exchange(b, child)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_Subscriptions(self):
+        a, b = socket.socketpair()
+        left = bridge.Bridge(a)
+        right = bridge.SocketChannel(b)
+        def receiver():
+            pass
+        louie.connect(receiver, 'this')
+        left.poll()
+        assert louie.bridge.pickle.loads(right.recv_bytes()) == [
+            ('subscribe', 'this')]
+        signals = left.subscriptions()
+        assert left.subscriptions() is signals
+        louie.disconnect(receiver, 'this')
+        left.poll()
+        assert louie.bridge.pickle.loads(right.recv_bytes()) == [
+            ('unsubscribe', 'this')]
+        left.close()
+        right.close()
+
+    def test_SendMinimal(self):
+        a, b = socket.socketpair()
+        left = bridge.Bridge(a)
+        right = bridge.SocketChannel(b)
+        right.send_bytes(louie.bridge.pickle.dumps([('subscribe', 'this')]))
+        left.poll(1.0)
+        assert left.remote_signals == set(['this'])
+        louie.send_minimal('this', value=1)
+        assert left.pending == []
+        louie.send('this', value=2)
+        assert left.pending == [('send', 'this', (), {'value': 2})]
+        left.close()
+        right.close()
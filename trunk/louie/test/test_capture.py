@@ -0,0 +1,150 @@
+import sys
+import unittest
+from StringIO import StringIO
+
+import louie
+from louie import capture
+from louie import dispatcher
+
+
+class Model(object):
+    pass
+
+
+class Receiver(object):
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, value=None):
+        self.calls += 1
+
+
+class Unclosable(StringIO):
+
+    def close(self):
+        pass
+
+
+class Full(StringIO):
+
+    def write(self, data):
+        raise IOError('No space left on device')
+
+
+class TestCapture(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+
+    def _capture(self):
+        model = Model()
+        r1 = Receiver()
+        r2 = Receiver()
+        louie.connect(r1, 'changed', model)
+        louie.connect(r2, 'changed', model)
+        louie.connect(r1, 'closed')
+        f = Unclosable()
+        recorder = capture.Recorder(f, buffer_size=2)
+        capture.install_recorder(recorder)
+        louie.send('changed', model, value=1, extra=2)
+        louie.send('closed')
+        louie.send_robust('changed', model)
+        louie.send('ignored', model, value=3)
+        capture.remove_recorder(recorder)
+        recorder.close()
+        assert recorder.events == 4
+        f.seek(0)
+        return f
+
+    def test_Load(self):
+        events = capture.load(self._capture())
+        assert len(events) == 4
+        assert [e.signal for e in events] == [
+            'changed', 'closed', 'changed', 'ignored']
+        assert [e.sender_type for e in events] == [
+            'Model', 'Anonymous', 'Model', 'Model']
+        assert [e.keys for e in events] == [
+            ('extra', 'value'), (), (), ('value', )]
+        assert [e.receivers for e in events] == [2, 1, 2, 0]
+        assert events[0].offset == 0
+        for event in events:
+            assert event.offset >= 0
+            assert event.duration >= 0
+
+    def test_Replay(self):
+        calls = []
+        def send(signal, sender, **named):
+            calls.append((signal, sender, named))
+            return louie.send(signal, sender, **named)
+        result = capture.replay(self._capture(), send)
+        louie.reset()
+        assert result['events'] == 4
+        assert result['throughput'] > 0
+        assert [c[0] for c in calls] == [
+            'changed', 'closed', 'changed', 'ignored']
+        assert calls[1][1] is louie.Anonymous
+        assert calls[0][1].__class__.__name__ == 'Model'
+        assert calls[0][2] == {'value': None, 'extra': None}
+
+    def test_ReplayTopology(self):
+        responses = []
+        def send(signal, sender, **named):
+            result = louie.send(signal, sender, **named)
+            responses.append(len(result))
+            return result
+        louie.reset()
+        capture.replay(capture.load(self._capture()), send)
+        assert responses == [2, 1, 2, 0]
+        assert len(dispatcher.connections) == 0
+
+    def test_LongSignal(self):
+        signal = 'x' * 70000
+        louie.connect(Receiver(), signal, weak=False)
+        f = Unclosable()
+        recorder = capture.Recorder(f)
+        capture.install_recorder(recorder)
+        assert len(louie.send(signal)) == 1
+        capture.remove_recorder(recorder)
+        recorder.close()
+        assert recorder.errors == 0
+        f.seek(0)
+        events = capture.load(f)
+        assert len(events) == 1
+        assert events[0].signal == signal
+
+    def test_Errors(self):
+        receiver = Receiver()
+        louie.connect(receiver, 'changed')
+        recorder = capture.Recorder(Full(), buffer_size=1)
+        capture.install_recorder(recorder)
+        stderr = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            responses = louie.send('changed', value=1)
+        finally:
+            sys.stderr = stderr
+        capture.remove_recorder(recorder)
+        assert len(responses) == 1
+        assert receiver.calls == 1
+        assert recorder.errors == 1
+
+    def test_Keywords(self):
+        names = ['from', 'class', 'print', 'value']
+        receiver = capture._make_receiver(names)
+        receiver(signal=None, sender=None, **dict.fromkeys(names))
+        model = Model()
+        received = []
+        def moved(**named):
+            received.append(sorted(named))
+        louie.connect(moved, 'moved', model)
+        f = Unclosable()
+        recorder = capture.Recorder(f)
+        capture.install_recorder(recorder)
+        louie.send('moved', model, **{'from': 1, 'to': 2})
+        capture.remove_recorder(recorder)
+        recorder.close()
+        louie.reset()
+        f.seek(0)
+        result = capture.replay(capture.load(f))
+        assert result['events'] == 1
@@ -0,0 +1,79 @@
+import unittest
+
+import louie
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Store(object):
+
+    def __init__(self):
+        self.calls = []
+
+    @louie.vectorized
+    def store(self, timestamp, reading):
+        self.calls.append((timestamp, reading))
+        return len(reading)
+
+
+class Check(object):
+
+    def __init__(self):
+        self.rows = []
+
+    def check(self, reading, sender):
+        self.rows.append((reading, sender))
+        return reading > 2
+
+
+class TestColumnar(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+
+    def test_Columnar(self):
+        store = Store()
+        check = Check()
+        sensor = object()
+        louie.connect(store.store, 'readings', sensor)
+        louie.connect(check.check, 'readings', louie.Any)
+        timestamps = [10, 11, 12, 13]
+        readings = [1, 2, 3, 4]
+        result = louie.send_columnar('readings', sensor,
+                                     timestamp=timestamps, reading=readings)
+        assert [response for receiver, response in result] == [
+            4, [False, False, True, True]]
+        assert store.calls == [(timestamps, readings)]
+        assert check.rows == [(1, sensor), (2, sensor), (3, sensor),
+                              (4, sensor)]
+
+    def test_Kw(self):
+        rows = []
+        def receive(**named):
+            rows.append(named)
+        louie.connect(receive, 'readings')
+        louie.send_columnar('readings', reading=[1, 2])
+        assert rows == [
+            {'reading': 1, 'signal': 'readings', 'sender': louie.Anonymous},
+            {'reading': 2, 'signal': 'readings', 'sender': louie.Anonymous},
+            ]
+
+    def test_Length(self):
+        self.assertRaises(ValueError, louie.send_columnar, 'readings',
+                          a=[1, 2], b=[1])
+
+    if numpy is not None:
+        def test_Numpy(self):
+            store = Store()
+            check = Check()
+            louie.connect(store.store, 'readings')
+            louie.connect(check.check, 'readings')
+            readings = numpy.arange(4)
+            louie.send_columnar('readings', timestamp=readings * 10,
+                                reading=readings)
+            assert store.calls[0][1] is readings
+            assert [type(reading) for reading, sender in check.rows] == \
+                   [int] * 4
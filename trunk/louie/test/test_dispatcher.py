@@ -152,3 +152,115 @@ class TestDispatcher(unittest.TestCase):
         err = result[0][1]
         assert isinstance(err, ValueError)
         assert err.args == ('this', )
+
+    def test_ReceiverCount(self):
+        a = Dummy()
+        b = Dummy()
+        c = Callable()
+        assert not louie.has_receivers('this', a)
+        assert louie.receiver_count('this', a) == 0
+        louie.connect(x, 'this', a)
+        assert louie.has_receivers('this', a)
+        assert not louie.has_receivers('this', b)
+        assert not louie.has_receivers('that', a)
+        assert louie.receiver_count('this', a) == 1
+        louie.connect(c.a, louie.All, a)
+        assert louie.has_receivers('that', a)
+        assert louie.receiver_count('this', a) == 2
+        assert louie.receiver_count('that', a) == 1
+        louie.connect(c, 'this', louie.Any)
+        assert louie.has_receivers('this', b)
+        assert louie.receiver_count('this', a) == 3
+        assert louie.receiver_count('this', b) == 1
+        assert louie.receiver_count('this', louie.Any) == 1
+        louie.connect(x, louie.All, louie.Any)
+        assert louie.receiver_count('other', b) == 1
+        assert louie.receiver_count(louie.All, louie.Any) == 1
+        assert louie.receiver_count('this', a) == 4
+        assert dispatcher.all_routes == 2
+        louie.disconnect(x, louie.All, louie.Any)
+        louie.disconnect(c, 'this', louie.Any)
+        assert not louie.has_receivers('this', b)
+        del c
+        assert louie.receiver_count('this', a) == 1
+        assert dispatcher.all_routes == 0
+        del a
+        assert not dispatcher.connections
+        self._isclean()
+
+    def test_EmptyRoutes(self):
+        a = Dummy()
+        louie.connect(x, 'that', louie.Any)
+        assert louie.send('this', a, a=1) == []
+        assert (id(a), 'this') in dispatcher.empty_routes
+        assert louie.send('this', a, a=1) == []
+        assert louie.send_robust('this', a, a=1) == []
+        assert louie.send_exact('this', a, a=1) == []
+        # Connecting anything invalidates the cache.
+        louie.connect(x, 'this', louie.Any)
+        assert not dispatcher.empty_routes
+        assert louie.send('this', a, a=1) == [(x, 1)]
+        assert louie.send('that', a, a=2) == [(x, 2)]
+        assert not dispatcher.empty_routes
+
+    def test_EmptyRoutesHooks(self):
+        a = Dummy()
+        calls = []
+        def hook(signal, sender, arguments, named, responses, start, error):
+            calls.append((signal, sender, named, responses, error))
+        dispatcher.send_hooks.append(hook)
+        assert louie.send('this', a, a=1) == []
+        assert (id(a), 'this') in dispatcher.empty_routes
+        # Known empty routes skip the receiver lookup.
+        lookup = dispatcher.get_all_receivers
+        dispatcher.get_all_receivers = None
+        try:
+            assert louie.send('this', a, a=2, b=louie.lazy(None)) == []
+        finally:
+            dispatcher.get_all_receivers = lookup
+        assert calls == [('this', a, {'a': 1}, [], None),
+                         ('this', a, {'a': 2}, [], None)]
+
+    def test_PrepareDeadAdapter(self):
+        c = Callable()
+        louie.connect(c.a, 'this', throttle=0)
+        send = louie.prepare('this')
+        assert [response for r, response in send(a=1)] == [1]
+        # Let the adapter outlive its receiver without a new generation.
+        adapter = dispatcher.connections.values()[0]['this'][0]
+        adapter.on_delete = None
+        current = dispatcher.generation
+        del c
+        assert dispatcher.generation == current
+        assert send(a=2) == []
+        assert louie.send('this', a=2) == []
+
+    def test_Prepare(self):
+        a = Dummy()
+        c = Callable()
+        def everything(**named):
+            return sorted(named.items())
+        def signal_only(signal, b=None):
+            return (signal, b)
+        send = louie.prepare('this', a)
+        assert send(a=1) == []
+        louie.connect(x, 'this', a)
+        louie.connect(c.a, 'this', louie.Any)
+        louie.connect(everything, louie.All, a)
+        louie.connect(signal_only, 'this', louie.Any, weak=False)
+        expected = louie.send('this', a, a=1, b=2)
+        assert send(a=1, b=2) == expected, (send(a=1, b=2), expected)
+        assert expected[:2] == [(x, 1), (everything, [
+            ('a', 1), ('b', 2), ('sender', a), ('signal', 'this')])]
+        # Changes to connections are picked up.
+        louie.disconnect(everything, louie.All, a)
+        assert send(a=1, b=2) == louie.send('this', a, a=1, b=2)
+        del c, expected
+        assert len(send(a=1)) == 2
+        louie.disconnect(signal_only, 'this', louie.Any, weak=False)
+        assert send(a=3) == [(x, 3)]
+        # Plugins are honored by falling back to send.
+        plugin = louie.Plugin()
+        plugin.wrap_receiver = lambda receiver: lambda a: -a
+        louie.install_plugin(plugin)
+        assert [response for r, response in send(a=4)] == [-4]
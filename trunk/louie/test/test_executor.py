@@ -0,0 +1,90 @@
+import threading
+import unittest
+
+import louie
+from louie import executor
+
+
+class Recorder(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = {}
+
+    def __call__(self, sender, sequence):
+        self.lock.acquire()
+        try:
+            self.events.setdefault(sender, []).append(sequence)
+        finally:
+            self.lock.release()
+
+
+class TestPartitionedExecutor(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+        self.executor = None
+
+    def tearDown(self):
+        if self.executor is not None:
+            self.executor.close()
+
+    def test_Order(self):
+        recorder = Recorder()
+        louie.connect(recorder, 'event')
+        self.executor = executor.PartitionedExecutor(workers=4)
+        senders = [object() for index in xrange(20)]
+        for sequence in xrange(50):
+            for sender in senders:
+                self.executor.send('event', sender, sequence=sequence)
+        self.executor.join()
+        assert len(recorder.events) == 20
+        for sender in senders:
+            assert recorder.events[sender] == range(50)
+        assert self.executor.delivered == self.executor.submitted == 1000
+
+    def test_Steal(self):
+        started = threading.Event()
+        release = threading.Event()
+        done = threading.Event()
+        threads = {}
+        def slow(sender):
+            threads[sender] = threading.currentThread()
+            if sender == 0:
+                started.set()
+                release.wait(5)
+            else:
+                done.set()
+        louie.connect(slow, 'work')
+        self.executor = executor.PartitionedExecutor(
+            workers=2, partitions=4, key=lambda sender: sender)
+        # Senders 0 and 2 have different partitions of the same worker.
+        first = self.executor.partition(0)
+        second = self.executor.partition(2)
+        assert first is not second and first.home == second.home
+        self.executor.send('work', 0)
+        started.wait(5)
+        self.executor.send('work', 2)
+        # Whichever worker is not blocked delivers for sender 2, one of
+        # them having stolen a partition of the other.
+        done.wait(5)
+        assert done.isSet()
+        release.set()
+        self.executor.join()
+        assert threads[0] is not threads[2]
+        assert self.executor.stolen >= 1
+
+    def test_Errors(self):
+        def fail():
+            raise ValueError
+        recorder = Recorder()
+        louie.connect(fail, 'bad')
+        louie.connect(recorder, 'good')
+        self.executor = executor.PartitionedExecutor(
+            workers=1, send=louie.send_robust)
+        self.executor.send('bad')
+        self.executor.send('good', sequence=1)
+        self.executor.close()
+        assert self.executor.errors == 0
+        assert recorder.events == {louie.Anonymous: [1]}
+        self.assertRaises(RuntimeError, self.executor.send, 'good')
@@ -0,0 +1,139 @@
+import threading
+import unittest
+
+import louie
+from louie import dispatcher
+
+
+class Dummy(object):
+    pass
+
+
+class Receiver(object):
+
+    def __init__(self):
+        self.args = []
+
+    def __call__(self, a):
+        self.args.append(a)
+
+    def method(self, a):
+        self.args.append(a)
+
+
+class TestConnectionGroup(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+
+    def _isclean(self):
+        """Assert that everything has been cleaned up"""
+        assert len(dispatcher.senders_back) == 0, dispatcher.senders_back
+        assert len(dispatcher.connections) == 0, dispatcher.connections
+        assert len(dispatcher.senders) == 0, dispatcher.senders
+
+    def test_Activate(self):
+        a = Dummy()
+        r = Receiver()
+        group = louie.scope()
+        group.activate()
+        try:
+            louie.connect(r, 'this', a)
+            louie.connect(r.method, 'that', a)
+            louie.connect(r, 'other')
+        finally:
+            group.deactivate()
+        assert dispatcher._scopes() == []
+        assert len(group) == 3
+        louie.send('this', a, a=1)
+        louie.send('that', a, a=2)
+        louie.send('other', a=3)
+        assert r.args == [1, 2, 3], r.args
+        assert group.disconnect_all() == 3
+        louie.send('this', a, a=1)
+        louie.send('that', a, a=2)
+        louie.send('other', a=3)
+        assert r.args == [1, 2, 3], r.args
+        assert len(group) == 0
+        self._isclean()
+
+    def test_Connect(self):
+        a = Dummy()
+        r = Receiver()
+        other = Receiver()
+        group = louie.ConnectionGroup()
+        group.connect(r, 'this', a)
+        louie.connect(other, 'this', a)
+        group.disconnect_all()
+        louie.send('this', a, a=1)
+        assert r.args == []
+        assert other.args == [1]
+        louie.disconnect(other, 'this', a)
+        self._isclean()
+
+    def test_Nested(self):
+        r1 = Receiver()
+        r2 = Receiver()
+        outer = louie.scope()
+        inner = louie.scope()
+        outer.activate()
+        louie.connect(r1, 'this')
+        inner.activate()
+        louie.connect(r2, 'this')
+        inner.deactivate()
+        outer.deactivate()
+        assert len(outer) == 2
+        assert len(inner) == 1
+        assert inner.disconnect_all() == 1
+        assert outer.disconnect_all() == 1
+        self._isclean()
+
+    def test_AlreadyDisconnected(self):
+        r = Receiver()
+        group = louie.scope()
+        group.connect(r, 'this')
+        group.connect(r, 'that')
+        louie.disconnect(r, 'this')
+        assert group.disconnect_all() == 1
+        assert group.disconnect_all() == 0
+        self._isclean()
+
+    def test_GarbageCollected(self):
+        r = Receiver()
+        group = louie.scope()
+        group.connect(r.method, 'this')
+        del r
+        assert group.disconnect_all() == 0
+        self._isclean()
+
+    def test_Threads(self):
+        r = Receiver()
+        other = Receiver()
+        group = louie.scope()
+        group.activate()
+        try:
+            louie.connect(r, 'this')
+            thread = threading.Thread(target=louie.connect,
+                                      args=(other, 'this'))
+            thread.start()
+            thread.join()
+        finally:
+            group.deactivate()
+        # The connection made by the other thread is not recorded.
+        assert len(group) == 1
+        assert group.disconnect_all() == 1
+        louie.send('this', a=1)
+        assert r.args == []
+        assert other.args == [1]
+        louie.disconnect(other, 'this')
+        self._isclean()
+
+    def test_Options(self):
+        r = Receiver()
+        group = louie.scope()
+        group.connect(r, 'this', throttle=10.0)
+        louie.send('this', a=1)
+        louie.send('this', a=2)
+        assert r.args == [1]
+        assert group.disconnect_all() == 1
+        self._isclean()
@@ -0,0 +1,95 @@
+import unittest
+from StringIO import StringIO
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+import louie
+from louie import dispatcher
+from louie import instrument
+
+
+def fast(a):
+    return a
+
+
+def fails():
+    raise ValueError('fails')
+
+
+class Receiver(object):
+
+    def method(self, a):
+        return a
+
+
+class TestInstrument(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+        instrument.clear()
+
+    def tearDown(self):
+        instrument.disable()
+        instrument.clear()
+
+    def _find(self, signal, receiver):
+        for record in louie.stats():
+            if record['signal'] == signal and record['receiver'] == receiver:
+                return record
+        raise AssertionError('No stats for %r %r' % (signal, receiver))
+
+    def test_Disabled(self):
+        louie.connect(fast, 'this')
+        louie.send('this', a=1)
+        assert dispatcher.apply_hook is None
+        assert louie.stats() == []
+
+    def test_Calls(self):
+        r = Receiver()
+        louie.connect(fast, 'this')
+        louie.connect(r.method, 'this')
+        louie.connect(fast, 'that', louie.Anonymous)
+        instrument.enable()
+        assert instrument.is_enabled()
+        louie.send('this', a=1)
+        louie.send('this', a=2)
+        louie.send_minimal('that', a=3)
+        louie.send_exact('that', louie.Anonymous, a=4)
+        record = self._find('this', __name__ + '.fast')
+        assert record['calls'] == 2
+        assert record['errors'] == 0
+        assert record['total'] >= record['max'] >= 0
+        assert len(record['histogram']) == instrument.HISTOGRAM_SIZE
+        assert sum(record['histogram']) == 2
+        record = self._find('this', 'Receiver.method')
+        assert record['calls'] == 2
+        record = self._find('that', __name__ + '.fast')
+        assert record['calls'] == 2
+        instrument.disable()
+        louie.send('this', a=5)
+        assert self._find('this', __name__ + '.fast')['calls'] == 2
+
+    def test_Errors(self):
+        louie.connect(fails, 'this')
+        instrument.enable()
+        louie.send_robust('this')
+        self.assertRaises(ValueError, louie.send, 'this')
+        record = self._find('this', __name__ + '.fails')
+        assert record['calls'] == 2
+        assert record['errors'] == 2
+
+    def test_Dump(self):
+        louie.connect(fast, 'this')
+        instrument.enable()
+        louie.send('this', a=1)
+        f = StringIO()
+        instrument.dump(f)
+        assert json.loads(f.getvalue()) == louie.stats()
+
+    def test_Reset(self):
+        instrument.enable()
+        louie.reset()
+        assert not instrument.is_enabled()
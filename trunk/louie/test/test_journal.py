@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import louie
+from louie import journal
+
+
+class Model(object):
+
+    def __init__(self, name):
+        self.name = name
+
+
+class Receiver(object):
+
+    def __init__(self):
+        self.args = []
+
+    def __call__(self, value=None):
+        self.args.append(value)
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _journal(self, count, **options):
+        options.setdefault('commit_interval', None)
+        j = journal.Journal(self.directory, **options)
+        journal.install_journal(j)
+        model = Model('model')
+        for n in xrange(count):
+            louie.send('changed', model, value=n)
+        journal.remove_journal(j)
+        return j
+
+    def test_Read(self):
+        j = self._journal(10)
+        assert list(journal.read(self.directory)) == []
+        j.commit()
+        records = list(journal.read(self.directory))
+        assert [r.number for r in records] == range(10)
+        assert [r.named for r in records] == [{'value': n} for n in range(10)]
+        assert records[0].signal == 'changed'
+        assert records[0].sender == 'model'
+        j.close()
+        assert len(list(journal.read(self.directory))) == 10
+
+    def test_Rotate(self):
+        j = self._journal(100, segment_size=512, index_interval=8)
+        j.close()
+        segments = [name for name in os.listdir(self.directory)
+                    if name.endswith('.seg')]
+        assert len(segments) > 1
+        records = list(journal.read(self.directory, start=37, stop=60))
+        assert [r.number for r in records] == range(37, 60)
+        # Timestamps select the same records.
+        since = records[0].timestamp
+        until = records[-1].timestamp
+        numbers = [r.number for r in
+                   journal.read(self.directory, since=since, until=until)]
+        assert numbers[0] <= 37 and numbers[-1] >= 58
+
+    def test_Reopen(self):
+        self._journal(5, segment_size=512).close()
+        self._journal(5, segment_size=512).close()
+        records = list(journal.read(self.directory))
+        assert [r.number for r in records] == range(10)
+
+    def test_GroupCommit(self):
+        j = self._journal(20, commit_interval=0.01)
+        j.close()
+        assert len(list(journal.read(self.directory))) == 20
+
+    def test_Replay(self):
+        self._journal(5).close()
+        r = Receiver()
+        model = Model('model')
+        louie.connect(r, 'changed', model)
+        count = journal.replay(self.directory, start=2,
+                               senders={'model': model})
+        assert count == 3
+        assert r.args == [2, 3, 4]
+
+    def test_Unpicklable(self):
+        j = journal.Journal(self.directory, commit_interval=None)
+        journal.install_journal(j)
+        louie.send('changed', value=lambda: None, other=1)
+        journal.remove_journal(j)
+        j.close()
+        record = list(journal.read(self.directory))[0]
+        assert record.sender == 'Anonymous'
+        assert record.named['other'] == 1
+        assert isinstance(record.named['value'], str)
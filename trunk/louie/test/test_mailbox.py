@@ -0,0 +1,165 @@
+import sys
+import threading
+import unittest
+from StringIO import StringIO
+
+import louie
+from louie import mailbox
+
+
+class Receiver(object):
+
+    def __init__(self):
+        self.args = []
+
+    def __call__(self, a):
+        self.args.append(a)
+
+
+class TestMailbox(unittest.TestCase):
+
+    def setUp(self):
+        self.receiver = Receiver()
+
+    def _fill(self, box, values):
+        return [box.put((), {'a': value}) for value in values]
+
+    def test_Process(self):
+        box = mailbox.Mailbox(self.receiver, capacity=4)
+        assert self._fill(box, [1, 2, 3]) == [mailbox.QUEUED] * 3
+        assert len(box) == 3
+        assert box.process(2) == 2
+        assert self.receiver.args == [1, 2]
+        assert box.process() == 1
+        assert self.receiver.args == [1, 2, 3]
+
+    def test_DropOldest(self):
+        box = mailbox.Mailbox(self.receiver, 2, mailbox.DROP_OLDEST)
+        assert self._fill(box, [1, 2, 3]) == [mailbox.QUEUED] * 3
+        box.process()
+        assert self.receiver.args == [2, 3]
+        stats = box.stats()
+        assert stats['dropped'] == 1
+        assert stats['high_water'] == 2
+        assert stats['delivered'] == 2
+        assert stats['depth'] == 0
+
+    def test_DropNewest(self):
+        box = mailbox.Mailbox(self.receiver, 2, mailbox.DROP_NEWEST)
+        assert self._fill(box, [1, 2, 3]) == [
+            mailbox.QUEUED, mailbox.QUEUED, mailbox.DROPPED]
+        box.process()
+        assert self.receiver.args == [1, 2]
+        assert box.dropped == 1
+
+    def test_Coalesce(self):
+        box = mailbox.Mailbox(self.receiver, 2, mailbox.COALESCE)
+        assert self._fill(box, [1, 2, 3, 4]) == [
+            mailbox.QUEUED, mailbox.QUEUED,
+            mailbox.COALESCED, mailbox.COALESCED]
+        box.process()
+        assert self.receiver.args == [1, 4]
+
+    def test_CoalesceKey(self):
+        def parity(arguments, named):
+            return named['a'] % 2
+        box = mailbox.Mailbox(self.receiver, 2, mailbox.COALESCE, key=parity)
+        self._fill(box, [1, 2, 3])
+        box.process()
+        assert self.receiver.args == [3, 2]
+        box = mailbox.Mailbox(self.receiver, 2, mailbox.COALESCE, key=parity)
+        self._fill(box, [1, 3, 4])
+        # No pending call with the key of 4; the oldest is dropped.
+        assert box.dropped == 1
+
+    def test_BlockTimeout(self):
+        box = mailbox.Mailbox(self.receiver, 1, mailbox.BLOCK, timeout=0.01)
+        box.put((), {'a': 1})
+        self.assertRaises(mailbox.MailboxFull, box.put, (), {'a': 2})
+        assert box.dropped == 1
+
+    def test_BlockThread(self):
+        release = threading.Event()
+        received = []
+        def slow(a):
+            release.wait(10)
+            received.append(a)
+        box = mailbox.Mailbox(slow, 1, mailbox.BLOCK, timeout=10)
+        box.start()
+        try:
+            box.put((), {'a': 1})
+            box.put((), {'a': 2})
+            release.set()
+            # Blocks until the worker has taken the second call.
+            box.put((), {'a': 3})
+        finally:
+            box.close()
+        assert received == [1, 2, 3]
+
+    def test_Policy(self):
+        self.assertRaises(ValueError, mailbox.Mailbox, self.receiver, 1, 'x')
+
+    def test_Lanes(self):
+        def urgency(arguments, named):
+            return int(named['a'] >= 0)
+        box = mailbox.Mailbox(self.receiver, 3, mailbox.DROP_OLDEST,
+                              lanes=2, lane=urgency)
+        self._fill(box, [1, 2, -1])
+        assert box.stats()['lanes'] == [1, 2]
+        # The oldest call of the lowest priority lane is dropped.
+        assert self._fill(box, [-2]) == [mailbox.QUEUED]
+        box.process()
+        assert self.receiver.args == [-1, -2, 2]
+        # A call of the lowest priority lane is dropped itself when
+        # the mailbox only holds calls of higher priority lanes.
+        self._fill(box, [-1, -2, -3])
+        assert self._fill(box, [4]) == [mailbox.DROPPED]
+        assert box.put((), {'a': 5}, lane=0) == mailbox.QUEUED
+        self.assertRaises(ValueError, box.put, (), {'a': 6}, lane=2)
+
+    def test_Expire(self):
+        louie.reset()
+        now = [100.0]
+        def clock():
+            return now[0]
+        dead = []
+        def dead_letter(sender, named, lane):
+            dead.append((sender, named['a'], lane))
+        louie.connect(dead_letter, mailbox.CallExpired)
+        box = mailbox.Mailbox(self.receiver, ttl=1.0, dead_letter=True,
+                              clock=clock)
+        self._fill(box, [1, 2])
+        box.put((), {'a': 3}, ttl=5.0)
+        now[0] += 2.0
+        assert box.process() == 1
+        assert self.receiver.args == [3]
+        assert box.stats()['expired'] == 2
+        assert dead == [(box, 1, 0), (box, 2, 0)]
+        # Without dead letters, expired calls are only counted.
+        box.dead_letter = False
+        self._fill(box, [4])
+        now[0] += 2.0
+        assert box.get(0) is None
+        assert box.expired == 3
+        assert len(dead) == 2
+
+    def test_ExpireError(self):
+        louie.reset()
+        def dead_letter():
+            raise ValueError('dead letter')
+        louie.connect(dead_letter, mailbox.CallExpired)
+        box = mailbox.Mailbox(self.receiver, ttl=0.0, dead_letter=True)
+        stderr = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            self._fill(box, [1])
+            assert box.process() == 0
+            box.start()
+            self._fill(box, [2])
+            box.put((), {'a': 3}, ttl=60.0)
+            box.close()
+        finally:
+            sys.stderr = stderr
+        assert self.receiver.args == [3]
+        assert box.expired == 2
+        assert len(box) == 0
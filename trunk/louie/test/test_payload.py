@@ -0,0 +1,157 @@
+import unittest
+
+import louie
+from louie import dispatcher
+
+
+class Counter(object):
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def wants_diff(diff):
+    return diff
+
+
+def wants_other(other=None):
+    return other
+
+
+def wants_all(**named):
+    return named.get('diff')
+
+
+def wants_job(job):
+    return job
+
+
+def wants_events(events):
+    return len(events)
+
+
+def fails():
+    raise ValueError('lazy')
+
+
+class Named(object):
+    """Receiver with an unrelated ``accepted_names`` attribute."""
+
+    accepted_names = ('diff', )
+
+    def __call__(self, other=None):
+        return other
+
+
+class TestLazy(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+
+    def test_NotAccepted(self):
+        diff = Counter('diff')
+        louie.connect(wants_other, 'changed')
+        for send in (louie.send, louie.send_robust, louie.send_minimal):
+            assert send('changed', diff=louie.lazy(diff)) == [
+                (wants_other, None)]
+        assert louie.send_exact(
+            'changed', louie.Anonymous, diff=louie.lazy(diff)) == []
+        assert diff.calls == 0
+
+    def test_Accepted(self):
+        diff = Counter('diff')
+        louie.connect(wants_other, 'changed')
+        louie.connect(wants_diff, 'changed')
+        louie.connect(wants_all, 'changed')
+        result = louie.send('changed', diff=louie.lazy(diff), other=1)
+        assert result == [
+            (wants_other, 1), (wants_diff, 'diff'), (wants_all, 'diff')]
+        assert diff.calls == 1
+
+    def test_Kw(self):
+        diff = Counter('diff')
+        louie.connect(wants_all, 'changed')
+        assert louie.send('changed', diff=louie.lazy(diff)) == [
+            (wants_all, 'diff')]
+        assert diff.calls == 1
+
+    def test_Prepared(self):
+        diff = Counter('diff')
+        send = louie.prepare('changed')
+        louie.connect(wants_other, 'changed')
+        assert send(diff=louie.lazy(diff)) == [(wants_other, None)]
+        assert diff.calls == 0
+        louie.connect(wants_diff, 'changed')
+        assert send(diff=louie.lazy(diff)) == [
+            (wants_other, None), (wants_diff, 'diff')]
+        assert diff.calls == 1
+
+    def test_Group(self):
+        diag = Counter('diag')
+        louie.connect(wants_job, 'work', group='workers')
+        louie.connect(wants_other, 'work', group='workers')
+        assert louie.send('work', job=1, diag=louie.lazy(diag))[0][1] == 1
+        assert diag.calls == 0
+        louie.connect(wants_all, 'work', group='workers')
+        louie.send('work', job=1, diag=louie.lazy(diag))
+        assert diag.calls == 1
+
+    def test_GroupKey(self):
+        key = Counter('a')
+        louie.connect(wants_job, 'work', group='workers',
+                      strategy=louie.balance.HASH, key='user')
+        assert louie.send('work', job=1, user=louie.lazy(key))[0][1] == 1
+        assert key.calls == 1
+
+    def test_Adapters(self):
+        diff = Counter('diff')
+        louie.connect(wants_other, 'changed', throttle=60)
+        louie.connect(wants_job, 'changed', thread=louie.affinity.current)
+        responses = louie.send('changed', job=1, diff=louie.lazy(diff))
+        assert [response for receiver, response in responses] == [None, 1]
+        assert diff.calls == 0
+        louie.connect(wants_diff, 'changed', throttle=60)
+        louie.send('changed', job=1, diff=louie.lazy(diff))
+        assert diff.calls == 1
+
+    def test_Batch(self):
+        diff = Counter('diff')
+        louie.connect(wants_events, 'changed', batch_size=1)
+        assert louie.send('changed', diff=louie.lazy(diff))[0][1] == 1
+        assert diff.calls == 1
+
+    def test_Cached(self):
+        diff = Counter('diff')
+        louie.connect(wants_other, 'changed')
+        louie.send('changed', diff=louie.lazy(diff))
+        key = (id(louie.Anonymous), 'changed', dispatcher.get_all_receivers)
+        assert dispatcher.accepted_routes[key] == (
+            dispatcher.generation, set(['other']))
+        louie.connect(wants_diff, 'changed')
+        louie.send('changed', diff=louie.lazy(diff))
+        assert diff.calls == 1
+        assert dispatcher.accepted_routes[key][1] == set(['other', 'diff'])
+
+    def test_Robust(self):
+        louie.connect(wants_diff, 'changed')
+        louie.connect(wants_other, 'changed')
+        responses = louie.send_robust('changed', diff=louie.lazy(fails))
+        assert [receiver for receiver, response in responses] == [
+            wants_diff, wants_other]
+        for receiver, response in responses:
+            assert isinstance(response, ValueError)
+        self.assertRaises(ValueError, louie.send, 'changed',
+                          diff=louie.lazy(fails))
+
+    def test_Attribute(self):
+        diff = Counter('diff')
+        receiver = Named()
+        louie.connect(receiver, 'changed')
+        assert louie.send('changed', diff=louie.lazy(diff), other=1) == [
+            (receiver, 1)]
+        assert diff.calls == 0
@@ -0,0 +1,87 @@
+import unittest
+
+import louie
+from louie import timing
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Receiver(object):
+
+    def __init__(self):
+        self.values = []
+
+    def __call__(self, value):
+        self.values.append(value)
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+        self.clock = Clock()
+        timing.default_wheel = timing.TimerWheel(clock=self.clock)
+        self.receiver = Receiver()
+        louie.connect(self.receiver, 'out')
+
+    def tearDown(self):
+        timing.default_wheel = timing.TimerWheel()
+
+    def test_FilterMap(self):
+        sensor = object()
+        pipeline = louie.stream('reading', sensor) \
+                   .filter(lambda value: value['celsius'] is not None) \
+                   .map(lambda value: value['celsius'] * 2) \
+                   .filter(lambda value: value > 0) \
+                   .to('out')
+        for celsius in [1, None, -1, 3]:
+            louie.send('reading', sensor, celsius=celsius)
+        louie.send('reading', object(), celsius=5)
+        assert self.receiver.values == [2, 6]
+        # The pipeline is a single receiver.
+        assert len(list(louie.get_all_receivers(sensor, 'reading'))) == 1
+        pipeline.close()
+        louie.send('reading', sensor, celsius=4)
+        assert self.receiver.values == [2, 6]
+        assert not louie.has_receivers('reading', sensor)
+
+    def test_Named(self):
+        received = []
+        def receive(a, b):
+            received.append((a, b))
+        louie.connect(receive, 'out2')
+        louie.stream('in').map(
+            lambda value: {'a': value['x'], 'b': -value['x']}).to('out2')
+        louie.send('in', x=1)
+        assert received == [(1, -1)]
+
+    def test_Buffer(self):
+        base = louie.stream('in').map(lambda value: value['x'])
+        base.buffer(2).map(sum).to('out')
+        base.filter(lambda x: x > 2).to('out')
+        for x in range(5):
+            louie.send('in', x=x)
+        self.receiver.values.sort()
+        assert self.receiver.values == [1, 3, 4, 5]
+
+    def test_Window(self):
+        pipeline = louie.stream('in').map(lambda value: value['x']) \
+                   .window(0.1).to('out')
+        louie.send('in', x=1)
+        self.clock.now += 0.05
+        louie.send('in', x=2)
+        timing.default_wheel.advance()
+        assert self.receiver.values == []
+        self.clock.now += 0.06
+        timing.default_wheel.advance()
+        assert self.receiver.values == [[1, 2]]
+        louie.send('in', x=3)
+        pipeline.close()
+        assert len(timing.default_wheel) == 0
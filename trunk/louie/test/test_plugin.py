@@ -1,5 +1,7 @@
 """Louie plugin tests."""
 
+import threading
+import time
 import unittest
 
 import louie
@@ -30,6 +32,23 @@ class Receiver2(ReceiverBase):
     pass
 
 
+def square(value):
+    return value * value
+
+
+class Multiplier(object):
+
+    def __init__(self, factor):
+        self.factor = factor
+
+    def multiply(self, value):
+        return value * self.factor
+
+
+def checked(value, **named):
+    return sorted(named)
+
+
 class Plugin1(louie.Plugin):
 
     def is_live(self, receiver):
@@ -114,6 +133,105 @@ def test_is_live():
     assert receiver2b.args == ['foo']
     
 
+def test_process_pool():
+    louie.reset()
+    plugin = louie.ProcessPoolDispatchPlugin(processes=2)
+    louie.install_plugin(plugin)
+    multiplier = Multiplier(3)
+    louie.connect(square, 'sig')
+    louie.connect(multiplier.multiply, 'sig')
+    try:
+        # Arguments the receivers don't accept are not pickled.
+        responses = louie.send('sig', value=4, unpicklable=lambda: None)
+        results = [response.get(10) for receiver, response in responses]
+    finally:
+        plugin.close()
+    assert sorted(results) == [12, 16], results
+
+
+def test_process_pool_predicate():
+    louie.reset()
+    plugin = louie.ProcessPoolDispatchPlugin(
+        processes=1, predicate=lambda receiver: receiver is checked)
+    louie.install_plugin(plugin)
+    louie.connect(checked, 'sig')
+    louie.connect(square, 'sig')
+    try:
+        responses = dict(louie.send('sig', value=2))
+        assert responses[square] == 4
+        del responses[square]
+        assert responses.values()[0].get(10) == ['sender', 'signal']
+    finally:
+        plugin.close()
+
+
+def test_mailbox():
+    louie.reset()
+    plugin = louie.MailboxDispatchPlugin(
+        capacity=2, policy=louie.mailbox.DROP_NEWEST, threaded=False)
+    louie.install_plugin(plugin)
+    receiver = Receiver1()
+    louie.connect(receiver, 'sig')
+    results = []
+    for arg in range(3):
+        results.extend([response for r, response in
+                        louie.send('sig', arg=arg)])
+    assert results == [louie.mailbox.QUEUED, louie.mailbox.QUEUED,
+                       louie.mailbox.DROPPED], results
+    assert receiver.args == []
+    stats = plugin.stats()
+    assert len(stats) == 1
+    assert stats[0]['receiver'] is receiver
+    assert stats[0]['depth'] == 2
+    assert stats[0]['dropped'] == 1
+    assert plugin.process() == 2
+    assert receiver.args == [0, 1]
+    # Mailboxes are removed with their receivers.
+    del receiver, stats
+    assert plugin.mailboxes == {}
+
+
+def test_mailbox_threaded():
+    louie.reset()
+    plugin = louie.MailboxDispatchPlugin()
+    louie.install_plugin(plugin)
+    receiver1 = Receiver1()
+    receiver2 = Receiver2()
+    louie.connect(receiver1, 'sig')
+    louie.connect(receiver2, 'sig')
+    try:
+        for arg in range(10):
+            louie.send('sig', arg=arg)
+    finally:
+        plugin.close()
+    assert receiver1.args == range(10)
+    assert receiver2.args == range(10)
+
+
+def test_mailbox_concurrent():
+    louie.reset()
+    plugin = louie.MailboxDispatchPlugin(threaded=False)
+    mailbox = plugin._mailbox
+    class SlowMailbox(mailbox.Mailbox):
+        def __init__(self, *args):
+            time.sleep(0.01)
+            mailbox.Mailbox.__init__(self, *args)
+    class Module(object):
+        Mailbox = SlowMailbox
+    plugin._mailbox = Module
+    receiver = Receiver1()
+    results = []
+    def run():
+        results.append(plugin.mailbox(receiver))
+    threads = [threading.Thread(target=run) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(plugin.mailboxes) == 1
+    assert results == [plugin.mailboxes.values()[0]] * 4
+
+
 if qt is not None:
     def test_qt_plugin():
         louie.reset()
@@ -0,0 +1,102 @@
+import gc
+import unittest
+
+import louie
+from louie import reactive
+
+
+class Observer(object):
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, sender, value):
+        self.events.append((sender, value))
+
+
+class TestReactive(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+        self.graph = reactive.Graph()
+        self.calls = []
+
+    def _computed(self, label, function, *inputs):
+        calls = self.calls
+        def compute(*values):
+            calls.append(label)
+            return function(*values)
+        return reactive.computed(compute, *inputs)
+
+    def test_Diamond(self):
+        item = object()
+        price = louie.cell('price', item, initial=1, graph=self.graph)
+        quantity = louie.cell('quantity', item, initial=2, graph=self.graph)
+        total = self._computed('total', lambda p, q: p * q, price, quantity)
+        taxed = self._computed('taxed', lambda t: t * 10, total)
+        report = self._computed('report', lambda t, x: (t, x), total, taxed)
+        assert report.value == (2, 20)
+        del self.calls[:]
+        observer = Observer()
+        louie.connect(observer, reactive.Changed)
+        louie.send('price', item, value=3)
+        assert self.calls == ['total', 'taxed', 'report']
+        assert report.value == (6, 60)
+        # Observers see consistent values, in topological order.
+        assert observer.events == [
+            (price, 3), (total, 6), (taxed, 60), (report, (6, 60))]
+        assert self.graph.recomputations == 3
+
+    def test_Unchanged(self):
+        a = louie.cell(graph=self.graph, initial=1)
+        sign = self._computed('sign', lambda v: v > 0, a)
+        negated = self._computed('negated', lambda s: not s, sign)
+        del self.calls[:]
+        a.set(5)
+        # The sign did not change, so its dependents are not recomputed.
+        assert self.calls == ['sign']
+        a.set(5)
+        assert self.calls == ['sign']
+        a.set(-1)
+        assert self.calls == ['sign', 'sign', 'negated']
+        assert negated.value
+
+    def test_Transaction(self):
+        a = louie.cell('a', graph=self.graph, initial=0)
+        b = louie.cell('b', graph=self.graph, initial=0)
+        total = self._computed('total', lambda x, y: x + y, a, b)
+        del self.calls[:]
+        self.graph.begin()
+        try:
+            louie.send('a', value=1)
+            louie.send('b', value=2)
+            assert total.value == 0
+        finally:
+            self.graph.commit()
+        assert self.calls == ['total']
+        assert total.value == 3
+
+    def test_Error(self):
+        a = louie.cell(graph=self.graph, initial=1)
+        inverse = reactive.computed(lambda v: 1.0 / v, a)
+        self.assertRaises(ZeroDivisionError, a.set, 0)
+        a.set(4)
+        assert inverse.value == 0.25
+        assert self.graph.depth == 0
+
+    def test_Garbage(self):
+        a = louie.cell('a', graph=self.graph, initial=1)
+        double = reactive.computed(lambda v: v * 2, a)
+        assert len(a.dependents) == 1
+        del double
+        gc.collect()
+        assert len(a.dependents) == 0
+        del a
+        gc.collect()
+        assert not louie.has_receivers('a', louie.Anonymous)
+
+    def test_Graphs(self):
+        a = louie.cell(graph=self.graph)
+        b = louie.cell(graph=reactive.Graph())
+        self.assertRaises(ValueError, reactive.computed, max, a, b)
+        self.assertRaises(ValueError, reactive.computed, max)
@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+import louie
+from louie import shm
+
+
+class Sample(louie.Signal):
+    pass
+
+
+class Receiver(object):
+
+    def __init__(self):
+        self.args = []
+
+    def __call__(self, signal, value=None):
+        self.args.append((signal, value))
+
+
+def _publish(path, count):
+    ring = shm.Ring.open(path)
+    publisher = shm.Publisher(ring, [Sample])
+    for n in xrange(count):
+        publisher.publish(Sample, value=n)
+    publisher.publish('done')
+
+
+class TestShm(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'ring')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_PublishDrain(self):
+        ring = shm.Ring.create(self.path, slots=8, slot_size=64)
+        publisher = shm.Publisher(ring, [Sample])
+        subscriber = shm.Subscriber(shm.Ring.open(self.path), [Sample])
+        r = Receiver()
+        louie.connect(r, louie.All, subscriber)
+        publisher.publish(Sample, value=1)
+        publisher.publish('text', value=[1, 2])
+        publisher.publish('object', value=Receiver)
+        assert subscriber.drain() == 3
+        assert r.args == [(Sample, 1), ('text', [1, 2]), ('object', Receiver)]
+        assert subscriber.drain() == 0
+
+    def test_Forward(self):
+        ring = shm.Ring.create(self.path)
+        publisher = shm.Publisher(ring)
+        subscriber = shm.Subscriber(ring)
+        r = Receiver()
+        louie.connect(r, 'sample', subscriber)
+        publisher.forward('sample')
+        louie.send('sample', value=5)
+        louie.send('other', value=6)
+        publisher.close()
+        louie.send('sample', value=7)
+        subscriber.drain()
+        assert r.args == [('sample', 5)]
+
+    def test_Overrun(self):
+        ring = shm.Ring.create(self.path, slots=4, slot_size=64)
+        publisher = shm.Publisher(ring)
+        subscriber = shm.Subscriber(ring)
+        r = Receiver()
+        louie.connect(r, 'sample', subscriber)
+        for n in xrange(10):
+            publisher.publish('sample', value=n)
+        assert subscriber.drain(limit=2) == 2
+        assert subscriber.dropped == 6
+        assert r.args == [('sample', 6), ('sample', 7)]
+        assert subscriber.drain() == 2
+
+    def test_Large(self):
+        ring = shm.Ring.create(None, slots=2, slot_size=64)
+        publisher = shm.Publisher(ring)
+        subscriber = shm.Subscriber(ring)
+        r = Receiver()
+        louie.connect(r, 'sample', subscriber)
+        publisher.publish('sample', value='x' * 1000)
+        assert subscriber.drain() == 1
+        assert r.args == [('sample', 'x' * 1000)]
+        publisher.close()
+
+    def test_Processes(self):
+        ring = shm.Ring.create(self.path, slots=4096)
+        subscriber = shm.Subscriber(ring, [Sample])
+        values = []
+        louie.connect(lambda value: values.append(value), Sample, subscriber,
+                      weak=False)
+        done = []
+        louie.connect(lambda: done.append(True), 'done', subscriber,
+                      weak=False)
+        process = multiprocessing.Process(
+            target=_publish, args=(self.path, 1000))
+        process.start()
+        process.join(10)
+        subscriber.drain()
+        assert done
+        assert values == range(1000)
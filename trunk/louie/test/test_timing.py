@@ -0,0 +1,191 @@
+import gc
+import unittest
+
+import louie
+from louie import dispatcher
+from louie import timing
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Receiver(object):
+
+    def __init__(self):
+        self.args = []
+
+    def __call__(self, a):
+        self.args.append(a)
+
+
+class TestTimerWheel(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.wheel = timing.TimerWheel(resolution=0.01, bits=4, levels=3,
+                                       clock=self.clock)
+        self.fired = []
+
+    def test_Schedule(self):
+        wheel = self.wheel
+        wheel.schedule(0.05, self.fired.append, 'a')
+        wheel.schedule(0.02, self.fired.append, 'b')
+        assert len(wheel) == 2
+        assert wheel.advance(1000.01) == 0
+        assert wheel.advance(1000.03) == 1
+        assert self.fired == ['b']
+        assert wheel.advance(1000.10) == 1
+        assert self.fired == ['b', 'a']
+        assert len(wheel) == 0
+
+    def test_Cancel(self):
+        wheel = self.wheel
+        timer = wheel.schedule(0.05, self.fired.append, 'a')
+        wheel.cancel(timer)
+        wheel.cancel(timer)
+        assert len(wheel) == 0
+        wheel.advance(1001.0)
+        assert self.fired == []
+
+    def test_Cascade(self):
+        # 16 slots per level: delays of up to 40.96 seconds span all
+        # three levels, and longer ones are parked.
+        wheel = self.wheel
+        delays = [0.15, 0.16, 0.17, 2.55, 2.56, 2.57, 30.0, 50.0, 100.0]
+        for delay in delays:
+            wheel.schedule(delay, self.fired.append, delay)
+        now = 1000.0
+        while now < 1101.0:
+            now += 0.01
+            wheel.advance(now)
+            for delay in self.fired:
+                assert abs(1000.0 + delay - now) < 0.015, (delay, now)
+            delays = [delay for delay in delays if delay not in self.fired]
+            del self.fired[:]
+        assert delays == []
+        assert len(wheel) == 0
+
+    def test_Error(self):
+        def fail():
+            raise ValueError
+        self.wheel.schedule(0.01, fail)
+        self.wheel.schedule(0.01, self.fired.append, 'a')
+        assert self.wheel.advance(1000.02) == 2
+        assert self.fired == ['a']
+
+
+class TestThrottleDebounce(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+        self.clock = Clock()
+        self.wheel = timing.default_wheel = timing.TimerWheel(
+            clock=self.clock)
+
+    def tearDown(self):
+        timing.default_wheel = timing.TimerWheel()
+
+    def _isclean(self):
+        """Assert that everything has been cleaned up"""
+        assert len(dispatcher.senders_back) == 0, dispatcher.senders_back
+        assert len(dispatcher.connections) == 0, dispatcher.connections
+        assert len(dispatcher.senders) == 0, dispatcher.senders
+
+    def test_Throttle(self):
+        r = Receiver()
+        louie.connect(r, 'this', throttle=10.0)
+        louie.send('this', a=1)
+        louie.send('this', a=2)
+        assert r.args == [1]
+        louie.disconnect(r, 'this')
+        louie.send('this', a=3)
+        assert r.args == [1]
+        self._isclean()
+
+    def test_ThrottleInterval(self):
+        r = Receiver()
+        receiver = timing.Throttle(r, 0.1, clock=self.clock)
+        receiver(a=1)
+        self.clock.now += 0.05
+        receiver(a=2)
+        self.clock.now += 0.06
+        receiver(a=3)
+        assert r.args == [1, 3]
+
+    def test_Debounce(self):
+        r = Receiver()
+        louie.connect(r, 'this', debounce=0.05)
+        louie.send('this', a=1)
+        louie.send('this', a=2)
+        assert r.args == []
+        self.clock.now += 0.03
+        louie.send('this', a=3)
+        self.clock.now += 0.03
+        self.wheel.advance()
+        assert r.args == []
+        self.clock.now += 0.03
+        self.wheel.advance()
+        assert r.args == [3]
+        louie.disconnect(r, 'this')
+        self._isclean()
+
+    def test_DebounceDisconnect(self):
+        r = Receiver()
+        louie.connect(r, 'this', debounce=0.05)
+        louie.send('this', a=1)
+        assert len(self.wheel) == 1
+        louie.disconnect(r, 'this')
+        # The pending call is cancelled with the connection.
+        assert len(self.wheel) == 0
+        self.clock.now += 0.1
+        self.wheel.advance()
+        assert r.args == []
+        self._isclean()
+
+    def test_DebounceReset(self):
+        r = Receiver()
+        louie.connect(r, 'this', debounce=0.05)
+        louie.send('this', a=1)
+        assert len(self.wheel) == 1
+        louie.reset()
+        assert len(self.wheel) == 0
+        self.clock.now += 0.1
+        self.wheel.advance()
+        assert r.args == []
+
+    def test_DebounceGarbageCollected(self):
+        class Collected(object):
+            def receive(self, a):
+                calls.append(a)
+        calls = []
+        instance = Collected()
+        louie.connect(instance.receive, 'this', debounce=0.05)
+        louie.send('this', a=1)
+        del instance
+        gc.collect()
+        assert len(self.wheel) == 0
+        self._isclean()
+
+    def test_GarbageCollected(self):
+        r = Receiver()
+        louie.connect(r, 'this', throttle=0.1)
+        del r
+        gc.collect()
+        self._isclean()
+
+    def test_Reconnect(self):
+        r = Receiver()
+        louie.connect(r, 'this')
+        louie.connect(r, 'this', throttle=10.0)
+        assert len(list(louie.get_all_receivers(signal='this'))) == 1
+        louie.send('this', a=1)
+        louie.send('this', a=2)
+        assert r.args == [1]
+        louie.disconnect(r, 'this')
+        self._isclean()
@@ -0,0 +1,80 @@
+import unittest
+from StringIO import StringIO
+
+import louie
+from louie import trace
+
+
+def receiver(a):
+    return a
+
+
+def fails():
+    raise ValueError('fails')
+
+
+class TestTracer(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+
+    def test_Record(self):
+        sender = object()
+        louie.connect(receiver, 'this')
+        louie.connect(fails, 'that')
+        tracer = trace.Tracer(size=8)
+        trace.install_tracer(tracer)
+        louie.send('this', sender, a=1)
+        louie.send_robust('that')
+        louie.send('other')
+        records = tracer.snapshot()
+        assert len(records) == 3
+        assert [r[1] for r in records] == ['this', 'that', 'other']
+        assert records[0][2] == id(sender)
+        assert [r[3] for r in records] == [1, 1, 0]
+        for (timestamp, signal, senderkey, count, duration,
+             failed) in records:
+            assert timestamp > 0
+            assert duration >= 0
+            assert not failed
+        trace.remove_tracer(tracer)
+        louie.send('this', sender, a=1)
+        assert len(tracer) == 3
+
+    def test_Failed(self):
+        louie.connect(receiver, 'this')
+        louie.connect(fails, 'this')
+        tracer = trace.Tracer(size=8)
+        trace.install_tracer(tracer)
+        self.assertRaises(ValueError, louie.send, 'this', a=1)
+        records = tracer.snapshot()
+        assert len(records) == 1
+        assert records[0][1] == 'this'
+        assert records[0][3] == 1
+        assert records[0][5]
+        f = StringIO()
+        tracer.dump(f)
+        f.seek(0)
+        assert trace.load(f) == records
+
+    def test_Wrap(self):
+        tracer = trace.Tracer(size=4)
+        trace.install_tracer(tracer)
+        for i in range(10):
+            louie.send(i)
+        assert len(tracer) == 4
+        assert tracer.total == 10
+        assert [r[1] for r in tracer.snapshot()] == [6, 7, 8, 9]
+        tracer.clear()
+        assert tracer.snapshot() == []
+
+    def test_Dump(self):
+        tracer = trace.Tracer(size=4)
+        trace.install_tracer(tracer)
+        for i in range(6):
+            louie.send('signal%i' % (i % 2))
+        f = StringIO()
+        tracer.dump(f)
+        f.seek(0)
+        loaded = trace.load(f)
+        assert loaded == tracer.snapshot()
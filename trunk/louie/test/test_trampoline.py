@@ -0,0 +1,94 @@
+import sys
+import unittest
+
+import louie
+from louie import trampoline
+
+
+class Relay(object):
+    """Sends the next signal of a chain of ``length`` signals."""
+
+    def __init__(self, length):
+        self.length = length
+        self.received = []
+
+    def __call__(self, signal, index):
+        self.received.append((signal, index))
+        if index < self.length:
+            louie.send('step', self, index=index + 1)
+            return 'sent'
+
+
+class TestTrampoline(unittest.TestCase):
+
+    def setUp(self):
+        louie.reset()
+
+    def tearDown(self):
+        trampoline.disable()
+
+    def test_Deep(self):
+        length = sys.getrecursionlimit() * 2
+        relay = Relay(length)
+        louie.connect(relay, 'step', relay)
+        self.assertRaises(RuntimeError, louie.send, 'step', relay, index=0)
+        relay.received = []
+        trampoline.enable(max_depth=length)
+        responses = louie.send('step', relay, index=0)
+        assert responses == [(relay, 'sent')]
+        assert len(relay.received) == length + 1
+        assert relay.received[-1] == ('step', length)
+
+    def test_BreadthFirst(self):
+        trampoline.enable()
+        order = []
+        def first():
+            order.append('first')
+            assert louie.send('inner') == []
+            order.append('first done')
+        def second():
+            order.append('second')
+        def inner():
+            order.append('inner')
+        louie.connect(first, 'outer')
+        louie.connect(inner, 'inner')
+        louie.send('outer')
+        louie.connect(second, 'outer')
+        del order[:]
+        louie.send('outer')
+        order.remove('second')
+        assert order == ['first', 'first done', 'inner']
+
+    def test_Limits(self):
+        relay = Relay(10)
+        louie.connect(relay, 'step', relay)
+        def record():
+            pass
+        louie.connect(record, 'failed')
+        trampoline.enable(max_depth=5)
+        self.assertRaises(trampoline.TrampolineError,
+                          louie.send, 'step', relay, index=0)
+        assert len(relay.received) == 6
+        # The queue is emptied, so later sends are not affected.
+        assert louie.send('failed') == [(record, None)]
+        t = trampoline.enable(max_sends=3)
+        relay.received = []
+        self.assertRaises(trampoline.TrampolineError,
+                          louie.send, 'step', relay, index=0)
+        assert len(relay.received) == 4
+        assert t.deferred == 3
+        assert t.high_water == 1
+
+    def test_Cycles(self):
+        trampoline.enable(cycles=False)
+        relay = Relay(10)
+        louie.connect(relay, 'step', relay)
+        responses = louie.send_robust('step', relay, index=0)
+        assert len(responses) == 1
+        assert isinstance(responses[0][1], trampoline.TrampolineError)
+        # Different senders are not a cycle.
+        def ping(count):
+            if count:
+                louie.send('ping', object(), count=count - 1)
+        louie.connect(ping, 'ping')
+        louie.send('ping', count=5)
@@ -0,0 +1,269 @@
+"""Throttled and debounced receivers, and the timer wheel behind them.
+
+Receivers connected with ``throttle=interval`` are called at most once
+per ``interval`` seconds; calls made sooner are dropped.  Receivers
+connected with ``debounce=delay`` are called ``delay`` seconds after
+the last of a burst of calls, with that call's arguments; earlier
+calls in the burst are dropped::
+
+    louie.connect(view.on_resize, 'resize', window, debounce=0.05)
+    louie.connect(bar.on_progress, 'progress', job, throttle=0.1)
+
+Delayed calls are scheduled on ``default_wheel``, a single hierarchical timer
+wheel shared by all receivers, which must be advanced by the
+application's event loop, e.g. by calling ``default_wheel.advance()``
+periodically, or by starting a ``ThreadDriver`` or ``TwistedDriver``.
+Debounced receivers are called by whoever advances the wheel.
+"""
+
+import threading
+import time
+import traceback
+
+from louie.adapter import Adapter
+
+
+DEFAULT_RESOLUTION = 0.01
+
+
+class Timer(object):
+    """A callback scheduled on a ``TimerWheel``."""
+
+    __slots__ = ('tick', 'callback', 'arguments', 'slot')
+
+    def __init__(self, tick, callback, arguments):
+        self.tick = tick
+        self.callback = callback
+        self.arguments = arguments
+        # The dictionary holding the timer while it is scheduled.
+        self.slot = None
+
+
+class TimerWheel(object):
+    """Hierarchical timer wheel.
+
+    Scheduling and cancelling timers is O(1).  Advancing the wheel
+    costs O(1) per tick elapsed, plus the timers fired, plus an
+    occasional cascade of timers from a coarser level to a finer one.
+
+    - ``resolution``: Length of a tick, in seconds.
+
+    - ``bits``: Each level has ``2 ** bits`` slots.
+
+    - ``levels``: Number of levels.  Timers further in the future than
+      the wheel spans are kept in its last slot and rescheduled when
+      it is reached.
+
+    - ``clock``: Function returning the current time, in seconds.
+    """
+
+    def __init__(self, resolution=DEFAULT_RESOLUTION, bits=8, levels=4,
+                 clock=time.time):
+        self.resolution = resolution
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.clock = clock
+        self.levels = [[{} for i in xrange(1 << bits)]
+                       for level in xrange(levels)]
+        self.tick = self._now()
+        self.count = 0
+        self.lock = threading.RLock()
+
+    def _now(self):
+        return int(self.clock() / self.resolution)
+
+    def schedule(self, delay, callback, *arguments):
+        """Call ``callback(*arguments)`` after ``delay`` seconds.
+
+        Returns a ``Timer`` which may be passed to ``cancel``.
+        """
+        ticks = max(int(delay / self.resolution + 0.5), 1)
+        now = self._now()
+        self.lock.acquire()
+        try:
+            # The wheel may not have been advanced up to now.
+            timer = Timer(max(now, self.tick) + ticks, callback, arguments)
+            self._insert(timer)
+            self.count += 1
+        finally:
+            self.lock.release()
+        return timer
+
+    def _insert(self, timer):
+        delta = timer.tick - self.tick
+        bits = self.bits
+        for level, slots in enumerate(self.levels):
+            if delta < (1 << (bits * (level + 1))) or \
+                   level == len(self.levels) - 1:
+                index = (timer.tick >> (bits * level)) & self.mask
+                if level and delta >= (1 << (bits * (level + 1))):
+                    # Beyond the span of the wheel; park the timer in
+                    # the slot reached last.
+                    index = ((self.tick >> (bits * level)) - 1) & self.mask
+                slot = slots[index]
+                slot[id(timer)] = timer
+                timer.slot = slot
+                return
+
+    def cancel(self, timer):
+        """Cancel ``timer`` if it has not fired yet."""
+        self.lock.acquire()
+        try:
+            slot = timer.slot
+            if slot is not None:
+                del slot[id(timer)]
+                timer.slot = None
+                self.count -= 1
+        finally:
+            self.lock.release()
+
+    def __len__(self):
+        return self.count
+
+    def advance(self, now=None):
+        """Fire all timers that are due.  Returns the number of timers
+        fired.
+
+        ``now`` defaults to the current time according to the wheel's
+        clock.
+        """
+        if now is None:
+            target = self._now()
+        else:
+            target = int(now / self.resolution)
+        due = []
+        self.lock.acquire()
+        try:
+            if not self.count:
+                self.tick = max(self.tick, target)
+            while self.tick < target:
+                self.tick += 1
+                self._cascade()
+                slot = self.levels[0][self.tick & self.mask]
+                for timer in slot.values():
+                    if timer.tick <= self.tick:
+                        del slot[id(timer)]
+                        timer.slot = None
+                        due.append(timer)
+                        self.count -= 1
+                if not self.count:
+                    self.tick = target
+        finally:
+            self.lock.release()
+        for timer in due:
+            try:
+                timer.callback(*timer.arguments)
+            except Exception:
+                traceback.print_exc()
+        return len(due)
+
+    def _cascade(self):
+        """Move the timers of coarser slots reached at this tick into
+        finer levels."""
+        tick = self.tick
+        bits = self.bits
+        for level in xrange(1, len(self.levels)):
+            if (tick >> (bits * (level - 1))) & self.mask:
+                break
+            slots = self.levels[level]
+            index = (tick >> (bits * level)) & self.mask
+            slot = slots[index]
+            if slot:
+                slots[index] = {}
+                for timer in slot.values():
+                    self._insert(timer)
+
+
+class ThreadDriver(object):
+    """Advances a ``TimerWheel`` from a background thread."""
+
+    def __init__(self, wheel):
+        self.wheel = wheel
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run)
+        self.thread.setDaemon(True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stopped.isSet():
+            self.wheel.advance()
+            self.stopped.wait(self.wheel.resolution)
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+class TwistedDriver(object):
+    """Advances a ``TimerWheel`` from the Twisted reactor."""
+
+    def __init__(self, wheel):
+        from twisted.internet.task import LoopingCall
+        self.wheel = wheel
+        self.call = LoopingCall(wheel.advance)
+
+    def start(self):
+        self.call.start(self.wheel.resolution)
+
+    def stop(self):
+        self.call.stop()
+
+
+class Throttle(Adapter):
+    """Calls the receiver at most once per ``interval`` seconds,
+    dropping calls made in between."""
+
+    def __init__(self, receiver, interval, weak=True, on_delete=None,
+                 clock=time.time):
+        Adapter.__init__(self, receiver, weak, on_delete)
+        self.interval = interval
+        self.clock = clock
+        self.last = None
+
+    def __call__(self, *arguments, **named):
+        now = self.clock()
+        if self.last is not None and now - self.last < self.interval:
+            return None
+        self.last = now
+        return self.deliver(arguments, named)
+
+
+class Debounce(Adapter):
+    """Calls the receiver ``delay`` seconds after the last of a burst
+    of calls, using ``wheel``, by default ``default_wheel``."""
+
+    def __init__(self, receiver, delay, weak=True, on_delete=None,
+                 wheel=None):
+        Adapter.__init__(self, receiver, weak, on_delete)
+        self.delay = delay
+        if wheel is None:
+            wheel = default_wheel
+        self.wheel = wheel
+        self.timer = None
+
+    def __call__(self, *arguments, **named):
+        if self.timer is not None:
+            self.wheel.cancel(self.timer)
+        self.timer = self.wheel.schedule(
+            self.delay, self._fire, arguments, named)
+        return None
+
+    def _fire(self, arguments, named):
+        self.timer = None
+        self.deliver(arguments, named)
+
+    def close(self):
+        """Cancel the pending call, if any."""
+        if self.timer is not None:
+            self.wheel.cancel(self.timer)
+            self.timer = None
+
+
+# The timer wheel used by debounced receivers.
+default_wheel = TimerWheel()
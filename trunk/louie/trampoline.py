@@ -0,0 +1,167 @@
+"""Iterative dispatch of re-entrant sends.
+
+By default, a receiver which sends a signal calls the receivers of that
+signal before it returns, so long chains of receivers sending signals
+use one Python stack frame per step, and may exceed the recursion
+limit.  While the trampoline is enabled, sends made by receivers are
+instead queued, and carried out in order by the outermost send of the
+thread once its own receivers have returned, so that the stack depth
+stays constant::
+
+    louie.trampoline.enable(max_depth=1000)
+
+Signals are thus dispatched breadth-first: all receivers of a signal
+are called before those of the signals they sent.  A queued send
+returns an empty list, since its receivers have not been called yet.
+An error raised by a receiver of a queued send propagates from the
+outermost send, and discards the sends still queued.
+
+The trampoline guards against event storms by raising
+``TrampolineError`` from a send made by a receiver, without queuing
+it, if:
+
+- ``max_depth``: It is more than ``max_depth`` sends away from the
+  outermost send.
+
+- ``max_sends``: More than ``max_sends`` sends have been queued since
+  the outermost send began.
+
+- ``cycles``: It is false, and the send has the same signal and sender
+  as one of the sends which led to it.
+
+Each thread drains its own queue.  The trampoline is installed as
+``dispatcher.trampoline``, so it costs nothing while disabled.
+"""
+
+import threading
+from collections import deque
+
+from louie import dispatcher
+from louie import error
+
+
+DEFAULT_MAX_DEPTH = 1000
+DEFAULT_MAX_SENDS = 100000
+
+
+class TrampolineError(error.DispatcherError):
+    """Raised by a send made by a receiver which exceeds a limit of
+    the trampoline."""
+
+
+class _Send(object):
+    """A send queued by the trampoline."""
+
+    __slots__ = ('function', 'signal', 'sender', 'arguments', 'named',
+                 'depth', 'parent')
+
+    def __init__(self, function, signal, sender, arguments, named, depth,
+                 parent):
+        self.function = function
+        self.signal = signal
+        self.sender = sender
+        self.arguments = arguments
+        self.named = named
+        self.depth = depth
+        self.parent = parent
+
+
+class Trampoline(object):
+    """Queues sends made by receivers, and carries them out
+    iteratively.
+
+    - ``deferred``: Number of sends queued.
+
+    - ``high_water``: Highest number of sends queued at once.
+    """
+
+    def __init__(self, max_depth=DEFAULT_MAX_DEPTH,
+                 max_sends=DEFAULT_MAX_SENDS, cycles=True):
+        self.max_depth = max_depth
+        self.max_sends = max_sends
+        self.cycles = cycles
+        self.local = threading.local()
+        self.deferred = 0
+        self.high_water = 0
+
+    def intercept(self, function, signal, sender, arguments, named):
+        """Called by the send ``function`` before dispatching.  Return
+        ``None`` to let it dispatch, or its responses."""
+        local = self.local
+        if getattr(local, 'bypass', False):
+            # Carrying out a send taken from the queue.
+            local.bypass = False
+            return None
+        queue = getattr(local, 'queue', None)
+        if queue is not None:
+            self._defer(local, queue, function, signal, sender, arguments,
+                        named)
+            return []
+        return self._drain(local, function, signal, sender, arguments,
+                           named)
+
+    def _defer(self, local, queue, function, signal, sender, arguments,
+               named):
+        parent = local.current
+        depth = parent.depth + 1
+        if depth > self.max_depth:
+            raise TrampolineError(
+                'Sending %r from %r exceeds depth %i'
+                % (signal, sender, self.max_depth))
+        if local.count >= self.max_sends:
+            raise TrampolineError(
+                'Sending %r from %r exceeds %i sends'
+                % (signal, sender, self.max_sends))
+        if not self.cycles:
+            ancestor = parent
+            while ancestor is not None:
+                if (ancestor.signal == signal
+                    and ancestor.sender is sender):
+                    raise TrampolineError(
+                        'Sending %r from %r is a cycle' % (signal, sender))
+                ancestor = ancestor.parent
+        queue.append(_Send(function, signal, sender, arguments, named,
+                           depth, parent))
+        local.count += 1
+        self.deferred += 1
+        if len(queue) > self.high_water:
+            self.high_water = len(queue)
+
+    def _drain(self, local, function, signal, sender, arguments, named):
+        item = _Send(function, signal, sender, arguments, named, 0, None)
+        queue = deque()
+        local.queue = queue
+        local.count = 0
+        try:
+            local.current = item
+            local.bypass = True
+            responses = function(signal, sender, *arguments, **named)
+            while queue:
+                item = queue.popleft()
+                local.current = item
+                local.bypass = True
+                item.function(item.signal, item.sender, *item.arguments,
+                              **item.named)
+        finally:
+            local.queue = None
+            local.current = None
+            local.bypass = False
+        return responses
+
+
+def enable(max_depth=DEFAULT_MAX_DEPTH, max_sends=DEFAULT_MAX_SENDS,
+           cycles=True):
+    """Install and return a new ``Trampoline``."""
+    trampoline = Trampoline(max_depth, max_sends, cycles)
+    dispatcher.trampoline = trampoline
+    return trampoline
+
+
+def disable():
+    """Remove the installed ``Trampoline``.  Sends already queued are
+    still carried out."""
+    dispatcher.trampoline = None
+
+
+def is_enabled():
+    return dispatcher.trampoline is not None